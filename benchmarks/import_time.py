@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+"""
+Measure time it takes to import modules of the package in fresh interpreter
+with ``python -X importtime`` (Python 3.7+), listing slowest imports, and
+exit with non-zero status if it exceeds budget, so that startup cost can be
+tracked in CI.
+"""
+
+import subprocess
+import sys
+from tornado.options import options, define
+
+
+def measure(module):
+    """
+    Import module in fresh interpreter, returning its cumulative import time
+    and list of ``(self time, module)`` of all imported modules, in seconds
+    """
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + module],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    total, imports = 0, []
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header
+        imports.append((int(self_us) / 1e6, name.strip()))
+        if name.strip() == module:
+            total = int(cumulative_us) / 1e6
+    imports.sort(reverse=True)
+    return total, imports
+
+
+def main():
+    define(
+        "modules",
+        default=["tornado_jsonapi.handlers", "tornado_jsonapi.resource"],
+        multiple=True,
+        help="Modules to import",
+    )
+    define("top", default=10, help="Number of slowest imports to list")
+    define("budget", default=0.0, help="Maximum import time in ms, if any")
+    define("repeat", default=5, help="Number of measurements to take best of")
+    options.parse_command_line()
+    if sys.version_info < (3, 7):
+        sys.exit("-X importtime needs Python 3.7+")
+    failed = False
+    for module in options.modules:
+        total, imports = min(
+            (measure(module) for i in range(options.repeat)),
+            key=lambda m: m[0],
+        )
+        print("{:<50} {:>10.1f} ms".format(module, total * 1000))
+        for self_time, name in imports[:options.top]:
+            print("    {:<46} {:>10.1f} ms".format(name, self_time * 1000))
+        if options.budget and total * 1000 > options.budget:
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+"""
+Measure throughput and latency of resource creation with and without
+:py:class:`tornado_jsonapi.writes.CoalescingResource` for several window
+sizes, using file-backed SQLite database so that each commit hits the disk.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from tornado import gen
+from tornado.concurrent import is_future
+from tornado.ioloop import IOLoop
+from tornado.options import options, define
+
+import tornado_jsonapi.resource
+import tornado_jsonapi.writes
+
+
+schema = json.loads(
+    """
+    {
+        "$schema": "http://json-schema.org/draft-04/schema#",
+        "title": "post",
+        "type": "object",
+        "properties": {
+            "text": { "type": "string" },
+            "author": { "type": "string" }
+        },
+        "required": [ "text", "author" ],
+        "additionalProperties": false
+    }
+"""
+)
+
+
+@gen.coroutine
+def client(resource, count, latencies):
+    for i in range(count):
+        start = time.perf_counter()
+        res = resource.create({"author": "bench", "text": "post %d" % i})
+        while is_future(res):
+            res = yield res
+        latencies.append(time.perf_counter() - start)
+
+
+@gen.coroutine
+def run(delay, clients, count):
+    with tempfile.TemporaryDirectory() as directory:
+        connection = sqlite3.connect(os.path.join(directory, "bench.db"))
+        resource = tornado_jsonapi.resource.DBAPI2Resource(
+            schema, sqlite3, connection
+        )
+        yield resource._create_table()
+        if delay is not None:
+            resource = tornado_jsonapi.writes.CoalescingResource(
+                resource, delay=delay
+            )
+        latencies = []
+        start = time.perf_counter()
+        yield [client(resource, count, latencies) for i in range(clients)]
+        elapsed = time.perf_counter() - start
+        connection.close()
+    latencies.sort()
+    print(
+        "{:>10} {:>10.0f} {:>10.2f} {:>10.2f}".format(
+            "-" if delay is None else "{:g}".format(delay * 1000),
+            len(latencies) / elapsed,
+            latencies[len(latencies) // 2] * 1000,
+            latencies[int(len(latencies) * 0.99)] * 1000,
+        )
+    )
+
+
+@gen.coroutine
+def main():
+    define("clients", default=50, help="Number of concurrent clients")
+    define("count", default=20, help="Number of creates per client")
+    options.parse_command_line()
+    print(
+        "{:>10} {:>10} {:>10} {:>10}".format(
+            "window ms", "rows/s", "p50 ms", "p99 ms"
+        )
+    )
+    for delay in (None, 0, 0.0005, 0.002, 0.01):
+        yield run(delay, options.clients, options.count)
+
+
+if __name__ == "__main__":
+    IOLoop.current().run_sync(main)
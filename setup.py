@@ -46,7 +46,9 @@ setup(
     ],
     extras_require={
         'sqlalchemy': ['SQLAlchemy==1.0.12', 'alchemyjsonschema>=0.6.1'],
-        'dbapi2': ['antiorm==1.2.0']
+        'dbapi2': ['antiorm==1.2.0'],
+        'msgpack': ['msgpack>=0.6.0'],
+        'cbor': ['cbor2>=4.0.0'],
     },
     tests_require=['pytest==3.6.4', 'pytest-pep8==1.0.6',
         'WebTest==2.0.20', 'loremipsum==1.0.5'],
@@ -46,6 +46,27 @@ posts_schema = json.loads("""
     """)
 
 
+comments_schema = json.loads("""
+    {
+        "$schema": "http://json-schema.org/draft-04/schema#",
+        "title": "comment",
+        "type": "object",
+        "properties": {
+            "post_id":
+            {
+                "type": "integer"
+            },
+            "text":
+            {
+                "type": "string"
+            }
+        },
+        "required": [ "post_id", "text" ],
+        "additionalProperties": false
+    }
+    """)
+
+
 class PostGenerator:
     def generate_text(self):
         return ''.join(loremipsum.get_sentences(1))
@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 # vim: set fileencoding=utf8 :
 
+import copy
 import json
+import sqlite3
 import status
 import pytest
-from test import DBAPI2Mixin, PostGenerator, BaseTestCase
+from test import DBAPI2Mixin, PostGenerator, BaseTestCase, posts_schema
+
+import tornado_jsonapi.resource
 
 
 class TestDBAPI2Resource(DBAPI2Mixin, PostGenerator, BaseTestCase):
@@ -84,3 +88,81 @@ class TestDBAPI2Resource(DBAPI2Mixin, PostGenerator, BaseTestCase):
         res = self.app.get('/api/posts/')
         post = json.loads(res.body.decode(encoding='UTF-8'))
         assert len(post['data']) == 2
+
+    def test_read_many(self):
+        ids = []
+        for i in range(3):
+            res = self.app.post(
+                '/api/posts/',
+                json.dumps(self.generate_resource()),
+                {'Content-Type': self.content_type()})
+            ids.append(json.loads(res.body.decode(encoding='UTF-8'))
+                       ['data']['id'])
+        res = self.app.get(
+            '/api/posts/?filter[id]={},{},100500'.format(ids[0], ids[2]))
+        posts = json.loads(res.body.decode(encoding='UTF-8'))['data']
+        assert sorted(p['id'] for p in posts) == sorted([ids[0], ids[2]])
+
+    def test_indexes(self):
+        schema = copy.deepcopy(posts_schema)
+        schema['properties']['author']['x-index'] = True
+        connection = sqlite3.connect(':memory:')
+        resource = tornado_jsonapi.resource.DBAPI2Resource(
+            schema, sqlite3, connection, indexes=[('text', 'author')])
+        resource._create_table()
+        resource._create_table()
+        names = [name for name, _, _ in resource.indexes()]
+        assert names == ['posts_author_idx', 'posts_text_author_idx']
+        rows = connection.execute(
+            "select name from sqlite_master where type = 'index' "
+            "and tbl_name = 'posts' and sql is not null").fetchall()
+        assert sorted(r[0] for r in rows) == names
+        assert resource.indexes_for(
+            filters=[('author', 'eq', 'x')]) == [resource.indexes()[0]]
+        assert resource.indexes_for(sort=[('text', True)]) == \
+            [resource.indexes()[1]]
+
+    def test_create_many(self):
+        resource = tornado_jsonapi.resource.DBAPI2Resource(
+            posts_schema, sqlite3, sqlite3.connect(':memory:'))
+        resource._create_table()
+        posts = [{'author': str(i), 'text': 'x'} for i in range(1200)]
+        created = self.io_loop.run_sync(lambda: resource.create_many(posts))
+        assert [r.attributes() for r in created] == posts
+        assert len(set(r.id_() for r in created)) == len(posts)
+
+    def test_create_many_returning(self):
+        psycopg2 = pytest.importorskip('psycopg2')
+        import dbapiext
+        self.addCleanup(dbapiext.set_paramstyle, sqlite3)
+
+        class Cursor:
+            def execute(self, statement, parameters):
+                statements.append((statement, parameters))
+                return self
+
+            def fetchall(self):
+                return [('b', 'a', 7), ('d', 'c', 8)]
+
+            def close(self):
+                pass
+
+        class Connection:
+            def cursor(self):
+                return Cursor()
+
+            def commit(self):
+                pass
+
+        statements = []
+        resource = tornado_jsonapi.resource.DBAPI2Resource(
+            posts_schema, psycopg2, Connection())
+        created = self.io_loop.run_sync(lambda: resource.create_many(
+            [{'author': 'a', 'text': 'b'}, {'author': 'c', 'text': 'd'}]))
+        assert statements == [(
+            'insert into posts (text, author) values '
+            '(%(__p3_l0__)s, %(__p3_l1__)s), (%(__p4_l0__)s, %(__p4_l1__)s) '
+            'returning text, author, id',
+            {'__p3_l0__': 'b', '__p3_l1__': 'a',
+             '__p4_l0__': 'd', '__p4_l1__': 'c'})]
+        assert [r.id_() for r in created] == ['7', '8']
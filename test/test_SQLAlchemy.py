@@ -77,3 +77,17 @@ class TestSQLAlchemyResource(SQLAlchemyMixin, PostGenerator, BaseTestCase):
         res = self.app.get('/api/posts/')
         post = json.loads(res.body.decode(encoding='UTF-8'))
         assert len(post['data']) == 2
+
+    def test_read_many(self):
+        ids = []
+        for i in range(3):
+            res = self.app.post(
+                '/api/posts/',
+                json.dumps(self.generate_resource()),
+                {'Content-Type': self.content_type()})
+            ids.append(json.loads(res.body.decode(encoding='UTF-8'))
+                       ['data']['id'])
+        res = self.app.get(
+            '/api/posts/?filter[id]={},{},100500'.format(ids[0], ids[2]))
+        posts = json.loads(res.body.decode(encoding='UTF-8'))['data']
+        assert sorted(p['id'] for p in posts) == sorted([ids[0], ids[2]])
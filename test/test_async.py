@@ -211,6 +211,19 @@ class TestPostgre(PostGenerator, BaseTestCase):
         ], **tornado_jsonapi.handlers.not_found_handling_settings())
         return app
 
+    def test_copy_from(self):
+        import psycopg2
+        connection = psycopg2.connect('dbname=postgres user=postgres '
+                                      'host=localhost port=5432')
+        resource = tornado_jsonapi.resource.DBAPI2Resource(
+            posts_schema, psycopg2, connection)
+        before = self.io_loop.run_sync(resource.list_count)
+        count = self.io_loop.run_sync(lambda: resource.copy_from(
+            [self.generate_post() for i in range(3)]))
+        assert count == 3
+        assert self.io_loop.run_sync(resource.list_count) == before + 3
+        connection.close()
+
     def create_post(self):
         self.http_client.fetch(
             HTTPRequest(
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import json
+import sqlite3
+import status
+import tornado.web
+from test import PostGenerator, BaseTestCase, posts_schema, comments_schema
+
+import tornado_jsonapi.handlers
+import tornado_jsonapi.resource
+
+
+class TestBatch(PostGenerator, BaseTestCase):
+    def setUp(self):
+        # NB: this is only required when mixing several DBAPIs in one app
+        import dbapiext
+        dbapiext._query_cache.clear()
+        super().setUp()
+        self.posts = [
+            self.create('post', {'author': author,
+                                 'text': self.generate_text()})
+            for author in ('alice', 'bob', 'carol')]
+        self.comment = self.create('comment',
+                                   {'post_id': int(self.posts[0]),
+                                    'text': self.generate_text()})
+
+    def construct_app(self):
+        connection = sqlite3.connect(':memory:')
+        posts = tornado_jsonapi.resource.DBAPI2Resource(
+            posts_schema, sqlite3, connection)
+        posts._create_table()
+        comments = tornado_jsonapi.resource.DBAPI2Resource(
+            comments_schema, sqlite3, connection)
+        comments._create_table()
+        comments.add_relationship('post', posts, 'post_id')
+        return tornado.web.Application([
+            (
+                r"/api/posts/([^/]*)",
+                tornado_jsonapi.handlers.APIHandler,
+                dict(resource=posts)
+            ),
+            (
+                r"/api/comments/([^/]*)",
+                tornado_jsonapi.handlers.APIHandler,
+                dict(resource=comments)
+            ),
+            (
+                r"/api/batch",
+                tornado_jsonapi.handlers.BatchHandler,
+                dict(resources=[posts, comments])
+            ),
+        ], **tornado_jsonapi.handlers.not_found_handling_settings())
+
+    def create(self, type_, attributes):
+        res = self.app.post(
+            '/api/{}s/'.format(type_),
+            json.dumps({'data': {'type': type_, 'attributes': attributes}}),
+            {'Content-Type': self.content_type()})
+        return json.loads(res.body.decode(encoding='UTF-8'))['data']['id']
+
+    def batch(self, queries, **kwargs):
+        res = self.app.post(
+            '/api/batch',
+            json.dumps({'queries': queries}),
+            {'Content-Type': self.content_type()},
+            **kwargs)
+        return json.loads(res.body.decode(encoding='UTF-8'))
+
+    def test_batch(self):
+        results = self.batch([
+            {'type': 'post', 'id': self.posts[1]},
+            {'type': 'post', 'filter': {'author': {'gt': 'alice'}},
+             'sort': '-author', 'fields': 'author'},
+            {'type': 'comment', 'include': 'post', 'limit': 1},
+            {'type': 'post', 'id': '31337'},
+        ])['results']
+        assert results[0]['data']['attributes']['author'] == 'bob'
+        assert [p['attributes'] for p in results[1]['data']] == \
+            [{'author': 'carol'}, {'author': 'bob'}]
+        assert results[1]['limits']['total'] == 2
+        assert [c['id'] for c in results[2]['data']] == [self.comment]
+        assert [p['id'] for p in results[2]['included']] == [self.posts[0]]
+        assert results[3]['data'] is None
+
+    def test_filter_by_ids(self):
+        results = self.batch([
+            {'type': 'post', 'filter': {'id': self.posts[:2]}},
+        ])['results']
+        assert sorted(p['id'] for p in results[0]['data']) == \
+            sorted(self.posts[:2])
+
+    def test_invalid_query(self):
+        doc = self.batch([
+            {'type': 'post'},
+            {'type': 'post', 'sort': 'title'},
+        ], status=status.HTTP_400_BAD_REQUEST)
+        assert doc['errors'][0]['source'] == {'pointer': '/queries/1'}
+
+    def test_unknown_type(self):
+        self.batch([{'type': 'tag'}], status=status.HTTP_404_NOT_FOUND)
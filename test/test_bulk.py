@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import json
+import status
+from test import DBAPI2Mixin, SQLAlchemyMixin, PostGenerator, BaseTestCase
+
+from tornado_jsonapi import metrics
+
+
+class BulkTests(PostGenerator):
+    def setUp(self):
+        # NB: this is only required when mixing several DBAPIs in one app
+        import dbapiext
+        dbapiext._query_cache.clear()
+        super().setUp()
+
+    def bulk_content_type(self):
+        return self.content_type() + '; ext=bulk'
+
+    def bulk(self, method, data, **kwargs):
+        return getattr(self.app, method)(
+            '/api/posts/',
+            json.dumps({'data': data}),
+            {'Content-Type': self.bulk_content_type()},
+            **kwargs)
+
+    def create_posts(self, count):
+        res = self.bulk('post',
+                        [self.generate_resource()['data']
+                         for i in range(count)],
+                        status=status.HTTP_201_CREATED)
+        return json.loads(res.body.decode(encoding='UTF-8'))['data']
+
+    def count_posts(self):
+        res = self.app.get('/api/posts/')
+        return json.loads(res.body.decode(encoding='UTF-8'))['limits']['total']
+
+    def test_create(self):
+        posts = self.create_posts(3)
+        assert len(posts) == 3
+        assert len(set(p['id'] for p in posts)) == 3
+        assert self.count_posts() == 3
+        for post in posts:
+            res = self.app.get('/api/posts/{}'.format(post['id']))
+            doc = json.loads(res.body.decode(encoding='UTF-8'))
+            assert doc['data']['attributes'] == post['attributes']
+
+    def test_create_with_id(self):
+        data = self.generate_resource()['data']
+        data['id'] = '42'
+        self.bulk('post', [data], status=status.HTTP_403_FORBIDDEN)
+        assert self.count_posts() == 0
+
+    def test_update(self):
+        posts = self.create_posts(2)
+        data = [{'type': 'post', 'id': p['id'],
+                 'attributes': {'text': 'updated ' + p['id']}}
+                for p in reversed(posts)]
+        res = self.bulk('patch', data)
+        updated = json.loads(res.body.decode(encoding='UTF-8'))['data']
+        assert [p['id'] for p in updated] == [p['id'] for p in data]
+        for post in updated:
+            assert post['attributes']['text'] == 'updated ' + post['id']
+
+    def test_update_mixed(self):
+        posts = self.create_posts(3)
+        attributes = [{'text': 'a'}, {'author': 'b', 'text': 'c'},
+                      {'text': 'd'}]
+        data = [{'type': 'post', 'id': p['id'], 'attributes': a}
+                for p, a in zip(posts, attributes)]
+        res = self.bulk('patch', data)
+        updated = json.loads(res.body.decode(encoding='UTF-8'))['data']
+        for post, original, attributes_ in zip(updated, posts, attributes):
+            assert post['attributes'] == dict(original['attributes'],
+                                              **attributes_)
+
+    def test_update_missing(self):
+        posts = self.create_posts(1)
+        data = [{'type': 'post', 'id': id_, 'attributes': {'text': 'x'}}
+                for id_ in (posts[0]['id'], '31337')]
+        self.bulk('patch', data, status=status.HTTP_404_NOT_FOUND)
+
+    def test_delete(self):
+        posts = self.create_posts(3)
+        self.bulk('delete',
+                  [{'type': 'post', 'id': p['id']} for p in posts[:2]],
+                  status=status.HTTP_204_NO_CONTENT)
+        assert self.count_posts() == 1
+
+    def test_delete_duplicate(self):
+        posts = self.create_posts(1)
+        self.bulk('delete',
+                  [{'type': 'post', 'id': posts[0]['id']}] * 2,
+                  status=status.HTTP_400_BAD_REQUEST)
+        assert self.count_posts() == 1
+
+
+class TestDBAPI2Bulk(DBAPI2Mixin, BulkTests, BaseTestCase):
+    def test_update_statements(self):
+        posts = self.create_posts(3)
+        query_stats = metrics.query_stats
+        metrics.query_stats = metrics.QueryStats(slow_threshold=None)
+        try:
+            self.bulk('patch', [
+                {'type': 'post', 'id': p['id'], 'attributes': a}
+                for p, a in zip(posts, [{'text': 'a'}, {'author': 'b'},
+                                        {'text': 'c'}])])
+            updates = [stats[0] for statement, stats
+                       in metrics.query_stats.statements.items()
+                       if statement.startswith('update')]
+        finally:
+            metrics.query_stats = query_stats
+        assert sorted(updates) == [1, 1]
+
+
+class TestSQLAlchemyBulk(SQLAlchemyMixin, BulkTests, BaseTestCase):
+    pass
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import gzip
+import json
+from test import DBAPI2Mixin, PostGenerator, BaseTestCase
+
+from tornado_jsonapi import compression
+
+
+class TestCompression(DBAPI2Mixin, PostGenerator, BaseTestCase):
+    def construct_app(self):
+        app = super().construct_app()
+        self.cache = compression.CompressionCache()
+        app.settings['jsonapi_compression_threshold'] = 256
+        app.settings['jsonapi_compression_cache'] = self.cache
+        return app
+
+    def setUp(self):
+        # NB: this is only required when mixing several DBAPIs in one app
+        import dbapiext
+        dbapiext._query_cache.clear()
+        super().setUp()
+        for i in range(5):
+            self.app.post('/api/posts/',
+                          json.dumps(self.generate_resource()),
+                          {'Content-Type': self.content_type()})
+
+    def test_gzip(self):
+        # NB: WebTest decodes gzip responses, so use real HTTP client here
+        res = self.fetch('/api/posts/',
+                         headers={'Accept-Encoding': 'deflate, gzip'},
+                         decompress_response=False)
+        assert res.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in res.headers['Vary']
+        doc = json.loads(gzip.decompress(res.body).decode(encoding='UTF-8'))
+        assert len(doc['data']) == 5
+
+    def test_not_accepted(self):
+        res = self.app.get('/api/posts/')
+        assert 'Content-Encoding' not in res.headers
+        json.loads(res.body.decode(encoding='UTF-8'))
+
+    def test_threshold(self):
+        res = self.app.get('/api/posts/?limit=1',
+                           headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in res.headers
+
+    def test_cache(self):
+        bodies = [self.app.get('/api/posts/',
+                               headers={'Accept-Encoding': 'gzip'}).body
+                  for i in range(2)]
+        assert bodies[0] == bodies[1]
+        assert (self.cache.misses, self.cache.hits) == (1, 1)
+
+    def test_choose_encoding(self):
+        assert compression.choose_encoding('deflate, gzip;q=0.5') == 'gzip'
+        assert compression.choose_encoding('identity') is None
+        assert compression.choose_encoding('*;q=0') is None
+        assert compression.choose_encoding('*') == \
+            compression.encodings()[0]
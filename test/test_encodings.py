@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import json
+import pytest
+import status
+from test import DBAPI2Mixin, PostGenerator, BaseTestCase
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+
+class EncodingTests(PostGenerator):
+    def setUp(self):
+        # NB: this is only required when mixing several DBAPIs in one app
+        import dbapiext
+        dbapiext._query_cache.clear()
+        super().setUp()
+
+    def media_type(self):
+        return 'application/vnd.api+' + self.suffix
+
+    def headers(self):
+        return {'Content-Type': self.media_type(),
+                'Accept': self.media_type()}
+
+    def test_roundtrip(self):
+        document = self.generate_resource()
+        res = self.app.post('/api/posts/', self.dumps(document),
+                            self.headers(),
+                            status=status.HTTP_201_CREATED)
+        assert res.headers['Content-Type'] == self.media_type()
+        created = self.loads(res.body)
+        res = self.app.get('/api/posts/{}'.format(created['data']['id']),
+                           headers={'Accept': self.media_type()})
+        assert self.loads(res.body) == created
+        res = self.app.get('/api/posts/{}'.format(created['data']['id']))
+        assert json.loads(res.body.decode(encoding='UTF-8')) == created
+        assert created['data']['attributes'] == document['data']['attributes']
+
+    def test_error(self):
+        res = self.app.get('/api/comments/',
+                           headers={'Accept': self.media_type()},
+                           status=status.HTTP_404_NOT_FOUND)
+        assert res.headers['Content-Type'] == self.media_type()
+        assert self.loads(res.body)['errors'][0]['status'] == '404'
+
+    def test_malformed(self):
+        self.app.post('/api/posts/', b'\xc1\xff\xff', self.headers(),
+                      status=status.HTTP_400_BAD_REQUEST)
+
+
+@pytest.mark.skipif(msgpack is None, reason='Missing msgpack')
+class TestMessagePack(DBAPI2Mixin, EncodingTests, BaseTestCase):
+    suffix = 'msgpack'
+
+    def dumps(self, document):
+        return msgpack.packb(document, use_bin_type=True)
+
+    def loads(self, data):
+        return msgpack.unpackb(data, raw=False)
+
+
+@pytest.mark.skipif(cbor2 is None, reason='Missing cbor2')
+class TestCBOR(DBAPI2Mixin, EncodingTests, BaseTestCase):
+    suffix = 'cbor'
+
+    def dumps(self, document):
+        return cbor2.dumps(document)
+
+    def loads(self, data):
+        return cbor2.loads(data)
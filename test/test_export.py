@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import json
+import status
+from tornado.testing import gen_test
+from test import SimpleAppMixin, DBAPI2Mixin, SQLAlchemyMixin, \
+    PostGenerator, BaseTestCase
+
+
+class ExportTests(PostGenerator):
+    def setUp(self):
+        # NB: this is only required when mixing several DBAPIs in one app
+        import dbapiext
+        dbapiext._query_cache.clear()
+        super().setUp()
+        for author in ('alice', 'bob', 'carol'):
+            self.app.post(
+                '/api/posts/',
+                json.dumps(self.generate_resource(
+                    {'author': author, 'text': self.generate_text()})),
+                {'Content-Type': self.content_type()})
+
+    def export(self, query='', **kwargs):
+        res = self.app.get('/api/posts/' + query, **kwargs)
+        assert res.headers['Content-Type'] == 'application/x-ndjson'
+        return [json.loads(line)
+                for line in res.body.decode(encoding='UTF-8').splitlines()]
+
+    def test_accept(self):
+        posts = self.export(headers={'Accept': 'application/x-ndjson'})
+        assert len(posts) == 3
+        assert all(p['type'] == 'post' for p in posts)
+
+    def test_format_parameter(self):
+        posts = self.export('?format=ndjson&sort=-author')
+        assert [p['attributes']['author'] for p in posts] == \
+            ['carol', 'bob', 'alice']
+
+    def test_filtered(self):
+        posts = self.export('?format=ndjson&filter[author]=bob')
+        assert [p['attributes']['author'] for p in posts] == ['bob']
+
+    def test_single_resource(self):
+        res = self.app.get('/api/posts/?format=ndjson')
+        id_ = json.loads(res.body.decode(encoding='UTF-8').splitlines()[0])
+        self.app.get('/api/posts/{}'.format(id_['id']),
+                     headers={'Accept': 'application/x-ndjson'},
+                     status=status.HTTP_406_NOT_ACCEPTABLE)
+
+    @gen_test
+    def test_chunks(self):
+        resource = self.get_app().wildcard_router.rules[0].target_kwargs[
+            'resource']
+        chunks = []
+        yield resource.stream(lambda r: chunks.append(len(r)), chunk_size=2)
+        assert chunks == [2, 1]
+
+
+class TestSimpleExport(SimpleAppMixin, BaseTestCase):
+    def test_export(self):
+        res = self.app.get('/api/posts/?format=ndjson')
+        assert len(res.body.decode(encoding='UTF-8').splitlines()) == 2
+
+
+class TestDBAPI2Export(DBAPI2Mixin, ExportTests, BaseTestCase):
+    pass
+
+
+class TestSQLAlchemyExport(SQLAlchemyMixin, ExportTests, BaseTestCase):
+    pass
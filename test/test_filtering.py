@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import json
+import status
+from test import SimpleAppMixin, DBAPI2Mixin, SQLAlchemyMixin, \
+    PostGenerator, BaseTestCase
+
+
+class TestFilteringById(SimpleAppMixin, BaseTestCase):
+    def test_read_many(self):
+        id_ = self.get_first_post_id()
+        res = self.app.get('/api/posts/?filter[id]={},{}'.format(id_, id_))
+        posts = json.loads(res.body.decode(encoding='UTF-8'))['data']
+        assert [p['id'] for p in posts] == [id_]
+
+
+class TestLegacyResource(SimpleAppMixin, BaseTestCase):
+    """
+    Resource whose ``list_`` and ``list_count`` take no filters nor sort
+    """
+
+    def test_filtering(self):
+        for query in ('filter[author]=Andrew', 'filter[author]=Andrew&'
+                      'format=ndjson'):
+            res = self.app.get('/api/posts/?' + query,
+                               status=status.HTTP_400_BAD_REQUEST)
+            doc = json.loads(res.body.decode(encoding='UTF-8'))
+            assert doc['errors'][0]['detail'] == \
+                'Filtering is not supported by resource "post"'
+        res = self.app.get('/api/posts/?filter[id]={}'.format(
+            self.get_first_post_id()))
+        assert len(json.loads(res.body.decode(encoding='UTF-8'))['data']) \
+            == 1
+
+    def test_sorting(self):
+        for query in ('sort=-author', 'sort=author&format=ndjson'):
+            res = self.app.get('/api/posts/?' + query,
+                               status=status.HTTP_400_BAD_REQUEST)
+            doc = json.loads(res.body.decode(encoding='UTF-8'))
+            assert doc['errors'][0]['detail'] == \
+                'Sorting is not supported by resource "post"'
+
+
+class AuthorsMixin(PostGenerator):
+    def setUp(self):
+        # NB: this is only required when mixing several DBAPIs in one app
+        import dbapiext
+        dbapiext._query_cache.clear()
+        super().setUp()
+        for author in ('alice', 'bob', 'carol', 'dave'):
+            self.app.post(
+                '/api/posts/',
+                json.dumps(self.generate_resource(
+                    {'author': author, 'text': self.generate_text()})),
+                {'Content-Type': self.content_type()})
+
+    def get_authors(self, query):
+        res = self.app.get('/api/posts/?' + query)
+        doc = json.loads(res.body.decode(encoding='UTF-8'))
+        assert doc['limits']['total'] == len(doc['data'])
+        return sorted(p['attributes']['author'] for p in doc['data'])
+
+
+class FilteringTests(AuthorsMixin):
+    def test_equality(self):
+        assert self.get_authors('filter[author]=bob') == ['bob']
+
+    def test_inclusion(self):
+        assert self.get_authors('filter[author]=bob,dave,eve') == \
+            ['bob', 'dave']
+
+    def test_range(self):
+        assert self.get_authors(
+            'filter[author][gt]=alice&filter[author][le]=carol') == \
+            ['bob', 'carol']
+
+    def test_id_and_attribute(self):
+        res = self.app.get('/api/posts/?filter[author]=carol')
+        id_ = json.loads(res.body.decode(encoding='UTF-8'))['data'][0]['id']
+        assert self.get_authors(
+            'filter[id]={}&filter[author][ne]=carol'.format(id_)) == []
+
+    def test_ids_order(self):
+        res = self.app.get('/api/posts/?sort=-author')
+        ids = [p['id'] for p in
+               json.loads(res.body.decode(encoding='UTF-8'))['data']]
+        res = self.app.get('/api/posts/?filter[id]={}'.format(
+            ','.join(ids + ['100500'])))
+        doc = json.loads(res.body.decode(encoding='UTF-8'))
+        assert [p['id'] for p in doc['data']] == ids
+        assert doc['limits'] == {'total': 4, 'limit': 0, 'page': 0}
+
+    def test_ids_paginated(self):
+        res = self.app.get('/api/posts/?sort=-author')
+        ids = [p['id'] for p in
+               json.loads(res.body.decode(encoding='UTF-8'))['data']]
+        res = self.app.get('/api/posts/?filter[id]={}&limit=1&page=1'.format(
+            ','.join(ids[1:])))
+        doc = json.loads(res.body.decode(encoding='UTF-8'))
+        assert [p['id'] for p in doc['data']] == [ids[2]]
+        assert doc['limits'] == {'total': 3, 'limit': 1, 'page': 1}
+
+    def test_unknown_attribute(self):
+        self.app.get('/api/posts/?filter[title]=foo',
+                     status=status.HTTP_400_BAD_REQUEST)
+
+    def test_unknown_operator(self):
+        self.app.get('/api/posts/?filter[author][like]=foo',
+                     status=status.HTTP_400_BAD_REQUEST)
+
+
+class SortingTests(AuthorsMixin):
+    def get_sorted_authors(self, query):
+        res = self.app.get('/api/posts/?' + query)
+        doc = json.loads(res.body.decode(encoding='UTF-8'))
+        return [p['attributes']['author'] for p in doc['data']]
+
+    def test_ascending(self):
+        assert self.get_sorted_authors('sort=author') == \
+            ['alice', 'bob', 'carol', 'dave']
+
+    def test_descending_paginated(self):
+        assert self.get_sorted_authors('sort=-author&limit=2&page=1') == \
+            ['bob', 'alice']
+
+    def test_filtered(self):
+        assert self.get_sorted_authors(
+            'sort=-author&filter[author]=alice,carol') == ['carol', 'alice']
+
+    def test_unknown_attribute(self):
+        self.app.get('/api/posts/?sort=title',
+                     status=status.HTTP_400_BAD_REQUEST)
+
+
+class TestDBAPI2Filtering(DBAPI2Mixin, FilteringTests, BaseTestCase):
+    pass
+
+
+class TestSQLAlchemyFiltering(SQLAlchemyMixin, FilteringTests, BaseTestCase):
+    pass
+
+
+class TestDBAPI2Sorting(DBAPI2Mixin, SortingTests, BaseTestCase):
+    pass
+
+
+class TestSQLAlchemySorting(SQLAlchemyMixin, SortingTests, BaseTestCase):
+    pass
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import pytest
+import status
+import tornado.gen
+import tornado.web
+from tornado.concurrent import Future
+from tornado.iostream import StreamClosedError
+from tornado.log import app_log
+from tornado.testing import ExpectLog, gen_test
+from test import PostGenerator, BaseTestCase, posts_schema
+
+import tornado_jsonapi.handlers
+import tornado_jsonapi.resource
+
+
+class CountingImportHandler(tornado_jsonapi.handlers.ImportHandler):
+    received = 0
+
+    def data_received(self, chunk):
+        CountingImportHandler.received += len(chunk)
+        return super().data_received(chunk)
+
+
+class TestImport(PostGenerator, BaseTestCase):
+    def setUp(self):
+        # NB: this is only required when mixing several DBAPIs in one app
+        import dbapiext
+        dbapiext._query_cache.clear()
+        self.directory = tempfile.mkdtemp()
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        shutil.rmtree(self.directory)
+
+    def connect(self):
+        return sqlite3.connect(os.path.join(self.directory, 'posts.db'))
+
+    def construct_app(self):
+        self.posts = tornado_jsonapi.resource.DBAPI2Resource(
+            posts_schema, sqlite3, self.connect(), connect=self.connect)
+        self.posts._create_table()
+        shared = tornado_jsonapi.resource.DBAPI2Resource(
+            posts_schema, sqlite3, self.posts.connection)
+        return tornado.web.Application([
+            (
+                r"/api/posts/import",
+                tornado_jsonapi.handlers.ImportHandler,
+                dict(resource=self.posts, batch_size=3)
+            ),
+            (
+                r"/api/posts/shared-import",
+                tornado_jsonapi.handlers.ImportHandler,
+                dict(resource=shared, batch_size=3)
+            ),
+            (
+                r"/api/posts/counting-import",
+                CountingImportHandler,
+                dict(resource=self.posts)
+            ),
+            (
+                r"/api/posts/small-import",
+                tornado_jsonapi.handlers.ImportHandler,
+                dict(resource=self.posts, max_body_size=100)
+            ),
+            (
+                r"/api/posts/([^/]*)",
+                tornado_jsonapi.handlers.APIHandler,
+                dict(resource=self.posts)
+            ),
+        ], **tornado_jsonapi.handlers.not_found_handling_settings())
+
+    def import_(self, lines, content_type='application/x-ndjson',
+                path='/api/posts/import'):
+        res = self.fetch(path, method='POST',
+                         body='\n'.join(lines),
+                         headers={'Content-Type': content_type})
+        return res.code, json.loads(res.body.decode(encoding='UTF-8'))
+
+    def count(self):
+        res = self.app.get('/api/posts/')
+        return json.loads(res.body.decode(encoding='UTF-8'))['limits']['total']
+
+    def test_import(self):
+        lines = [json.dumps(self.generate_resource()['data'])
+                 for i in range(10)]
+        code, doc = self.import_(lines + [''])
+        assert code == status.HTTP_200_OK
+        assert doc['meta']['count'] == 10
+        assert self.count() == 10
+
+    def test_invalid_line(self):
+        lines = [json.dumps(self.generate_resource()['data'])
+                 for i in range(5)]
+        lines.append(json.dumps({'type': 'post',
+                                 'attributes': {'author': 'nobody'}}))
+        code, doc = self.import_(lines)
+        assert code == status.HTTP_400_BAD_REQUEST
+        assert doc['errors'][0]['source'] == {'pointer': '/5'}
+        assert self.count() == 0
+
+    def test_shared_connection(self):
+        # without connection of its own batches are committed separately
+        lines = [json.dumps(self.generate_resource()['data'])
+                 for i in range(5)]
+        lines.append('{}')
+        code, doc = self.import_(lines, path='/api/posts/shared-import')
+        assert code == status.HTTP_400_BAD_REQUEST
+        assert self.count() == 3
+
+    @gen_test
+    def test_isolated(self):
+        transaction = yield self.posts.begin_isolated()
+        assert transaction.connection is not self.posts.connection
+        bound = self.posts.bind(transaction)
+        yield bound.create_many([{'author': 'a', 'text': 'b'}] * 2)
+        # e.g. commit of concurrent request on shared connection
+        self.posts.connection.commit()
+        transaction.rollback()
+        count = yield self.posts.list_count()
+        assert count == 0
+
+    def test_max_body_size(self):
+        lines = [json.dumps(self.generate_resource()['data'])
+                 for i in range(5)]
+        res = self.fetch('/api/posts/small-import', method='POST',
+                         body='\n'.join(lines),
+                         headers={'Content-Type': 'application/x-ndjson'})
+        assert res.code == status.HTTP_400_BAD_REQUEST
+        assert self.count() == 0
+
+    @gen_test
+    def test_early_error(self):
+        chunk = b' ' * (1 << 20)
+
+        @tornado.gen.coroutine
+        def produce(write):
+            yield write(b'{}\n')
+            try:
+                for i in range(10):
+                    yield tornado.gen.sleep(0.01)
+                    yield write(chunk)
+            except StreamClosedError:
+                pass
+
+        CountingImportHandler.received = 0
+        with ExpectLog(app_log, 'API error'):
+            yield self.http_client.fetch(
+                self.get_url('/api/posts/counting-import'), method='POST',
+                headers={'Content-Type': 'application/x-ndjson'},
+                body_producer=produce, raise_error=False)
+        assert CountingImportHandler.received < 10 * len(chunk)
+
+    def test_failed_rollback(self):
+        class Transaction:
+            def rollback(self):
+                future = Future()
+                future.set_exception(ValueError('rollback failed'))
+                return future
+
+        def bind(transaction):
+            raise RuntimeError('bind failed')
+
+        self.posts.begin_isolated = Transaction
+        self.posts.bind = bind
+        with ExpectLog(app_log, 'Uncaught exception'), \
+                ExpectLog(app_log, 'Failed to roll back import'):
+            code, _ = self.import_([])
+        assert code == status.HTTP_500_INTERNAL_SERVER_ERROR
+
+    def test_content_type(self):
+        code, _ = self.import_([], self.content_type())
+        assert code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+
+    @gen_test
+    def test_copy_from(self):
+        psycopg2 = pytest.importorskip('psycopg2')
+        import dbapiext
+        self.addCleanup(dbapiext.set_paramstyle, sqlite3)
+
+        class Cursor:
+            def copy_expert(self, statement, file):
+                copies.append((statement, b''.join(iter(
+                    lambda: file.read(7), b''))))
+                self.rowcount = copies[-1][1].count(b'\n')
+
+            def close(self):
+                pass
+
+        class Connection:
+            def cursor(self):
+                return Cursor()
+
+            def commit(self):
+                copies.append('commit')
+
+        copies = []
+        posts = tornado_jsonapi.resource.DBAPI2Resource(
+            posts_schema, psycopg2, Connection())
+        count = yield posts.copy_from([{'author': 'a', 'text': 'b'},
+                                       {'author': 'c\td'}])
+        assert count == 2
+        assert copies == [
+            ('copy posts (text, author) from stdin',
+             b'b\ta\n\\N\tc\\td\n'),
+            'commit',
+        ]
+
+    def test_copy_lines(self):
+        lines = self.posts._copy_lines([
+            {'author': 'a\\b', 'text': 'tab\there\nnewline'},
+            {'author': None}])
+        assert b''.join(lines) == \
+            b'tab\\there\\nnewline\ta\\\\b\n\\N\t\\N\n'
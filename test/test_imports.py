@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import json
+import subprocess
+import sys
+import unittest
+
+
+class TestImports(unittest.TestCase):
+    def test_deferred(self):
+        output = subprocess.check_output([
+            sys.executable, '-c',
+            'import json, sys\n'
+            'import tornado_jsonapi.handlers, tornado_jsonapi.resource\n'
+            'print(json.dumps(sorted(sys.modules)))\n'
+        ], universal_newlines=True)
+        modules = json.loads(output)
+        for module in ('sqlalchemy', 'alchemyjsonschema', 'dbapiext', 'jsl',
+                       'jsonschema', 'python_jsonschema_objects'):
+            assert module not in modules
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import json
+import sqlite3
+import status
+import tornado.web
+from test import Posts, PostGenerator, BaseTestCase, posts_schema, \
+    comments_schema
+
+import tornado_jsonapi.handlers
+import tornado_jsonapi.resource
+
+
+class IncludeTests(PostGenerator):
+    def setUp(self):
+        # NB: this is only required when mixing several DBAPIs in one app
+        import dbapiext
+        dbapiext._query_cache.clear()
+        self.queries = []
+        super().setUp()
+        self.posts = [self.create('post', self.generate_post())
+                      for i in range(2)]
+        for post_id in (self.posts[0], self.posts[0], self.posts[1]):
+            self.create('comment',
+                        {'post_id': int(post_id),
+                         'text': self.generate_text()})
+        self.queries = []
+
+    def create(self, type_, attributes):
+        res = self.app.post(
+            '/api/{}s/'.format(type_),
+            json.dumps({'data': {'type': type_, 'attributes': attributes}}),
+            {'Content-Type': self.content_type()})
+        return json.loads(res.body.decode(encoding='UTF-8'))['data']['id']
+
+    def get(self, url, **kwargs):
+        res = self.app.get(url, **kwargs)
+        return json.loads(res.body.decode(encoding='UTF-8'))
+
+    def test_to_many(self):
+        doc = self.get('/api/posts/?include=comments')
+        assert len(self.queries) == 3  # list, count and comments
+        assert len(doc['included']) == 3
+        linkage = {p['id']: p['relationships']['comments']['data']
+                   for p in doc['data']}
+        assert len(linkage[self.posts[0]]) == 2
+        assert len(linkage[self.posts[1]]) == 1
+        assert all(r['type'] == 'comment' for r in doc['included'])
+
+    def test_to_one(self):
+        doc = self.get('/api/comments/?include=post')
+        assert len(self.queries) == 3  # list, count and posts
+        assert sorted(r['id'] for r in doc['included']) == \
+            sorted(self.posts)
+        linkage = [c['relationships']['post']['data'] for c in doc['data']]
+        assert sorted(r['id'] for r in linkage) == \
+            sorted([self.posts[0], self.posts[0], self.posts[1]])
+        assert all(r['type'] == 'post' for r in linkage)
+
+    def test_nested(self):
+        doc = self.get('/api/posts/{}?include=comments.post'.format(
+            self.posts[1]))
+        assert [r['type'] for r in doc['included']] == ['comment']
+
+    def test_linkage_without_include(self):
+        doc = self.get('/api/comments/')
+        assert 'included' not in doc
+        assert all('post' in c['relationships'] for c in doc['data'])
+
+    def test_unknown_relationship(self):
+        self.get('/api/posts/?include=author',
+                 status=status.HTTP_400_BAD_REQUEST)
+
+
+class TestDBAPI2Include(IncludeTests, BaseTestCase):
+    def construct_app(self):
+        connection = sqlite3.connect(':memory:')
+        connection.set_trace_callback(
+            lambda q: q.startswith('select') and self.queries.append(q))
+        posts = tornado_jsonapi.resource.DBAPI2Resource(
+            posts_schema, sqlite3, connection)
+        posts._create_table()
+        comments = tornado_jsonapi.resource.DBAPI2Resource(
+            comments_schema, sqlite3, connection)
+        comments._create_table()
+        posts.add_relationship('comments', comments, 'post_id', many=True)
+        comments.add_relationship('post', posts, 'post_id')
+        return tornado.web.Application([
+            (
+                r"/api/posts/([^/]*)",
+                tornado_jsonapi.handlers.APIHandler,
+                dict(resource=posts)
+            ),
+            (
+                r"/api/comments/([^/]*)",
+                tornado_jsonapi.handlers.APIHandler,
+                dict(resource=comments)
+            ),
+        ], **tornado_jsonapi.handlers.not_found_handling_settings())
+
+
+class TestSQLAlchemyInclude(IncludeTests, BaseTestCase):
+    def construct_app(self):
+        from sqlalchemy import create_engine, event, Column, Integer, \
+            String, ForeignKey
+        from sqlalchemy.ext.declarative import declarative_base
+        from sqlalchemy.orm import sessionmaker
+        engine = create_engine('sqlite:///:memory:')
+        event.listen(
+            engine, 'before_cursor_execute',
+            lambda conn, cursor, statement, *args:
+                statement.startswith('SELECT') and
+                self.queries.append(statement))
+        Base = declarative_base()
+
+        class Post(Base):
+            __tablename__ = 'posts'
+
+            id = Column(Integer, primary_key=True)
+            author = Column(String)
+            text = Column(String)
+
+        class Comment(Base):
+            __tablename__ = 'comments'
+
+            id = Column(Integer, primary_key=True)
+            post_id = Column(Integer, ForeignKey('posts.id'))
+            text = Column(String)
+
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        posts = tornado_jsonapi.resource.SQLAlchemyResource(Post, Session)
+        comments = tornado_jsonapi.resource.SQLAlchemyResource(
+            Comment, Session)
+        posts.add_relationship('comments', comments, 'post_id', many=True)
+        comments.add_relationship('post', posts, 'post_id')
+        return tornado.web.Application([
+            (
+                r"/api/posts/([^/]*)",
+                tornado_jsonapi.handlers.APIHandler,
+                dict(resource=posts)
+            ),
+            (
+                r"/api/comments/([^/]*)",
+                tornado_jsonapi.handlers.APIHandler,
+                dict(resource=comments)
+            ),
+        ], **tornado_jsonapi.handlers.not_found_handling_settings())
+
+
+class TestLegacyInclude(PostGenerator, BaseTestCase):
+    """
+    To-many relationship to resource whose ``list_`` takes no filters
+    """
+
+    def construct_app(self):
+        posts = tornado_jsonapi.resource.DBAPI2Resource(
+            posts_schema, sqlite3, sqlite3.connect(':memory:'))
+        posts._create_table()
+        posts.add_relationship('notes', Posts([]), 'post_id', many=True)
+        return tornado.web.Application([
+            (
+                r"/api/posts/([^/]*)",
+                tornado_jsonapi.handlers.APIHandler,
+                dict(resource=posts)
+            ),
+        ], **tornado_jsonapi.handlers.not_found_handling_settings())
+
+    def setUp(self):
+        # NB: this is only required when mixing several DBAPIs in one app
+        import dbapiext
+        dbapiext._query_cache.clear()
+        super().setUp()
+
+    def test_include(self):
+        self.app.post('/api/posts/', json.dumps(self.generate_resource()),
+                      {'Content-Type': self.content_type()})
+        res = self.app.get('/api/posts/?include=notes',
+                           status=status.HTTP_400_BAD_REQUEST)
+        doc = json.loads(res.body.decode(encoding='UTF-8'))
+        assert doc['errors'][0]['detail'] == \
+            'Filtering is not supported by resource "post"'
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import json
+import unittest
+import pytest
+import status
+import tornado.web
+from tornado import gen
+from tornado.httputil import HTTPHeaders, HTTPServerRequest
+from tornado.testing import gen_test
+from test import Posts, PostGenerator, SimpleAppMixin, BaseTestCase
+
+import tornado_jsonapi.handlers
+from tornado_jsonapi import limits
+
+
+class TestLimits(unittest.TestCase):
+    def test_static(self):
+        limit = limits.ConcurrencyLimit(2)
+        assert limit.acquire() and limit.acquire()
+        assert not limit.acquire()
+        assert limit.rejected == 1
+        limit.release(10.0, failed=True)
+        assert limit.limit == 2
+        assert limit.acquire()
+
+    def test_aimd(self):
+        limit = limits.AIMDLimit(initial=4, min_limit=2, backoff=0.5,
+                                 latency_threshold=0.1)
+        for i in range(3):
+            limit.acquire()
+        limit.release(0.01)
+        assert limit.limit == 5
+        limit.release(0.01)
+        assert limit.limit == 5  # not used enough to grow
+        limit.release(0.5)
+        assert limit.limit == 2.5
+        limit.acquire()
+        limit.release(0.01, failed=True)
+        assert limit.limit == 2
+
+    def test_gradient(self):
+        limit = limits.GradientLimit(initial=10, tolerance=1.5)
+        for i in range(50):
+            limit.acquire()
+            limit.release(0.01)
+        grown = limit.limit
+        assert grown > 10
+        for i in range(10):
+            limit.acquire()
+            limit.release(1.0)
+        assert limit.limit < grown
+        shrunk = limit.limit
+        limit.acquire()
+        limit.release(0.01, failed=True)
+        assert limit.limit == shrunk / 2
+
+
+class TestRateLimit(unittest.TestCase):
+    def test_buckets(self):
+        buckets = limits._Buckets(rate=2, burst=3)
+        assert [buckets.take('a', 0) for i in range(4)] == [0, 0, 0, 0.5]
+        assert buckets.take('b', 0) == 0
+        assert buckets.take('a', 0.5) == 0
+        assert buckets.take('a', 0.5) == 0.5
+        assert len(buckets) == 2
+        # buckets refilled completely are dropped
+        assert buckets.take('b', 1.5) == 0
+        assert len(buckets) == 2
+        assert buckets.take('c', 2.5) == 0
+        assert len(buckets) == 2
+        assert buckets.take('c', 10) == 0
+        assert len(buckets) == 1
+
+    def test_default_burst(self):
+        limit = limits.RateLimit(write_rate=0.5)
+        request = HTTPServerRequest('POST', '/')
+        assert limit.check(request) == 0
+        assert 1.9 < limit.check(request) <= 2
+        with pytest.raises(ValueError):
+            limits.RateLimit(read_rate=1, read_burst=0.5)
+
+    def test_api_key(self):
+        key = limits.api_key(keys={'known'})
+        request = HTTPServerRequest('GET', '/', headers=HTTPHeaders(
+            {'X-API-Key': 'known'}))
+        assert key(request) == 'known'
+        request.headers['X-API-Key'] = 'forged'
+        request.remote_ip = '10.0.0.1'
+        assert key(request) == '10.0.0.1'
+        assert limits.api_key()(request) == 'forged'
+
+    def test_many_clients(self):
+        buckets = limits._Buckets(rate=1, burst=1)
+        for i in range(100000):
+            buckets.take(i, i / 1000)
+        assert len(buckets) == 1000
+
+
+class SlowPosts(Posts):
+    @gen.coroutine
+    def list_(self, limit=0, page=0):
+        yield gen.sleep(0.1)
+        return super().list_(limit, page)
+
+
+class TestConcurrencyLimit(BaseTestCase):
+    def construct_app(self):
+        self.limit = limits.ConcurrencyLimit(1, retry_after=3)
+        return tornado.web.Application([
+            (
+                r"/api/posts/([^/]*)",
+                tornado_jsonapi.handlers.APIHandler,
+                dict(resource=SlowPosts([]))
+            ),
+        ], jsonapi_concurrency_limits={'post': self.limit})
+
+    @gen_test
+    def test_rejected(self):
+        responses = yield [
+            self.http_client.fetch(self.get_url('/api/posts/'),
+                                   raise_error=False)
+            for i in range(3)
+        ]
+        codes = sorted(res.code for res in responses)
+        assert codes == [200, 503, 503]
+        res = [res for res in responses if res.code == 503][0]
+        assert res.headers['Retry-After'] == '3'
+        doc = json.loads(res.body.decode(encoding='UTF-8'))
+        assert doc['errors'][0]['status'] == '503'
+        assert self.limit.in_flight == 0
+        assert self.limit.rejected == 2
+        res = yield self.http_client.fetch(self.get_url('/api/posts/'))
+        assert res.code == status.HTTP_200_OK
+
+
+class TestRateLimitHandler(SimpleAppMixin, PostGenerator, BaseTestCase):
+    def construct_app(self):
+        app = super().construct_app()
+        app.settings['jsonapi_rate_limit'] = limits.RateLimit(
+            read_rate=0.5, read_burst=2, write_rate=0.001, write_burst=1,
+            key=limits.api_key())
+        return app
+
+    def test_rate_limit(self):
+        for i in range(2):
+            self.app.get('/api/posts/')
+        res = self.app.get('/api/posts/',
+                           status=status.HTTP_429_TOO_MANY_REQUESTS)
+        assert res.headers['Retry-After'] == '2'
+        doc = json.loads(res.body.decode(encoding='UTF-8'))
+        assert doc['errors'][0]['status'] == '429'
+        self.app.get('/api/posts/', headers={'X-API-Key': 'other'})
+        # writes have separate budget
+        self.app.post('/api/posts/',
+                      json.dumps(self.generate_resource()),
+                      {'Content-Type': self.content_type()})
+        res = self.app.post('/api/posts/',
+                            json.dumps(self.generate_resource()),
+                            {'Content-Type': self.content_type()},
+                            status=status.HTTP_429_TOO_MANY_REQUESTS)
+        assert res.headers['Retry-After'] == '1000'
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import time
+import tornado.gen
+import tornado.web
+from tornado.log import app_log
+from tornado.testing import ExpectLog
+from test import Posts, BaseTestCase
+
+import tornado_jsonapi.handlers
+from tornado_jsonapi import metrics
+
+
+class BlockingPosts(Posts):
+    def list_(self, limit=0, page=0):
+        time.sleep(0.3)
+        return super().list_(limit, page)
+
+
+class TestLoopMonitor(BaseTestCase):
+    def construct_app(self):
+        return tornado.web.Application([
+            (
+                r"/api/posts/([^/]*)",
+                tornado_jsonapi.handlers.APIHandler,
+                dict(resource=BlockingPosts([]))
+            ),
+        ])
+
+    def setUp(self):
+        super().setUp()
+        self.monitor = metrics.LoopMonitor(interval=0.01, threshold=0.1)
+        self.monitor.start()
+
+    def tearDown(self):
+        self.monitor.stop()
+        super().tearDown()
+
+    def test_blocked(self):
+        with ExpectLog(app_log, r"IOLoop blocked for \d+\.\d{3}s in "
+                       r"BlockingPosts\.list_ called by "
+                       r"APIHandler GET /api/posts/"):
+            res = self.fetch('/api/posts/')
+            assert res.code == 200
+            self.io_loop.run_sync(lambda: tornado.gen.sleep(0.05))
+        assert self.monitor.blocked['BlockingPosts.list_'] == 1
+        assert self.monitor.blocked_seconds['BlockingPosts.list_'] >= 0.1
+        assert self.monitor.lag.count > 0
+        assert self.monitor.lag.counts[-1] == 0
+        text = metrics.Metrics(query_stats=None,
+                               loop_monitor=self.monitor).render()
+        assert 'tornado_jsonapi_loop_blocked_total' \
+            '{call="BlockingPosts.list_"} 1' in text
+        assert 'tornado_jsonapi_loop_lag_seconds_count' in text
+
+    def test_responsive(self):
+        self.io_loop.run_sync(lambda: tornado.gen.sleep(0.2))
+        assert not self.monitor.blocked
+        assert self.monitor.lag.count > 5
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import json
+import unittest
+import status
+from test import DBAPI2Mixin, PostGenerator, BaseTestCase
+
+from tornado_jsonapi import metrics
+
+
+class TestHistogram(unittest.TestCase):
+    def test_quantile(self):
+        h = metrics.Histogram((1, 2, 4))
+        assert h.quantile(0.5) is None
+        for value in (0.5, 1.5, 1.5, 3, 100):
+            h.observe(value)
+        assert h.counts == [1, 2, 1, 1]
+        assert h.quantile(0.5) == 1.75
+        assert h.quantile(0.99) == 4
+        assert h.sum == 106.5
+
+
+class TestMetrics(DBAPI2Mixin, PostGenerator, BaseTestCase):
+    def construct_app(self):
+        app = super().construct_app()
+        self.metrics = metrics.Metrics()
+        app.add_handlers(r'.*', [
+            (r'/metrics', metrics.MetricsHandler,
+             dict(metrics=self.metrics)),
+        ])
+        app.settings['jsonapi_timing_hooks'] = [self.metrics.record]
+        return app
+
+    def setUp(self):
+        # NB: this is only required when mixing several DBAPIs in one app
+        import dbapiext
+        dbapiext._query_cache.clear()
+        super().setUp()
+
+    def scrape(self):
+        res = self.app.get('/metrics')
+        assert res.headers['Content-Type'].startswith('text/plain')
+        samples = {}
+        for line in res.body.decode(encoding='UTF-8').splitlines():
+            if not line.startswith('#'):
+                name, value = line.rsplit(' ', 1)
+                samples[name] = float(value)
+        return samples
+
+    def test_metrics(self):
+        for i in range(2):
+            self.app.post('/api/posts/',
+                          json.dumps(self.generate_resource()),
+                          {'Content-Type': self.content_type()})
+        self.app.post('/api/posts/', 'rawr',
+                      {'Content-Type': self.content_type()},
+                      status=status.HTTP_400_BAD_REQUEST)
+        res = self.app.get('/api/posts/')
+        samples = self.scrape()
+        assert samples['tornado_jsonapi_requests_total'
+                       '{method="POST",resource="post",status="201"}'] == 2
+        assert samples['tornado_jsonapi_errors_total'
+                       '{method="POST",resource="post",status="400"}'] == 1
+        assert ('tornado_jsonapi_errors_total'
+                '{method="POST",resource="post",status="201"}') not in samples
+        assert samples['tornado_jsonapi_request_duration_seconds_count'
+                       '{method="POST",resource="post"}'] == 3
+        assert samples['tornado_jsonapi_request_duration_seconds_bucket'
+                       '{method="GET",resource="post",le="+Inf"}'] == 1
+        assert samples['tornado_jsonapi_backend_duration_seconds_count'
+                       '{method="POST",resource="post"}'] == 2
+        assert ('tornado_jsonapi_request_duration_quantile_seconds'
+                '{method="GET",quantile="0.99",resource="post"}') in samples
+        assert samples['tornado_jsonapi_rendered_resources_total'
+                       '{method="GET",resource="post"}'] == 2
+        assert samples['tornado_jsonapi_response_bytes_total'
+                       '{method="GET",resource="post"}'] == len(res.body)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import json
+import sqlite3
+import status
+import tornado.web
+from test import PostGenerator, BaseTestCase, posts_schema, comments_schema
+
+import tornado_jsonapi.handlers
+import tornado_jsonapi.resource
+
+
+class OperationsTests(PostGenerator):
+    def setUp(self):
+        # NB: this is only required when mixing several DBAPIs in one app
+        import dbapiext
+        dbapiext._query_cache.clear()
+        super().setUp()
+
+    def atomic_content_type(self):
+        return self.content_type() + \
+            '; ext="https://jsonapi.org/ext/atomic"'
+
+    def operations(self, operations, **kwargs):
+        res = self.app.post(
+            '/api/operations',
+            json.dumps({'atomic:operations': operations}),
+            {'Content-Type': self.atomic_content_type()},
+            **kwargs)
+        if not res.body:
+            return None
+        return json.loads(res.body.decode(encoding='UTF-8'))
+
+    def count(self, type_):
+        res = self.app.get('/api/{}s/'.format(type_))
+        return json.loads(res.body.decode(encoding='UTF-8'))['limits']['total']
+
+    def add_post(self, lid=None):
+        data = {'type': 'post', 'attributes': self.generate_post()}
+        if lid:
+            data['lid'] = lid
+        return {'op': 'add', 'data': data}
+
+    def test_add_with_lid(self):
+        doc = self.operations([
+            self.add_post('p'),
+            {'op': 'add', 'data': {
+                'type': 'comment',
+                'attributes': {'text': self.generate_text()},
+                'relationships': {
+                    'post': {'data': {'type': 'post', 'lid': 'p'}}}}},
+        ])
+        post, comment = [r['data'] for r in doc['atomic:results']]
+        assert comment['relationships']['post']['data'] == \
+            {'type': 'post', 'id': post['id']}
+        assert self.count('post') == 1
+        assert self.count('comment') == 1
+
+    def test_update_and_remove(self):
+        doc = self.operations([self.add_post(), self.add_post()])
+        first, second = [r['data']['id'] for r in doc['atomic:results']]
+        doc = self.operations([
+            {'op': 'update', 'data': {
+                'type': 'post', 'id': first,
+                'attributes': {'text': 'updated'}}},
+            {'op': 'remove', 'ref': {'type': 'post', 'id': second}},
+        ])
+        updated, removed = doc['atomic:results']
+        assert updated['data']['attributes']['text'] == 'updated'
+        assert removed == {}
+        assert self.count('post') == 1
+
+    def test_remove_only(self):
+        doc = self.operations([self.add_post()])
+        id_ = doc['atomic:results'][0]['data']['id']
+        assert self.operations(
+            [{'op': 'remove', 'ref': {'type': 'post', 'id': id_}}],
+            status=status.HTTP_204_NO_CONTENT) is None
+
+    def test_rollback(self):
+        doc = self.operations([
+            self.add_post('p'),
+            {'op': 'remove', 'ref': {'type': 'post', 'id': '31337'}},
+        ], status=status.HTTP_404_NOT_FOUND)
+        assert doc['errors'][0]['source'] == \
+            {'pointer': '/atomic:operations/1'}
+        assert self.count('post') == 0
+
+    def test_unknown_lid(self):
+        self.operations(
+            [{'op': 'remove', 'ref': {'type': 'post', 'lid': 'p'}}],
+            status=status.HTTP_400_BAD_REQUEST)
+
+    def test_unknown_type(self):
+        self.operations(
+            [{'op': 'add', 'data': {'type': 'tag', 'attributes': {}}}],
+            status=status.HTTP_404_NOT_FOUND)
+
+    def test_missing_extension(self):
+        self.app.post(
+            '/api/operations',
+            json.dumps({'atomic:operations': [self.add_post()]}),
+            {'Content-Type': self.content_type()},
+            status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+
+def operations_app(posts, comments):
+    posts.add_relationship('comments', comments, 'post_id', many=True)
+    comments.add_relationship('post', posts, 'post_id')
+    return tornado.web.Application([
+        (
+            r"/api/posts/([^/]*)",
+            tornado_jsonapi.handlers.APIHandler,
+            dict(resource=posts)
+        ),
+        (
+            r"/api/comments/([^/]*)",
+            tornado_jsonapi.handlers.APIHandler,
+            dict(resource=comments)
+        ),
+        (
+            r"/api/operations",
+            tornado_jsonapi.handlers.OperationsHandler,
+            dict(resources=[posts, comments])
+        ),
+    ], **tornado_jsonapi.handlers.not_found_handling_settings())
+
+
+class TestDBAPI2Operations(OperationsTests, BaseTestCase):
+    def construct_app(self):
+        connection = sqlite3.connect(':memory:')
+        posts = tornado_jsonapi.resource.DBAPI2Resource(
+            posts_schema, sqlite3, connection)
+        posts._create_table()
+        comments = tornado_jsonapi.resource.DBAPI2Resource(
+            comments_schema, sqlite3, connection)
+        comments._create_table()
+        return operations_app(posts, comments)
+
+
+class TestSQLAlchemyOperations(OperationsTests, BaseTestCase):
+    def construct_app(self):
+        from sqlalchemy import create_engine, Column, Integer, String, \
+            ForeignKey
+        from sqlalchemy.ext.declarative import declarative_base
+        from sqlalchemy.orm import sessionmaker
+        engine = create_engine('sqlite:///:memory:')
+        Base = declarative_base()
+
+        class Post(Base):
+            __tablename__ = 'posts'
+
+            id = Column(Integer, primary_key=True)
+            author = Column(String)
+            text = Column(String)
+
+        class Comment(Base):
+            __tablename__ = 'comments'
+
+            id = Column(Integer, primary_key=True)
+            post_id = Column(Integer, ForeignKey('posts.id'))
+            text = Column(String)
+
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        return operations_app(
+            tornado_jsonapi.resource.SQLAlchemyResource(Post, Session),
+            tornado_jsonapi.resource.SQLAlchemyResource(Comment, Session))
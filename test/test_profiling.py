@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import json
+import status
+from test import DBAPI2Mixin, PostGenerator, BaseTestCase
+
+from tornado_jsonapi import profiling
+
+
+class TestProfiling(DBAPI2Mixin, PostGenerator, BaseTestCase):
+    def construct_app(self):
+        app = super().construct_app()
+        self.profiler = profiling.Profiler('secret', maxlen=2, top=5)
+        app.add_handlers(r'.*', [
+            (r'/profiles/([^/]+)', profiling.ProfileHandler,
+             dict(profiler=self.profiler)),
+        ])
+        app.settings['jsonapi_profiler'] = self.profiler
+        return app
+
+    def setUp(self):
+        # NB: this is only required when mixing several DBAPIs in one app
+        import dbapiext
+        dbapiext._query_cache.clear()
+        super().setUp()
+
+    def test_profile(self):
+        res = self.app.post('/api/posts/',
+                            json.dumps(self.generate_resource()),
+                            {'Content-Type': self.content_type(),
+                             'X-Profile': 'secret',
+                             'X-Request-Id': 'abc'})
+        assert res.headers['X-Profile-Id'] == 'abc'
+        res = self.app.get('/profiles/abc', headers={'X-Profile': 'secret'})
+        profile = json.loads(res.body.decode(encoding='UTF-8'))
+        assert len(profile['functions']) == 5
+        assert all(f['calls'] > 0 for f in profile['functions'])
+        assert profile['functions'][0]['cumulative'] >= \
+            profile['functions'][-1]['cumulative']
+        for allocation in profile['allocations']:
+            assert allocation['size'] > 0
+        self.app.get('/profiles/abc', headers={'X-Profile': 'wrong'},
+                     status=status.HTTP_403_FORBIDDEN)
+        self.app.get('/profiles/xyz', headers={'X-Profile': 'secret'},
+                     status=status.HTTP_404_NOT_FOUND)
+
+    def test_not_profiled(self):
+        for headers in ({}, {'X-Profile': 'wrong'}):
+            res = self.app.get('/api/posts/', headers=headers)
+            assert 'X-Profile-Id' not in res.headers
+        assert not self.profiler.profiles
+
+    def test_errors(self):
+        res = self.app.post('/api/posts/', 'rawr',
+                            {'Content-Type': self.content_type(),
+                             'X-Profile': 'secret'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        assert res.headers['X-Profile-Id'] in self.profiler.profiles
+
+    def test_maxlen(self):
+        for i in range(3):
+            self.app.get('/api/posts/', headers={'X-Profile': 'secret',
+                                                 'X-Request-Id': str(i)})
+        assert list(self.profiler.profiles) == ['1', '2']
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import json
+import logging
+import unittest
+from tornado.log import app_log
+from tornado.testing import ExpectLog
+from test import DBAPI2Mixin, SQLAlchemyMixin, PostGenerator, BaseTestCase
+
+from tornado_jsonapi import metrics
+
+
+class TestQueryStats(unittest.TestCase):
+    def test_record(self):
+        stats = metrics.QueryStats(slow_threshold=None)
+        stats.record('select a from t where id in (?, ?)', [1, 2], 0.25)
+        stats.record('select a from t where id in (?,?,?)', [1, 2, 3], 0.5)
+        stats.record('insert into t (a, b) values (%s, %s), (%s, %s)',
+                     [1, 2, 3, 4], 0.125)
+        stats.record('select a, t2.b from t limit 10 offset 20', [], 0.25)
+        stats.record("select a, t2.b from t where c = 'x' limit 5 offset 0",
+                     [], 0.25)
+        stats.record("select a, t2.b from t where c = 'y' limit 10", [],
+                     0.25)
+        assert stats.statements == {
+            'select a from t where id in (?)': [2, 0.75, 0.5],
+            'insert into t (a, b) values (?)': [1, 0.125, 0.125],
+            'select a, t2.b from t limit ? offset ?': [1, 0.25, 0.25],
+            'select a, t2.b from t where c = ? limit ? offset ?':
+                [1, 0.25, 0.25],
+            'select a, t2.b from t where c = ? limit ?': [1, 0.25, 0.25],
+        }
+        text = stats.render()
+        assert 'tornado_jsonapi_statements_total' \
+            '{statement="select a from t where id in (?)"} 2' in text
+        assert 'tornado_jsonapi_statement_duration_max_seconds' \
+            '{statement="select a from t where id in (?)"} 0.5' in text
+
+    def test_slow(self):
+        stats = metrics.QueryStats(slow_threshold=0.5)
+        with ExpectLog(app_log, r"(?s)Slow statement \(1\.000s\).*"
+                       r"Parameters: \['<str>', None\]\nRequest: unknown"):
+            stats.record('select 1 where a = ? and b = ?', ['secret', None],
+                         1.0)
+        stats.redact = False
+        with ExpectLog(app_log, r"(?s).*Parameters: \['secret'\]"):
+            stats.record('select 1 where a = ?', ['secret'], 0.5)
+        handler = logging.Handler()
+        handler.emit = lambda record: self.fail('Logged %s' % record)
+        app_log.addHandler(handler)
+        try:
+            stats.record('select 1', [], 0.1)
+        finally:
+            app_log.removeHandler(handler)
+
+
+class TestSQLAlchemyFailure(unittest.TestCase):
+    def setUp(self):
+        self.query_stats = metrics.query_stats
+        metrics.query_stats = metrics.QueryStats(slow_threshold=None)
+
+    def tearDown(self):
+        metrics.query_stats = self.query_stats
+
+    def test_failed_statement(self):
+        from sqlalchemy import create_engine, exc, Column, Integer
+        from sqlalchemy.ext.declarative import declarative_base
+        from sqlalchemy.orm import sessionmaker
+        from tornado_jsonapi.resource import SQLAlchemyResource
+
+        class Post(declarative_base()):
+            __tablename__ = 'posts'
+            id = Column(Integer, primary_key=True)
+
+        engine = create_engine('sqlite:///:memory:')
+        SQLAlchemyResource(Post, sessionmaker(bind=engine))
+        with engine.connect() as connection:
+            with self.assertRaises(exc.OperationalError):
+                connection.execute('select * from missing')
+            assert connection.info['query_start'] == []
+            connection.execute('select 1')
+        assert set(metrics.query_stats.statements) == {
+            'select * from missing', 'select ?'}
+
+
+class QueryStatsMixin(PostGenerator):
+    def setUp(self):
+        # NB: this is only required when mixing several DBAPIs in one app
+        import dbapiext
+        dbapiext._query_cache.clear()
+        self.query_stats = metrics.query_stats
+        metrics.query_stats = metrics.QueryStats(slow_threshold=0)
+        super().setUp()
+
+    def tearDown(self):
+        metrics.query_stats = self.query_stats
+        super().tearDown()
+
+    def test_statements(self):
+        with ExpectLog(app_log, r"(?s)Slow statement.*"
+                       r"Request: POST /api/posts/ \("):
+            self.app.post('/api/posts/',
+                          json.dumps(self.generate_resource()),
+                          {'Content-Type': self.content_type()})
+        self.app.get('/api/posts/')
+        statements = metrics.query_stats.statements
+        assert any(s.startswith('INSERT INTO posts') or
+                   s.startswith('insert into posts') for s in statements)
+        assert all(stats[0] >= 1 for stats in statements.values())
+
+
+class TestDBAPI2(QueryStatsMixin, DBAPI2Mixin, BaseTestCase):
+    pass
+
+
+class TestSQLAlchemy(QueryStatsMixin, SQLAlchemyMixin, BaseTestCase):
+    pass
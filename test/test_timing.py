@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import json
+import status
+from test import DBAPI2Mixin, PostGenerator, BaseTestCase
+
+
+class TestTiming(DBAPI2Mixin, PostGenerator, BaseTestCase):
+    def construct_app(self):
+        app = super().construct_app()
+        self.reports = []
+        app.settings['jsonapi_server_timing'] = True
+        app.settings['jsonapi_timing_hooks'] = [
+            lambda handler, timings: self.reports.append(
+                (handler.request.method, handler.get_status(), dict(timings)))
+        ]
+        return app
+
+    def setUp(self):
+        # NB: this is only required when mixing several DBAPIs in one app
+        import dbapiext
+        dbapiext._query_cache.clear()
+        super().setUp()
+
+    def phases(self, res):
+        return [t.split(';')[0]
+                for t in res.headers['Server-Timing'].split(', ')]
+
+    def test_phases(self):
+        res = self.app.post('/api/posts/',
+                            json.dumps(self.generate_resource()),
+                            {'Content-Type': self.content_type()})
+        assert self.phases(res) == \
+            ['prepare', 'decode', 'backend', 'render', 'encode']
+        res = self.app.get(res.location)
+        assert self.phases(res) == ['prepare', 'backend', 'render', 'encode']
+        for timing in res.headers['Server-Timing'].split(', '):
+            assert float(timing.split(';dur=')[1]) >= 0
+
+    def test_hooks(self):
+        self.app.get('/api/posts/1')
+        self.app.post('/api/posts/', 'rawr',
+                      {'Content-Type': self.content_type()},
+                      status=status.HTTP_400_BAD_REQUEST)
+        (get, get_status, get_timings), (post, post_status, post_timings) = \
+            self.reports
+        assert (get, get_status) == ('GET', status.HTTP_200_OK)
+        assert 'backend' in get_timings
+        assert (post, post_status) == ('POST', status.HTTP_400_BAD_REQUEST)
+        assert 'decode' in post_timings and 'backend' not in post_timings
+
+    def test_disabled(self):
+        self.get_app().settings['jsonapi_server_timing'] = False
+        res = self.app.get('/api/posts/')
+        assert 'Server-Timing' not in res.headers
+        assert len(self.reports) == 1
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import io
+import json
+import unittest
+from test import DBAPI2Mixin, SQLAlchemyMixin, PostGenerator, BaseTestCase
+
+from tornado_jsonapi import tracing
+
+
+class TestExporters(unittest.TestCase):
+    def test_stream(self):
+        stream = io.StringIO()
+        tracer = tracing.Tracer(tracing.StreamExporter(stream))
+        parent = tracing.SpanContext('a' * 32, 'b' * 16)
+        tracer.start_span('request', parent, uri='/').finish()
+        span = json.loads(stream.getvalue())
+        assert span['name'] == 'request'
+        assert span['trace_id'] == 'a' * 32
+        assert span['parent_id'] == 'b' * 16
+        assert len(span['span_id']) == 16
+        assert span['attributes'] == {'uri': '/'}
+        assert span['duration'] >= 0
+
+    def test_extract(self):
+        tracer = tracing.Tracer(tracing.MemoryExporter())
+        assert tracer.extract({}) is None
+        assert tracer.extract({'traceparent': 'garbage'}) is None
+        assert tracer.extract({
+            'traceparent': '00-%s-%s-01' % ('1' * 32, '2' * 16)
+        }) == ('1' * 32, '2' * 16)
+
+
+class TracingMixin(PostGenerator):
+    def construct_app(self):
+        app = super().construct_app()
+        self.exporter = tracing.MemoryExporter()
+        app.settings['jsonapi_tracer'] = tracing.Tracer(self.exporter)
+        return app
+
+    def setUp(self):
+        # NB: this is only required when mixing several DBAPIs in one app
+        import dbapiext
+        dbapiext._query_cache.clear()
+        super().setUp()
+
+    def spans(self):
+        return {span.name: span for span in self.exporter.spans}
+
+    def test_request(self):
+        traceparent = '00-%s-%s-01' % ('1' * 32, '2' * 16)
+        self.app.post('/api/posts/',
+                      json.dumps(self.generate_resource()),
+                      {'Content-Type': self.content_type(),
+                       'traceparent': traceparent})
+        spans = self.spans()
+        request = spans['request']
+        assert request.context.trace_id == '1' * 32
+        assert request.parent_id == '2' * 16
+        assert request.attributes['status'] == 201
+        assert request.attributes['method'] == 'POST'
+        for name in ('prepare', 'decode', 'validate', 'backend', 'render',
+                     'encode'):
+            assert spans[name].context.trace_id == '1' * 32
+            assert spans[name].start <= spans[name].end <= request.end
+        backends = set(s.context.span_id for s in self.exporter.spans
+                       if s.name == 'backend')
+        statements = [s for s in self.exporter.spans if s.name == 'sql']
+        assert all(s.parent_id in backends for s in statements)
+        assert any('insert' in s.attributes['statement'].lower()
+                   for s in statements)
+        assert self.exporter.spans[-1] is request
+
+    def test_render_span(self):
+        for i in range(3):
+            self.app.post('/api/posts/',
+                          json.dumps(self.generate_resource()),
+                          {'Content-Type': self.content_type()})
+        self.exporter.clear()
+        self.app.get('/api/posts/')
+        spans = self.spans()
+        assert spans['request'].parent_id is None
+        assert [s.name for s in self.exporter.spans].count('render') == 1
+        assert spans['render'].attributes['count'] == 3
+        assert spans['render'].parent_id == \
+            spans['request'].context.span_id
+
+
+class TestDBAPI2(TracingMixin, DBAPI2Mixin, BaseTestCase):
+    pass
+
+
+class TestSQLAlchemy(TracingMixin, SQLAlchemyMixin, BaseTestCase):
+    pass
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import json
+import sqlite3
+import unittest
+import status
+import pytest
+from test import DBAPI2Mixin, PostGenerator, BaseTestCase, posts_schema, \
+    comments_schema
+
+import tornado_jsonapi.handlers
+import tornado_jsonapi.resource
+from tornado_jsonapi import _schemas
+from tornado_jsonapi._validation import compile_schema, ValidationError
+
+
+class TestCompiledSchema(unittest.TestCase):
+    def error(self, validate, document):
+        with pytest.raises(ValidationError) as info:
+            validate(document)
+        return str(info.value)
+
+    def test_attributes(self):
+        validate = compile_schema(posts_schema)
+        validate({'text': 'a', 'author': 'b'})
+        assert self.error(validate, {}) == \
+            "'['author', 'text']' are required attributes for post"
+        assert self.error(validate, {'text': 'a', 'author': 1}) == \
+            "1 is not a string \nwhile setting 'author' in post"
+        assert self.error(validate, {'text': None, 'author': 'b'}) == \
+            "None is not a string \nwhile setting 'text' in post"
+        assert self.error(validate, {'text': 'a', 'author': 'b', 'x': 1}) \
+            == "Attempted to set unknown property 'x', but " \
+            "'additionalProperties' is false. \nwhile setting 'x' in post"
+        assert self.error(compile_schema(comments_schema),
+                          {'post_id': True, 'text': 'a'}) == \
+            "True is not an integer \nwhile setting 'post_id' in comment"
+
+    def test_document(self):
+        validate = _schemas.postDataValidator()
+        validate({'data': {'type': 'post', 'attributes': {'x': [1]}}})
+        assert self.error(validate, {'data': {}}) == \
+            "'['type']' are required attributes for resource " \
+            "\nwhile setting 'data' in data"
+        assert self.error(validate, {'data': {'type': 'post', 'id': 5}}) == \
+            "5 is not a string \nwhile setting 'id' in resource " \
+            "\nwhile setting 'data' in data"
+        assert self.error(validate, {'data': None}) == \
+            "None is not an object \nwhile setting 'data' in data"
+        assert self.error(_schemas.operationsValidator(),
+                          {'atomic:operations': [{'op': 'x'}]}) == \
+            "x is not one of ['add', 'update', 'remove'] " \
+            "\nwhile setting 'op' in operation " \
+            "\nwhile setting 'atomic:operations' in operations"
+        assert self.error(_schemas.batchValidator(),
+                          {'queries': [{'type': 'post', 'limit': -1}]}) == \
+            "-1 is less than 0 \nwhile setting 'limit' in query " \
+            "\nwhile setting 'queries' in batch"
+
+    def test_schema_left_intact(self):
+        schema = json.loads(json.dumps(posts_schema))
+        compile_schema(schema)
+        assert schema == posts_schema
+
+    def test_fallback(self):
+        validate = compile_schema({
+            'title': 'thing',
+            'type': 'object',
+            'properties': {'name': {'type': 'string'}},
+            'required': ['name'],
+            'patternProperties': {'^x-': {}},
+        })
+        validate({'name': 'a'})
+        assert self.error(validate, {}) == \
+            "'['name']' are required attributes for thing"
+
+
+class TestSchemaCache(unittest.TestCase):
+    def test_shared(self):
+        first, second = [
+            tornado_jsonapi.resource.DBAPI2Resource(
+                json.loads(json.dumps(posts_schema)), sqlite3, None)
+            for i in range(2)
+        ]
+        assert first._schema is second._schema
+        assert first._validate is second._validate
+        other = tornado_jsonapi.resource.DBAPI2Resource(
+            comments_schema, sqlite3, None)
+        assert other._schema is not first._schema
+
+    def test_warm_up(self):
+        _schemas._batchValidator = None
+        tornado_jsonapi.handlers.warm_up()
+        assert _schemas._batchValidator is not None
+
+
+class TestValidation(DBAPI2Mixin, PostGenerator, BaseTestCase):
+    def test_not_an_object(self):
+        for data in (None, 1, {'type': 'post', 'attributes': 5}):
+            res = self.app.post(
+                '/api/posts/',
+                json.dumps({'data': data}),
+                {'Content-Type': self.content_type()},
+                status=status.HTTP_400_BAD_REQUEST)
+            doc = json.loads(res.body.decode(encoding='UTF-8'))
+            assert 'is not an object' in doc['errors'][0]['detail']
+
+    def test_missing_data(self):
+        id_ = json.loads(self.app.post(
+            '/api/posts/',
+            json.dumps(self.generate_resource()),
+            {'Content-Type': self.content_type()}
+        ).body.decode(encoding='UTF-8'))['data']['id']
+        for method, url in (('post', '/api/posts/'),
+                            ('patch', '/api/posts/' + id_)):
+            res = getattr(self.app, method)(
+                url, '{}', {'Content-Type': self.content_type()},
+                status=status.HTTP_400_BAD_REQUEST)
+            doc = json.loads(res.body.decode(encoding='UTF-8'))
+            assert doc['errors'][0]['detail'] == \
+                "'['data']' are required attributes for data"
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import json
+import sqlite3
+import status
+import tornado.web
+from tornado.log import app_log
+from tornado.testing import AsyncTestCase, ExpectLog, gen_test
+from test import PostGenerator, BaseTestCase, posts_schema
+
+import tornado_jsonapi.handlers
+import tornado_jsonapi.resource
+import tornado_jsonapi.writes
+
+
+class TestCoalescingResource(PostGenerator, AsyncTestCase):
+    def setUp(self):
+        # NB: this is only required when mixing several DBAPIs in one app
+        import dbapiext
+        dbapiext._query_cache.clear()
+        super().setUp()
+        # sqlite3 inserts rows one by one, but in single transaction
+        self.commits = []
+        connection = sqlite3.connect(':memory:')
+        self.posts = tornado_jsonapi.resource.DBAPI2Resource(
+            posts_schema, sqlite3, connection)
+        self.posts._create_table()
+        connection.set_trace_callback(
+            lambda q: q == 'COMMIT' and self.commits.append(q))
+
+    @gen_test
+    def test_coalescing(self):
+        resource = tornado_jsonapi.writes.CoalescingResource(
+            self.posts, delay=0.01)
+        posts = [self.generate_post() for i in range(5)]
+        created = yield [resource.create(p) for p in posts]
+        assert len(self.commits) == 1
+        assert [r.attributes() for r in created] == posts
+        assert len(set(r.id_() for r in created)) == 5
+
+    @gen_test
+    def test_max_size(self):
+        resource = tornado_jsonapi.writes.CoalescingResource(
+            self.posts, delay=10, max_size=2)
+        created = yield [resource.create(self.generate_post())
+                         for i in range(4)]
+        assert len(self.commits) == 2
+        assert len(created) == 4
+
+    @gen_test
+    def test_bad_row(self):
+        resource = tornado_jsonapi.writes.CoalescingResource(
+            self.posts, delay=0.01)
+        good = resource.create(self.generate_post())
+        bad = resource.create({'author': 'nobody', 'text': None})
+        post = yield good
+        assert post.attributes()['author'] != 'nobody'
+        with self.assertRaises(sqlite3.IntegrityError):
+            yield bad
+
+
+class TestSQLAlchemyCoalescing(PostGenerator, AsyncTestCase):
+    def setUp(self):
+        from sqlalchemy import create_engine, Column, Integer, String
+        from sqlalchemy.ext.declarative import declarative_base
+        from sqlalchemy.orm import sessionmaker
+        super().setUp()
+        engine = create_engine('sqlite:///:memory:')
+        Base = declarative_base()
+
+        class Post(Base):
+            __tablename__ = 'posts'
+
+            id = Column(Integer, primary_key=True)
+            author = Column(String)
+            text = Column(String, nullable=False)
+
+        Base.metadata.create_all(engine)
+        self.posts = tornado_jsonapi.resource.SQLAlchemyResource(
+            Post, sessionmaker(bind=engine))
+
+    @gen_test
+    def test_bad_row(self):
+        from sqlalchemy.exc import IntegrityError
+        resource = tornado_jsonapi.writes.CoalescingResource(
+            self.posts, delay=0.01)
+        good = resource.create(self.generate_post())
+        bad = resource.create({'author': 'nobody', 'text': None})
+        post = yield good
+        assert post.attributes()['author'] != 'nobody'
+        with self.assertRaises(IntegrityError):
+            yield bad
+        post = yield resource.create(self.generate_post())
+        assert self.posts.list_count() == 2
+
+    @gen_test
+    def test_write_behind_bad_row(self):
+        resource = tornado_jsonapi.writes.WriteBehindResource(self.posts)
+        jobs = [resource.enqueue(self.generate_post()),
+                resource.enqueue({'author': 'nobody', 'text': None}),
+                resource.enqueue(self.generate_post())]
+        with ExpectLog(app_log, 'Failed to create post'):
+            yield resource.join()
+        assert [j.status for j in jobs] == ['done', 'failed', 'done']
+        job = resource.enqueue(self.generate_post())
+        yield resource.join()
+        assert job.status == 'done'
+        assert self.posts.list_count() == 3
+
+
+class TestWriteBehind(PostGenerator, BaseTestCase):
+    def construct_app(self):
+        posts = tornado_jsonapi.resource.DBAPI2Resource(
+            posts_schema, sqlite3, sqlite3.connect(':memory:'))
+        posts._create_table()
+        self.posts = tornado_jsonapi.writes.WriteBehindResource(
+            posts, max_size=2, retry_after=5)
+        return tornado.web.Application([
+            (
+                r"/api/posts/queue-jobs/([^/]*)",
+                tornado_jsonapi.handlers.JobHandler,
+                dict(resource=self.posts)
+            ),
+            (
+                r"/api/posts/([^/]*)",
+                tornado_jsonapi.handlers.APIHandler,
+                dict(resource=self.posts)
+            ),
+        ], **tornado_jsonapi.handlers.not_found_handling_settings())
+
+    def setUp(self):
+        # NB: this is only required when mixing several DBAPIs in one app
+        import dbapiext
+        dbapiext._query_cache.clear()
+        super().setUp()
+
+    def post(self, **kwargs):
+        return self.app.post('/api/posts/',
+                             json.dumps(self.generate_resource()),
+                             {'Content-Type': self.content_type()},
+                             **kwargs)
+
+    def test_write_behind(self):
+        res = self.post(status=status.HTTP_202_ACCEPTED)
+        job = json.loads(res.body.decode(encoding='UTF-8'))['data']
+        assert job['attributes']['status'] == 'pending'
+        assert res.headers['Content-Location'] == job['links']['self']
+        self.app.get(job['links']['self'], status=status.HTTP_200_OK)
+        self.io_loop.run_sync(self.posts.join)
+        res = self.app.get(job['links']['self'],
+                           status=status.HTTP_303_SEE_OTHER)
+        res = self.app.get(res.headers['Location'])
+        post = json.loads(res.body.decode(encoding='UTF-8'))['data']
+        assert post['type'] == 'post'
+
+    def test_backpressure(self):
+        self.post()
+        self.post()
+        res = self.post(status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        assert res.headers['Retry-After'] == '5'
+        self.io_loop.run_sync(self.posts.join)
+        self.post(status=status.HTTP_202_ACCEPTED)
+
+    def test_unknown_job(self):
+        self.app.get('/api/posts/queue-jobs/foo',
+                     status=status.HTTP_404_NOT_FOUND)
@@ -15,6 +15,42 @@ Resources
 .. automodule:: tornado_jsonapi.resource
    :members:
 
+Writes
+------
+
+.. automodule:: tornado_jsonapi.writes
+   :members:
+
+Limits
+------
+
+.. automodule:: tornado_jsonapi.limits
+   :members:
+
+Compression
+-----------
+
+.. automodule:: tornado_jsonapi.compression
+   :members:
+
+Metrics
+-------
+
+.. automodule:: tornado_jsonapi.metrics
+   :members:
+
+Profiling
+---------
+
+.. automodule:: tornado_jsonapi.profiling
+   :members:
+
+Tracing
+-------
+
+.. automodule:: tornado_jsonapi.tracing
+   :members:
+
 Exceptions
 ----------
 
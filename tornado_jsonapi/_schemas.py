@@ -2,8 +2,8 @@
 # vim: set fileencoding=utf8 :
 
 import jsl
-import python_jsonschema_objects as pjs
-import inflection
+
+from ._validation import compile_schema
 
 
 class Meta(jsl.Document):
@@ -41,7 +41,7 @@ class PostResource(jsl.Document):
 
 
 class PostData(jsl.Document):
-    data = jsl.DocumentField(PostResource, as_ref=True)
+    data = jsl.DocumentField(PostResource, as_ref=True, required=True)
 
     class Options(object):
         title = "Data"
@@ -60,35 +60,177 @@ class PatchResource(jsl.Document):
 
 
 class PatchData(jsl.Document):
-    data = jsl.DocumentField(PatchResource, as_ref=True)
+    data = jsl.DocumentField(PatchResource, as_ref=True, required=True)
 
     class Options(object):
         title = "Data"
         definition_id = "data"
 
 
-def _build_schema(cls):
-    builder = pjs.ObjectBuilder(cls.get_schema())
-    classes = builder.build_classes()
-    name = inflection.camelize(cls.get_definition_id())
-    return classes[name]
+class BulkPostData(jsl.Document):
+    data = jsl.ArrayField(
+        jsl.DocumentField(PostResource, as_ref=True), required=True
+    )
+
+    class Options(object):
+        title = "Data"
+        definition_id = "data"
+
+
+class BulkPatchData(jsl.Document):
+    data = jsl.ArrayField(
+        jsl.DocumentField(PatchResource, as_ref=True), required=True
+    )
+
+    class Options(object):
+        title = "Data"
+        definition_id = "data"
+
+
+class Ref(jsl.Document):
+    type = jsl.StringField(required=True)
+    id = jsl.StringField()
+    lid = jsl.StringField()
+    relationship = jsl.StringField()
+
+    class Options(object):
+        definition_id = "ref"
+
+
+class OperationResource(jsl.Document):
+    type = jsl.StringField(required=True)
+    id = jsl.StringField()
+    lid = jsl.StringField()
+    attributes = jsl.DictField(additional_properties=True)
+    relationships = jsl.DictField(additional_properties=True)
+    links = jsl.DocumentField(Links, as_ref=True)
+    meta = jsl.DocumentField(Meta, as_ref=True)
+
+    class Options(object):
+        definition_id = "resource"
+
+
+class Operation(jsl.Document):
+    op = jsl.StringField(enum=["add", "update", "remove"], required=True)
+    ref = jsl.DocumentField(Ref, as_ref=True)
+    data = jsl.DocumentField(OperationResource, as_ref=True)
+    meta = jsl.DocumentField(Meta, as_ref=True)
+
+    class Options(object):
+        definition_id = "operation"
+
+
+class Operations(jsl.Document):
+    operations = jsl.ArrayField(
+        jsl.DocumentField(Operation, as_ref=True),
+        required=True,
+        min_items=1,
+        name="atomic:operations",
+    )
+
+    class Options(object):
+        title = "Operations"
+        definition_id = "operations"
+
+
+class Query(jsl.Document):
+    type = jsl.StringField(required=True)
+    id = jsl.StringField()
+    filter = jsl.DictField(additional_properties=True)
+    sort = jsl.StringField()
+    include = jsl.StringField()
+    fields = jsl.StringField()
+    limit = jsl.IntField(minimum=0)
+    page = jsl.IntField(minimum=0)
+
+    class Options(object):
+        definition_id = "query"
+
+
+class Batch(jsl.Document):
+    queries = jsl.ArrayField(
+        jsl.DocumentField(Query, as_ref=True), required=True, min_items=1
+    )
+
+    class Options(object):
+        title = "Batch"
+        definition_id = "batch"
+
+
+def _compile(cls):
+    return compile_schema(cls.get_schema())
+
+
+_postDataValidator = None
+
+
+def postDataValidator():
+    global _postDataValidator
+    if _postDataValidator is None:
+        _postDataValidator = _compile(PostData)
+    return _postDataValidator
+
+
+_patchDataValidator = None
+
+
+def patchDataValidator():
+    global _patchDataValidator
+    if _patchDataValidator is None:
+        _patchDataValidator = _compile(PatchData)
+    return _patchDataValidator
+
+
+_bulkPostDataValidator = None
+
+
+def bulkPostDataValidator():
+    global _bulkPostDataValidator
+    if _bulkPostDataValidator is None:
+        _bulkPostDataValidator = _compile(BulkPostData)
+    return _bulkPostDataValidator
+
+
+_bulkPatchDataValidator = None
+
+
+def bulkPatchDataValidator():
+    global _bulkPatchDataValidator
+    if _bulkPatchDataValidator is None:
+        _bulkPatchDataValidator = _compile(BulkPatchData)
+    return _bulkPatchDataValidator
+
+
+_operationsValidator = None
 
 
-_postDataSchema = None
+def operationsValidator():
+    global _operationsValidator
+    if _operationsValidator is None:
+        _operationsValidator = _compile(Operations)
+    return _operationsValidator
 
 
-def postDataSchema():
-    global _postDataSchema
-    if _postDataSchema is None:
-        _postDataSchema = _build_schema(PostData)
-    return _postDataSchema
+_batchValidator = None
 
 
-_patchDataSchema = None
+def batchValidator():
+    global _batchValidator
+    if _batchValidator is None:
+        _batchValidator = _compile(Batch)
+    return _batchValidator
 
 
-def patchDataSchema():
-    global _patchDataSchema
-    if _patchDataSchema is None:
-        _patchDataSchema = _build_schema(PatchData)
-    return _patchDataSchema
+def warm_up():
+    """
+    Build all the validators right away
+    """
+    for validator in (
+        postDataValidator,
+        patchDataValidator,
+        bulkPostDataValidator,
+        bulkPatchDataValidator,
+        operationsValidator,
+        batchValidator,
+    ):
+        validator()
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+"""
+Compilation of JSON schemas into validating functions working on plain
+decoded documents. Error messages follow those of
+:py:mod:`python_jsonschema_objects`, which is still used for schemas having
+keywords not supported here.
+"""
+
+import copy
+import inflection
+import json
+import re
+
+
+class ValidationError(ValueError):
+    """
+    Document does not match JSON schema
+    """
+
+
+class _Unsupported(Exception):
+    pass
+
+
+# keywords not affecting validation
+_annotations = frozenset(
+    ["$schema", "id", "title", "description", "default", "definitions"]
+)
+
+
+def _is_integer(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+# type name -> (check, error message)
+_types = {
+    "boolean": (lambda v: isinstance(v, bool), "{0} is not a boolean"),
+    "integer": (_is_integer, "{0} is not an integer"),
+    "number": (_is_number, "{0} is neither an integer or a float"),
+    "null": (lambda v: v is None, "{0} is not None"),
+    "string": (lambda v: isinstance(v, str), "{0} is not a string"),
+    "array": (lambda v: isinstance(v, list), "{0} is not an array"),
+    "object": (lambda v: isinstance(v, dict), "{0} is not an object"),
+}
+
+
+def _any(value):
+    pass
+
+
+def _chain(checks):
+    if not checks:
+        return _any
+    if len(checks) == 1:
+        return checks[0]
+
+    def validate(value):
+        for check in checks:
+            check(value)
+
+    return validate
+
+
+class _Compiler:
+    def __init__(self, root):
+        self._root = root
+        self._refs = {}
+
+    def compile(self, schema, name):
+        if "$ref" in schema:
+            return self._ref(schema["$ref"])
+        checks = []
+        for keyword in schema:
+            if keyword in _annotations or keyword.startswith("x-"):
+                continue
+            method = getattr(self, "_" + keyword, None)
+            if method is None:
+                if keyword in _ignored:
+                    continue
+                raise _Unsupported(keyword)
+            checks.append(method(schema[keyword], schema, name))
+        return _chain([c for c in checks if c is not None])
+
+    def _ref(self, ref):
+        if not ref.startswith("#"):
+            raise _Unsupported(ref)
+        if ref not in self._refs:
+            self._refs[ref] = None
+            schema = self._root
+            for part in ref[1:].split("/")[1:]:
+                schema = schema[part.replace("~1", "/").replace("~0", "~")]
+            self._refs[ref] = self.compile(schema, ref.rsplit("/", 1)[-1])
+        if self._refs[ref] is None:  # recursive reference
+            return lambda value: self._refs[ref](value)
+        return self._refs[ref]
+
+    def _type(self, param, schema, name):
+        if isinstance(param, str):
+            check, message = _types[param]
+
+            def validate(value):
+                if not check(value):
+                    raise ValidationError(message.format(value))
+
+            return validate
+        checks = [_types[t][0] for t in param]
+
+        def validate(value):
+            if not any(check(value) for check in checks):
+                raise ValidationError(
+                    "{0} is not any of {1}".format(value, list(param))
+                )
+
+        return validate
+
+    def _enum(self, param, schema, name):
+        def validate(value):
+            if value not in param:
+                raise ValidationError(
+                    "{0} is not one of {1}".format(value, param)
+                )
+
+        return validate
+
+    def _properties(self, param, schema, name):
+        properties = {
+            key: self.compile(
+                subschema, "{0}_<anonymous>".format(key)
+            )
+            for key, subschema in param.items()
+        }
+        additional = schema.get("additionalProperties", True)
+        if additional is True:
+            additional = _any
+        elif isinstance(additional, dict):
+            additional = self.compile(additional, "<anonymous>")
+
+        def validate(value):
+            if not isinstance(value, dict):
+                return
+            for key, item in value.items():
+                check = properties.get(key, additional)
+                try:
+                    if check is False:
+                        raise ValidationError(
+                            "Attempted to set unknown property '{0}', "
+                            "but 'additionalProperties' is false.".format(key)
+                        )
+                    check(item)
+                except ValidationError as err:
+                    raise ValidationError(
+                        "{0} \nwhile setting '{1}' in {2}".format(
+                            err, key, name
+                        )
+                    ) from None
+
+        return validate
+
+    def _additionalProperties(self, param, schema, name):
+        if "properties" in schema:
+            return None  # handled along with properties
+        return self._properties({}, schema, name)
+
+    def _required(self, param, schema, name):
+        required = sorted(param)
+
+        def validate(value):
+            if not isinstance(value, dict):
+                return
+            missing = [key for key in required if value.get(key) is None]
+            if missing:
+                raise ValidationError(
+                    "'{0}' are required attributes for {1}".format(
+                        missing, name
+                    )
+                )
+
+        return validate
+
+    def _items(self, param, schema, name):
+        if not isinstance(param, dict):
+            raise _Unsupported("items")
+        check = self.compile(param, name)
+
+        def validate(value):
+            if isinstance(value, list):
+                for item in value:
+                    check(item)
+
+        return validate
+
+    def _minItems(self, param, schema, name):
+        def validate(value):
+            if isinstance(value, list) and len(value) < param:
+                raise ValidationError(
+                    "{1} has too few elements. Wanted {0}.".format(
+                        param, value
+                    )
+                )
+
+        return validate
+
+    def _maxItems(self, param, schema, name):
+        def validate(value):
+            if isinstance(value, list) and len(value) > param:
+                raise ValidationError(
+                    "{1} has too many elements. Wanted {0}.".format(
+                        param, value
+                    )
+                )
+
+        return validate
+
+    def _uniqueItems(self, param, schema, name):
+        if not param:
+            return None
+
+        def validate(value):
+            if not isinstance(value, list):
+                return
+            items = set(json.dumps(item, sort_keys=True) for item in value)
+            if len(items) != len(value):
+                raise ValidationError(
+                    "{0} has duplicate elements, but uniqueness "
+                    "required".format(value)
+                )
+
+        return validate
+
+    def _minimum(self, param, schema, name):
+        exclusive = schema.get("exclusiveMinimum")
+
+        def validate(value):
+            if not _is_number(value):
+                return
+            if exclusive and value <= param:
+                raise ValidationError(
+                    "{0} is less than or equal to {1}".format(value, param)
+                )
+            if value < param:
+                raise ValidationError(
+                    "{0} is less than {1}".format(value, param)
+                )
+
+        return validate
+
+    def _maximum(self, param, schema, name):
+        exclusive = schema.get("exclusiveMaximum")
+
+        def validate(value):
+            if not _is_number(value):
+                return
+            if exclusive and value >= param:
+                raise ValidationError(
+                    "{0} is greater than or equal to {1}".format(
+                        value, param
+                    )
+                )
+            if value > param:
+                raise ValidationError(
+                    "{0} is greater than {1}".format(value, param)
+                )
+
+        return validate
+
+    def _multipleOf(self, param, schema, name):
+        def validate(value):
+            if _is_number(value) and value % param:
+                raise ValidationError(
+                    "{0} is not a multiple of {1}".format(value, param)
+                )
+
+        return validate
+
+    def _minLength(self, param, schema, name):
+        def validate(value):
+            if isinstance(value, str) and len(value) < param:
+                raise ValidationError(
+                    "{0} is fewer than {1} characters".format(value, param)
+                )
+
+        return validate
+
+    def _maxLength(self, param, schema, name):
+        def validate(value):
+            if isinstance(value, str) and len(value) > param:
+                raise ValidationError(
+                    "{0} is longer than {1} characters".format(value, param)
+                )
+
+        return validate
+
+    def _pattern(self, param, schema, name):
+        regex = re.compile(param)
+
+        def validate(value):
+            if isinstance(value, str) and not regex.search(value):
+                raise ValidationError(
+                    "{0} does not match {1}".format(value, param)
+                )
+
+        return validate
+
+    def _format(self, param, schema, name):
+        try:
+            from jsonschema import FormatChecker
+        except ImportError:
+            return None
+        checker = FormatChecker()
+
+        def validate(value):
+            if isinstance(value, str) and not checker.conforms(value, param):
+                raise ValidationError(
+                    "'{0}' is not formatted as a {1}".format(value, param)
+                )
+
+        return validate
+
+
+# keywords consumed along with others
+_ignored = frozenset(["exclusiveMinimum", "exclusiveMaximum"])
+
+
+def _fallback(schema):
+    """
+    Validate with :py:mod:`python_jsonschema_objects` classes built from
+    schema
+    """
+    import python_jsonschema_objects as pjs
+
+    classes = pjs.ObjectBuilder(schema).build_classes()
+    cls = classes[inflection.camelize(schema["title"])]
+
+    def validate(value):
+        if not isinstance(value, dict):
+            raise ValidationError("{0} is not an object".format(value))
+        try:
+            cls(**value).validate()
+        except pjs.validators.ValidationError as err:
+            raise ValidationError(str(err)) from err
+        except TypeError as err:
+            raise ValidationError(str(err)) from err
+
+    return validate
+
+
+def compile_schema(schema):
+    """
+    Compile JSON schema into function validating decoded document and
+    raising :py:class:`ValidationError` if it does not match. Has to be
+    called before :py:mod:`python_jsonschema_objects` classes are built from
+    the same schema, as that modifies it.
+    """
+    schema = copy.deepcopy(schema)
+    name = inflection.parameterize(
+        str(schema.get("title", schema.get("id", ""))), "_"
+    )
+    try:
+        return _Compiler(schema).compile(schema, name)
+    except _Unsupported:
+        return _fallback(schema)
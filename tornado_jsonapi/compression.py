@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import collections
+import gzip
+import hashlib
+
+
+# supported content codings in order of preference, mapped to compressing
+#  functions
+_encoders = collections.OrderedDict()
+
+try:
+    import brotli
+
+    _encoders["br"] = lambda data: brotli.compress(data, quality=5)
+except ImportError:
+    pass
+
+try:
+    import zstandard
+
+    _encoders["zstd"] = lambda data: zstandard.ZstdCompressor(
+        level=3
+    ).compress(data)
+except ImportError:
+    pass
+
+_encoders["gzip"] = lambda data: gzip.compress(data, 6)
+
+
+def encodings():
+    """
+    Return list of supported content codings in order of preference:
+    ``br`` and ``zstd`` when :py:mod:`brotli` and :py:mod:`zstandard` are
+    installed respectively, and ``gzip``.
+    """
+    return list(_encoders)
+
+
+def choose_encoding(accept_encoding):
+    """
+    Return most preferable supported content coding acceptable according to
+    given ``Accept-Encoding`` header value, or ``None`` if there is none.
+    """
+    qualities = {}
+    for item in accept_encoding.split(","):
+        params = item.split(";")
+        coding = params[0].strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params[1:]:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    best, best_quality = None, 0.0
+    for coding in _encoders:
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress(body, encoding):
+    """
+    Compress body with given content coding.
+    """
+    return _encoders[encoding](body)
+
+
+class CompressionCache:
+    """
+    LRU cache of compressed response bodies keyed by digest of uncompressed
+    body, so that hot response is compressed only once for each content
+    coding. Use this as follows:
+
+    .. code-block:: python
+
+        application = tornado.web.Application(
+            [
+                # ... handlers ...
+            ],
+            jsonapi_compression_cache=CompressionCache(),
+        )
+
+    :param int max_size: maximum total size of cached bodies in bytes.
+    """
+
+    def __init__(self, max_size=16 * 1024 * 1024):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._size = 0
+        self._entries = collections.OrderedDict()
+
+    def compress(self, body, encoding):
+        """
+        Compress body with given content coding, unless it is cached already.
+        """
+        key = (hashlib.sha1(body).digest(), encoding)
+        compressed = self._entries.get(key)
+        if compressed is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return compressed
+        self.misses += 1
+        compressed = compress(body, encoding)
+        if len(compressed) <= self.max_size:
+            self._entries[key] = compressed
+            self._size += len(compressed)
+            while self._size > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+        return compressed
@@ -28,6 +28,8 @@ class APIError(tornado.web.HTTPError):
     :param str details: Details of the error to be shown to API client and
         written to log. May contain ``%s``-style placeholders, which will be
         filled in with remaining positional parameters.
+    :param dict headers: Additional HTTP headers to send along with error
+        response, e.g. ``Retry-After``.
     """
 
     def __init__(
@@ -35,10 +37,12 @@ class APIError(tornado.web.HTTPError):
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         details="Unspecified API error",
         *args,
+        headers=None,
         **kwargs
     ):
         super().__init__(status_code, details, *args, **kwargs)
         self.error_id = APIError._generate_id()
+        self.headers = headers or {}
 
     @staticmethod
     def _generate_id():
@@ -2,18 +2,142 @@
 # vim: set fileencoding=utf8 :
 
 import collections
+import inspect
+import math
+import re
+import sys
+import time
 import traceback
 import json
-import python_jsonschema_objects as pjs
 import status
 import accept
 import tornado
+import tornado.escape
+import tornado.ioloop
 import tornado.web
+from contextlib import contextmanager
 from tornado.log import app_log, gen_log
 from tornado.concurrent import is_future
 
-from . import __version__, _schemas
+from . import __version__, compression, metrics, tracing
+from ._validation import ValidationError
 from .exceptions import APIError
+from .writes import WriteBehindResource
+
+
+_filter_re = re.compile(r"^filter\[([^\[\]]+)\](?:\[([^\[\]]+)\])?$")
+
+_filter_operators = ("eq", "ne", "lt", "le", "gt", "ge", "in")
+
+
+# whether functions accept keyword argument, by (function, argument)
+_accepts_cache = {}
+
+
+def _accepts(method, argument):
+    """
+    Return whether method accepts given keyword argument, so that resources
+    implemented before it was introduced can be told apart
+    """
+    function = getattr(method, "__func__", method)
+    key = (function, argument)
+    accepts = _accepts_cache.get(key)
+    if accepts is None:
+        try:
+            parameters = inspect.signature(function).parameters
+        except (TypeError, ValueError):
+            accepts = True
+        else:
+            accepts = argument in parameters or any(
+                p.kind == p.VAR_KEYWORD for p in parameters.values()
+            )
+        _accepts_cache[key] = accepts
+    return accepts
+
+
+def _parse_boolean(value):
+    if isinstance(value, bool):
+        return value
+    if value in ("true", "1"):
+        return True
+    if value in ("false", "0"):
+        return False
+    raise ValueError(value)
+
+
+def _parse_number(type_):
+    def parse(value):
+        if isinstance(value, bool):
+            raise TypeError(value)
+        if isinstance(value, str):
+            return type_(value)
+        if not isinstance(value, (int, float)):
+            raise TypeError(value)
+        if type_ is int and int(value) != value:
+            raise ValueError(value)
+        return type_(value)
+
+    return parse
+
+
+def _parse_string(value):
+    if not isinstance(value, str):
+        raise TypeError(value)
+    return value
+
+
+_filter_types = {
+    "boolean": _parse_boolean,
+    "integer": _parse_number(int),
+    "number": _parse_number(float),
+    "string": _parse_string,
+}
+
+
+# alternative encodings of documents, mapping media type suffix to tuple of
+#  encoding and decoding functions
+_encodings = collections.OrderedDict()
+
+try:
+    import msgpack
+
+    _encodings["msgpack"] = (
+        lambda document: msgpack.packb(document, use_bin_type=True),
+        lambda data: msgpack.unpackb(data, raw=False),
+    )
+except ImportError:
+    pass
+
+try:
+    import cbor2
+
+    def _load_cbor(data):
+        try:
+            return cbor2.loads(data)
+        except cbor2.CBORDecodeError as err:
+            raise ValueError(str(err)) from err
+
+    _encodings["cbor"] = (cbor2.dumps, _load_cbor)
+except ImportError:
+    pass
+
+
+def _dump_json(document):
+    return json.dumps(document, ensure_ascii=False, indent=4)
+
+
+def _load_json(data):
+    return json.loads(data.decode(encoding="UTF-8"))
+
+
+def _validator(name):
+    """
+    Get request document validator from :py:mod:`tornado_jsonapi._schemas`,
+    which is imported on first use as it needs :py:mod:`jsl`
+    """
+    from . import _schemas
+
+    return getattr(_schemas, name + "Validator")()
 
 
 class APIHandler(tornado.web.RequestHandler):
@@ -27,6 +151,122 @@ class APIHandler(tornado.web.RequestHandler):
 
     def initialize(self, resource):
         self._resource = resource
+        self._linkage = collections.defaultdict(dict)
+        self._timings = collections.OrderedDict()
+        self._rendered = 0
+        self._written = 0
+        self._limit = self._profile_id = None
+        profiler = self.settings.get("jsonapi_profiler")
+        if profiler is not None:
+            self._profile_id = profiler.start(self.request)
+        self._span = self._render_span = None
+        tracer = self.settings.get("jsonapi_tracer")
+        if tracer is not None:
+            self._span = tracer.start_span(
+                "request",
+                tracer.extract(self.request.headers),
+                handler=type(self).__name__,
+                method=self.request.method,
+                uri=self.request.uri,
+            )
+
+    @contextmanager
+    def _timing(self, phase):
+        """
+        Add time spent in the block to given phase of request processing, see
+        :py:meth:`get_timings`, and trace it with :py:meth:`_start_span`
+        """
+        if phase == "backend":
+            metrics.enter_backend(self.request)
+        span = None if self._span is None else self._start_span(phase)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._timings[phase] = (
+                self._timings.get(phase, 0.0) + time.perf_counter() - start
+            )
+            if phase == "backend":
+                metrics.leave_backend(self.request)
+            if span is not None:
+                self._end_span(span)
+
+    @contextmanager
+    def _tracing(self, name):
+        """
+        Trace the block with :py:meth:`_start_span`, if tracing is on
+        """
+        span = None if self._span is None else self._start_span(name)
+        try:
+            yield
+        finally:
+            if span is not None:
+                self._end_span(span)
+
+    def _start_span(self, name):
+        """
+        Start child span of request span (see
+        :py:class:`tornado_jsonapi.tracing.Tracer`). Consecutive renderings
+        of resources are traced as single span counting them.
+        """
+        if name == "render" and self._render_span is not None:
+            span, self._render_span = self._render_span, None
+            span.attributes["count"] += 1
+            return span
+        self._finish_render_span()
+        span = self._span.tracer.start_span(name, self._span.context)
+        if name == "render":
+            span.attributes["count"] = 1
+        elif name == "backend":
+            tracing.enter_backend(span)
+        return span
+
+    def _end_span(self, span):
+        if span.name == "render":
+            self._finish_render_span()
+            span.end = time.time()
+            self._render_span = span
+            return
+        if span.name == "backend":
+            tracing.leave_backend(span)
+        span.finish()
+
+    def _finish_render_span(self):
+        if self._render_span is not None:
+            self._render_span.finish(self._render_span.end)
+            self._render_span = None
+
+    def _finish_trace(self):
+        if self._span is not None:
+            self._finish_render_span()
+            self._span.attributes["status"] = self.get_status()
+            self._span.finish()
+
+    def get_timings(self):
+        """
+        Return dict mapping phases of request processing to time spent in them
+        so far, in seconds: ``prepare`` (content negotiation), ``decode``
+        (decoding and validation of request document), ``backend`` (calls to
+        resources, including waiting for them), ``render`` (rendering of
+        resource objects), ``encode`` (encoding of response document) and
+        ``compress``. Phases not entered are missing. Set
+        ``jsonapi_server_timing`` application setting to ``True`` to send
+        these in ``Server-Timing`` response header, and use
+        ``jsonapi_timing_hooks`` setting for list of functions to call with
+        handler and these timings when request is finished, e.g. to collect
+        metrics:
+
+        .. code-block:: python
+
+            def record(handler, timings):
+                for phase, seconds in timings.items():
+                    histograms[handler.request.method, phase].add(seconds)
+
+            application = tornado.web.Application([
+                # ... handlers ...
+            ], jsonapi_server_timing=True, jsonapi_timing_hooks=[record])
+        """
+        return self._timings
 
     def _get_meta(self):
         return {
@@ -72,23 +312,19 @@ class APIHandler(tornado.web.RequestHandler):
             if hasattr(exception, "error_id")
             else APIError._generate_id()
         )
-        self.finish(
-            json.dumps(
-                dict(
-                    errors=[
-                        {
-                            "id": error_id,
-                            "status": str(status_code),
-                            "title": reason,
-                            "detail": detail,
-                        }
-                    ],
-                    **self._get_meta()
-                ),
-                ensure_ascii=False,
-                indent=4,
-            )
-        )
+        error = {
+            "id": error_id,
+            "status": str(status_code),
+            "title": reason,
+            "detail": detail,
+        }
+        if getattr(exception, "source", None):
+            error["source"] = exception.source
+        if self._response_type is not None:
+            self.set_header("Content-Type", self._response_type)
+        for name, value in getattr(exception, "headers", {}).items():
+            self.set_header(name, value)
+        self._finish_document(dict(errors=[error], **self._get_meta()))
 
     def log_exception(self, typ, value, tb):
         if isinstance(value, APIError):
@@ -116,23 +352,113 @@ class APIHandler(tornado.web.RequestHandler):
                 exc_info=(typ, value, tb),
             )
 
+    _extensions = ("bulk",)
+    _request_extensions = ()
+    _request_type = None
+    _response_type = None
+    _export_type = "application/x-ndjson"
+    _export = False
+    _export_chunk_size = 1000
+
     def acceptable(self, extensions):
         """
-        Return whether server supports given extensions. By default do not
-        support any extensions.
+        Return whether server supports given extensions. By default only
+        `bulk <https://github.com/json-api/json-api/blob/9c7a03dbc37f80f6ca81b
+        16d444c960e96dd7a57/extensions/bulk/index.md>`_ extension is supported,
+        allowing to create, update and delete several resources at once.
 
         :param dict sender: dictionary of Accept header parameters, e.g.
-            :code:`{'supported-ext': 'bulk,jsonpatch'}`
+            :code:`{'ext': 'bulk'}`
         """
-        return not extensions
+        return not extensions or (
+            list(extensions.keys()) == ["ext"] and
+            extensions["ext"] in self._extensions
+        )
+
+    def _is_bulk(self):
+        return "bulk" in self._request_extensions
+
+    def _get_media_types(self):
+        """
+        Return dict mapping supported media types to tuples of functions
+        encoding and decoding documents, JSON one being the first. Those of
+        ``application/vnd.api+msgpack`` and ``application/vnd.api+cbor``
+        are supported when :py:mod:`msgpack` and :py:mod:`cbor2` are
+        installed respectively, with document structure identical to JSON.
+        """
+        content_type = self._get_content_type()
+        media_types = collections.OrderedDict(
+            [(content_type, (_dump_json, _load_json))]
+        )
+        base = content_type.rsplit("+", 1)[0]
+        for suffix, encoding in _encodings.items():
+            media_types[base + "+" + suffix] = encoding
+        return media_types
+
+    def _get_response_type(self):
+        return self._response_type or self._get_content_type()
 
     def prepare(self):
-        if len(self.request.body) != 0:
-            mt = accept.parse(self.request.headers.get("Content-Type"))[0]
-            if mt.media_type != self._get_content_type() or not self.acceptable(
-                mt.params
-            ):
-                raise APIError(status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, "")
+        self._check_rate_limit()
+        self._acquire_slot()
+        with self._timing("prepare"):
+            if len(self.request.body) != 0:
+                mt = accept.parse(self.request.headers.get("Content-Type"))[0]
+                if (
+                    mt.media_type not in self._get_media_types() or
+                    not self.acceptable(mt.params)
+                ):
+                    raise APIError(status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, "")
+                if "ext" in mt.params:
+                    self._request_extensions = (mt.params["ext"],)
+                self._request_type = mt.media_type
+            self._check_accept()
+
+    def _check_rate_limit(self):
+        """
+        Reject the request if its client is over rate limit (see
+        :py:class:`tornado_jsonapi.limits.RateLimit`), if any
+        """
+        rate_limit = self.settings.get("jsonapi_rate_limit")
+        if rate_limit is None:
+            return
+        retry_after = rate_limit.check(self.request)
+        if retry_after:
+            raise APIError(
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                "Rate limit exceeded",
+                headers={"Retry-After": str(int(math.ceil(retry_after)))},
+            )
+
+    def _acquire_slot(self):
+        """
+        Take slot of concurrency limit of resource, if any (see
+        :py:class:`tornado_jsonapi.limits.ConcurrencyLimit`), or reject the
+        request if there is none left
+        """
+        limits = self.settings.get("jsonapi_concurrency_limits")
+        if not limits or not hasattr(self._resource, "name"):
+            return
+        limit = limits.get(self._resource.name())
+        if limit is None:
+            return
+        if not limit.acquire():
+            raise APIError(
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                'Too many concurrent requests to "%s"',
+                self._resource.name(),
+                headers={"Retry-After": str(limit.retry_after)},
+            )
+        self._limit = limit
+
+    def _release_slot(self):
+        if self._limit is not None:
+            self._limit.release(
+                self._timings.get("backend", 0.0), self.get_status() >= 500
+            )
+            self._limit = None
+
+    def _check_accept(self):
         accept_header = self.request.headers.get("Accept")
         if not accept_header:
             return  # allow missing Accept header
@@ -146,19 +472,42 @@ class APIHandler(tornado.web.RequestHandler):
             if a.media_type == self._get_content_type():
                 if self.acceptable(a.params):
                     return
+            if a.media_type in self._get_media_types():
+                if self.acceptable(a.params):
+                    self._response_type = a.media_type
+                    self.set_header("Content-Type", a.media_type)
+                    return
+            if (
+                a.media_type == self._export_type and
+                self.request.method == "GET"
+            ):
+                self._export = True
+                return
         raise APIError(status.HTTP_406_NOT_ACCEPTABLE, "")
 
-    def render_resource(self, resource, nullable=True):
+    def _is_export(self):
+        return self._export or self.get_argument("format", None) == "ndjson"
+
+    def render_resource(self, resource, nullable=True, backend=None):
         """
         Utility function
         """
+        with self._timing("render"):
+            rendered = self._render_resource(resource, nullable, backend)
+        if rendered is not None:
+            self._rendered += 1
+        return rendered
+
+    def _render_resource(self, resource, nullable, backend):
         if resource is None:
             if nullable:
                 return None
             else:
                 raise APIError(status.HTTP_404_NOT_FOUND, "")
+        if backend is None:
+            backend = self._resource
         resource_attributes = resource.attributes()
-        attributes = self._resource._schema()
+        attributes = backend._schema()
         blacklist_attr = []
         for attr_name in attributes.keys():
             if attr_name in resource_attributes:
@@ -170,11 +519,39 @@ class APIHandler(tornado.web.RequestHandler):
             attributes.pop(attr, None)
         attributes.validate()
 
-        return {
+        rendered = {
             "id": resource.id_(),
             "type": resource.type_(),
             "attributes": attributes._properties,
         }
+        relationships = self._render_relationships(
+            resource, resource_attributes, backend
+        )
+        if relationships:
+            rendered["relationships"] = relationships
+        return rendered
+
+    def _render_relationships(self, resource, attributes, backend):
+        """
+        Render resource linkage for to-one relationships and for to-many
+        relationships loaded by :py:meth:`_load_included`.
+        """
+        relationships = {}
+        loaded = self._linkage.get((resource.type_(), resource.id_()), {})
+        for name, relationship in backend.relationships().items():
+            if name in loaded:
+                relationships[name] = {"data": loaded[name]}
+            elif not relationship.many:
+                value = backend.relationship_key(resource, relationship.key)
+                relationships[name] = {
+                    "data": None
+                    if value is None
+                    else {
+                        "type": relationship.resource.name(),
+                        "id": str(value),
+                    }
+                }
+        return relationships
 
     def render(self, resources, nullable=True, additional=None):
         data = {}
@@ -190,89 +567,513 @@ class APIHandler(tornado.web.RequestHandler):
             data.update(additional)
         data.update(dict(data=json_resources, **self._get_meta()))
 
-        self.finish(json.dumps(data, ensure_ascii=False, indent=4))
+        self._finish_document(data)
 
-    def _get_request_data(self, schema):
+    def _finish_document(self, document):
         """
-        Get and validate request JSON data according to given schema
+        Finish response with document encoded according to negotiated media
+        type
         """
-        try:
-            d = json.loads(self.request.body.decode(encoding="UTF-8"))
-        except ValueError as err:
-            raise APIError(status.HTTP_400_BAD_REQUEST, str(err)) from err
-        try:
-            data = schema(**d)
-            data.validate()
-        except pjs.validators.ValidationError as err:
-            raise APIError(status.HTTP_400_BAD_REQUEST, str(err)) from err
-        return data["data"]
+        with self._timing("encode"):
+            encode = self._get_media_types()[self._get_response_type()][0]
+            body = encode(document)
+            if isinstance(body, str):
+                body = body.encode("utf-8")
+        self.finish(self._compress(body))
+
+    def write(self, chunk):
+        if not isinstance(chunk, dict):
+            chunk = tornado.escape.utf8(chunk)
+            self._written += len(chunk)
+        super().write(chunk)
+
+    def finish(self, chunk=None):
+        if (
+            self.settings.get("jsonapi_server_timing") and
+            not self._headers_written
+        ):
+            self.set_header(
+                "Server-Timing",
+                ", ".join(
+                    "%s;dur=%.3f" % (phase, seconds * 1000)
+                    for phase, seconds in self._timings.items()
+                ),
+            )
+        if self._profile_id is not None and not self._headers_written:
+            self.set_header("X-Profile-Id", self._profile_id)
+        return super().finish(chunk)
 
-    def _get_resource(self, data, validate=True):
-        if data.get("type") != self._resource.name():
+    def _compress(self, body):
+        """
+        Compress response body with best content coding acceptable by client
+        (see :py:mod:`tornado_jsonapi.compression`) if it is not smaller than
+        ``jsonapi_compression_threshold`` application setting (1024 bytes by
+        default). Compressed bodies are cached in
+        :py:class:`tornado_jsonapi.compression.CompressionCache` given as
+        ``jsonapi_compression_cache`` setting. Set ``jsonapi_compression``
+        setting to ``False`` to disable compression; it is also disabled when
+        Tornado's own ``compress_response`` is on.
+        """
+        threshold = self.settings.get("jsonapi_compression_threshold", 1024)
+        if (
+            not self.settings.get("jsonapi_compression", True) or
+            self.settings.get("compress_response") or
+            self.settings.get("gzip") or
+            len(body) < threshold
+        ):
+            return body
+        self.add_header("Vary", "Accept-Encoding")
+        encoding = compression.choose_encoding(
+            self.request.headers.get("Accept-Encoding", "")
+        )
+        if encoding is None:
+            return body
+        cache = self.settings.get("jsonapi_compression_cache")
+        with self._timing("compress"):
+            if cache is not None:
+                body = cache.compress(body, encoding)
+            else:
+                body = compression.compress(body, encoding)
+        self.set_header("Content-Encoding", encoding)
+        return body
+
+    def _get_request_data(self, validate, key="data"):
+        """
+        Get request document validated with given validator (see
+        :py:func:`tornado_jsonapi._validation.compile_schema`)
+        """
+        with self._timing("decode"):
+            decode = self._get_media_types()[
+                self._request_type or self._get_content_type()
+            ][1]
+            try:
+                d = decode(self.request.body)
+            except ValueError as err:
+                raise APIError(status.HTTP_400_BAD_REQUEST, str(err)) from err
+            if not isinstance(d, dict):
+                raise APIError(
+                    status.HTTP_400_BAD_REQUEST, "Document must be an object"
+                )
+            try:
+                with self._tracing("validate"):
+                    validate(d)
+            except ValidationError as err:
+                raise APIError(status.HTTP_400_BAD_REQUEST, str(err)) from err
+        return d.get(key)
+
+    def _get_resource(self, data, validate=True, resource=None):
+        if resource is None:
+            resource = self._resource
+        if data.get("type") != resource.name():
             raise APIError(
                 status.HTTP_409_CONFLICT,
                 'Expecting object of type "%s"',
-                self._resource.name(),
+                resource.name(),
             )
-        if data["attributes"] is None:
+        if data.get("attributes") is None:
             raise APIError(
                 status.HTTP_400_BAD_REQUEST, "Missing object attributes"
             )
-        attributes = data["attributes"].as_dict()
+        attributes = dict(data["attributes"])
         if validate:
-            try:
-                attrs = self._resource._schema(**attributes)
-                attrs.validate()
-            except pjs.validators.ValidationError as err:
-                raise APIError(status.HTTP_400_BAD_REQUEST, str(err)) from err
+            self._validate_attributes(attributes, resource)
         return attributes
 
+    def _validate_attributes(self, attributes, resource=None):
+        if resource is None:
+            resource = self._resource
+        try:
+            with self._tracing("validate"):
+                resource._validate(attributes)
+        except ValidationError as err:
+            raise APIError(status.HTTP_400_BAD_REQUEST, str(err)) from err
+
+    def _get_filters(self):
+        """
+        Get list of ``(attribute, operator, value)`` filters from query
+        parameters. ``filter[attr]=value`` stands for equality,
+        ``filter[attr]=a,b,c`` for inclusion and ``filter[attr][op]=value`` for
+        comparison with given operator, one of ``eq``, ``ne``, ``lt``, ``le``,
+        ``gt``, ``ge`` and ``in``.
+        """
+        spec = []
+        for key in self.request.arguments:
+            if not key.startswith("filter"):
+                continue
+            match = _filter_re.match(key)
+            if not match:
+                raise APIError(
+                    status.HTTP_400_BAD_REQUEST,
+                    'Malformed filter parameter "%s"',
+                    key,
+                )
+            attribute, operator = match.groups()
+            for value in self.get_arguments(key):
+                op = operator
+                if op is None:
+                    op = "in" if "," in value else "eq"
+                spec.append((attribute, op, value))
+        return self._parse_filters(spec)
+
+    def _parse_filters(self, spec, resource=None):
+        """
+        Validate ``(attribute, operator, value)`` filters against resource
+        schema and convert values to appropriate types
+        """
+        if resource is None:
+            resource = self._resource
+        filters = []
+        for attribute, operator, value in spec:
+            if operator not in _filter_operators:
+                raise APIError(
+                    status.HTTP_400_BAD_REQUEST,
+                    'Unknown filter operator "%s"',
+                    operator,
+                )
+            if attribute != "id" and not resource._schema.propinfo(attribute):
+                raise APIError(
+                    status.HTTP_400_BAD_REQUEST,
+                    'Unknown filter attribute "%s"',
+                    attribute,
+                )
+            if operator == "in":
+                if isinstance(value, str):
+                    value = value.split(",")
+                value = [
+                    self._parse_filter_value(resource, attribute, v)
+                    for v in value
+                ]
+            else:
+                value = self._parse_filter_value(resource, attribute, value)
+            filters.append((attribute, operator, value))
+        return filters
+
+    def _get_sort(self):
+        """
+        Get list of ``(attribute, descending)`` sort keys from ``sort`` query
+        parameter, e.g. ``sort=-created,author``
+        """
+        sort = self.get_argument("sort", "")
+        return self._parse_sort(sort.split(",") if sort else [])
+
+    def _parse_sort(self, spec, resource=None):
+        """
+        Validate sort fields, optionally prefixed with ``-`` for descending
+        order, against resource schema
+        """
+        if resource is None:
+            resource = self._resource
+        sort = []
+        for field in spec:
+            descending = field.startswith("-")
+            attribute = field[1:] if descending else field
+            if attribute != "id" and not resource._schema.propinfo(attribute):
+                raise APIError(
+                    status.HTTP_400_BAD_REQUEST,
+                    'Unknown sort attribute "%s"',
+                    attribute,
+                )
+            sort.append((attribute, descending))
+        return sort
+
+    def _get_include(self):
+        """
+        Get tree of relationships to include from ``include`` query parameter,
+        e.g. ``include=author,comments.author``
+        """
+        include = self.get_argument("include", "")
+        return self._parse_include(include.split(",") if include else [])
+
+    def _parse_include(self, paths, resource=None):
+        """
+        Validate dot-separated relationship paths, returning them as a tree of
+        nested dicts
+        """
+        if resource is None:
+            resource = self._resource
+        tree = collections.OrderedDict()
+        for path in paths:
+            node, backend = tree, resource
+            for name in path.split("."):
+                relationship = backend.relationships().get(name)
+                if relationship is None:
+                    raise APIError(
+                        status.HTTP_400_BAD_REQUEST,
+                        'Unknown relationship "%s"',
+                        path,
+                    )
+                node = node.setdefault(name, collections.OrderedDict())
+                backend = relationship.resource
+        return tree
+
     @tornado.gen.coroutine
-    def get(self, id_=None):
+    def _load_included(self, resources, include, backend=None):
         """
-        GET method, see
-        `spec <http://jsonapi.org/format/1.0/#fetching-resources>`__.
-        Decorate with :py:func:`tornado.gen.coroutine` when subclassing.
+        Load resources related to given ones according to include tree,
+        issuing single :py:meth:`Resource.read_many` or
+        :py:meth:`Resource.list_` call per relationship. Returns list of
+        ``(backend, resource)`` tuples.
         """
+        if backend is None:
+            backend = self._resource
+        included = []
+        for name, subtree in include.items():
+            relationship = backend.relationships()[name]
+            related = yield self._load_relationship(
+                resources, name, relationship, backend
+            )
+            included.extend((relationship.resource, r) for r in related)
+            if subtree and related:
+                nested = yield self._load_included(
+                    related, subtree, relationship.resource
+                )
+                included.extend(nested)
+        return included
 
-        limit = (
-            int(self.request.arguments["limit"][0])
-            if "limit" in self.request.arguments
-            else 0
+    @tornado.gen.coroutine
+    def _load_relationship(self, resources, name, relationship, backend):
+        target = relationship.resource
+        if relationship.many:
+            ids = [r.id_() for r in resources]
+            if target._schema.propinfo(relationship.key):
+                ids = [
+                    self._parse_filter_value(target, relationship.key, id_)
+                    for id_ in ids
+                ]
+            filters = [(relationship.key, "in", ids)]
+            self._check_listing(target, filters, None)
+            with self._timing("backend"):
+                related = target.list_(filters=filters) if ids else []
+                while is_future(related):
+                    related = yield related
+            linkage = collections.defaultdict(list)
+            for r in related:
+                key = target.relationship_key(r, relationship.key)
+                linkage[str(key)].append(
+                    {"type": r.type_(), "id": r.id_()}
+                )
+            for r in resources:
+                self._linkage[(r.type_(), r.id_())][name] = linkage.get(
+                    r.id_(), []
+                )
+        else:
+            ids = collections.OrderedDict()
+            for r in resources:
+                value = backend.relationship_key(r, relationship.key)
+                if value is not None:
+                    ids[str(value)] = None
+            with self._timing("backend"):
+                related = target.read_many(list(ids)) if ids else []
+                while is_future(related):
+                    related = yield related
+        return related
+
+    def _render_included(self, resources, included):
+        """
+        Render included resources, skipping duplicates and primary data
+        """
+        seen = set((r.type_(), r.id_()) for r in resources)
+        rendered = []
+        for backend, resource in included:
+            key = (resource.type_(), resource.id_())
+            if key not in seen:
+                seen.add(key)
+                rendered.append(
+                    self.render_resource(resource, backend=backend)
+                )
+        return rendered
+
+    def _parse_filter_value(self, resource, attribute, value):
+        if attribute == "id":
+            return str(value)
+        types = resource._schema.propinfo(attribute).get("type")
+        if not isinstance(types, list):
+            types = [types]
+        for type_ in types:
+            parse = _filter_types.get(type_)
+            if parse is None:
+                continue
+            try:
+                return parse(value)
+            except (TypeError, ValueError):
+                pass
+        raise APIError(
+            status.HTTP_400_BAD_REQUEST,
+            'Invalid value for filter attribute "%s"',
+            attribute,
         )
-        server_limit = (
+
+    def _get_server_limit(self):
+        return (
             self.settings["jsonapi_limit"]
             if "jsonapi_limit" in self.settings
             else 0
         )
+
+    def _clamp_limit(self, limit):
+        """
+        Apply ``jsonapi_limit`` application setting to requested page size
+        """
+        server_limit = self._get_server_limit()
         if server_limit > 0 and (limit > server_limit or limit == 0):
             limit = server_limit
+        return limit
+
+    @tornado.gen.coroutine
+    def get(self, id_=None):
+        """
+        GET method, see
+        `spec <http://jsonapi.org/format/1.0/#fetching-resources>`__.
+        Collection is exported as NDJSON if ``application/x-ndjson`` is
+        requested in ``Accept`` header or ``format=ndjson`` query parameter.
+        Decorate with :py:func:`tornado.gen.coroutine` when subclassing.
+        """
 
+        limit = self._clamp_limit(
+            int(self.request.arguments["limit"][0])
+            if "limit" in self.request.arguments
+            else 0
+        )
         page = (
             int(self.request.arguments["page"][0])
             if "page" in self.request.arguments
             else 0
         )
 
-        if not id_:
-            res = self._resource.list_(limit=limit, page=page)
-            while is_future(res):
-                res = yield res
-            count = self._resource.list_count()
-            while is_future(count):
-                count = yield count
+        filters = [] if id_ else self._get_filters()
+        sort = [] if id_ else self._get_sort()
+        if self._is_export():
+            if id_:
+                raise APIError(status.HTTP_406_NOT_ACCEPTABLE, "")
+            yield self._stream(filters, sort)
+            return
+        include = self._get_include()
+        res, additional = yield self._fetch(id_, filters, sort, limit, page)
+        if include and res:
+            resources = (
+                res if isinstance(res, collections.Sequence) else [res]
+            )
+            included = yield self._load_included(resources, include)
+            additional["included"] = self._render_included(
+                resources, included
+            )
+        self.render(res, additional=additional)
+
+    @tornado.gen.coroutine
+    def _stream(self, filters, sort):
+        """
+        Export whole collection as `NDJSON <http://ndjson.org/>`_, one
+        resource object per line, streaming it from backend with
+        :py:meth:`tornado_jsonapi.resource.Resource.stream`
+        """
+        self.set_header("Content-Type", self._export_type)
+
+        @tornado.gen.coroutine
+        def write(resources):
+            for resource in resources:
+                rendered = self.render_resource(resource)
+                self.write(json.dumps(rendered, ensure_ascii=False))
+                self.write("\n")
+            yield self.flush()
 
-            self.render(
-                res,
-                additional={
-                    "limits": {"total": count, "limit": limit, "page": page}
-                },
+        self._check_listing(self._resource, filters, sort)
+        kwargs = {"filters": filters} if filters else {}
+        if sort:
+            kwargs["sort"] = sort
+        yield self._resource.stream(
+            write, chunk_size=self._export_chunk_size, **kwargs
+        )
+        self.finish()
+
+    def _check_listing(self, backend, filters, sort):
+        """
+        Reject filters and sort keys backend cannot apply, i.e. whose
+        :py:meth:`tornado_jsonapi.resource.Resource.list_` and
+        :py:meth:`tornado_jsonapi.resource.Resource.list_count` do not take
+        ``filters`` argument, or whose ``list_`` does not take ``sort``
+        """
+        if filters and not (
+            _accepts(backend.list_, "filters") and
+            _accepts(backend.list_count, "filters")
+        ):
+            raise APIError(
+                status.HTTP_400_BAD_REQUEST,
+                'Filtering is not supported by resource "%s"',
+                backend.name(),
+            )
+        if sort and not _accepts(backend.list_, "sort"):
+            raise APIError(
+                status.HTTP_400_BAD_REQUEST,
+                'Sorting is not supported by resource "%s"',
+                backend.name(),
             )
+
+    @tornado.gen.coroutine
+    def _fetch(self, id_, filters, sort, limit, page, backend=None):
+        """
+        Fetch either resource with given ID or list of resources, returning
+        tuple of result and dict of additional top-level document members.
+        Resources requested by ``filter[id]`` alone are read at once, so
+        there may be at most ``jsonapi_limit`` of them, and returned in the
+        requested order, paginated like the listing.
+        """
+        if backend is None:
+            backend = self._resource
+        server_limit = self._get_server_limit()
+        additional = {}
+        if (
+            not sort and
+            len(filters) == 1 and
+            filters[0][0] == "id" and
+            filters[0][1] in ("eq", "in")
+        ):
+            ids = filters[0][2]
+            if not isinstance(ids, list):
+                ids = [ids]
+            ids = list(collections.OrderedDict.fromkeys(ids))
+            if server_limit > 0 and len(ids) > server_limit:
+                raise APIError(
+                    status.HTTP_400_BAD_REQUEST,
+                    "Too many IDs requested, maximum is %d",
+                    server_limit,
+                )
+            with self._timing("backend"):
+                res = backend.read_many(ids)
+                while is_future(res):
+                    res = yield res
+            # backends return resources in any order, and may normalize IDs
+            order = {str(i): n for n, i in enumerate(ids)}
+            res = sorted(res, key=lambda r: order.get(r.id_(), len(ids)))
+            additional["limits"] = {
+                "total": len(res),
+                "limit": limit,
+                "page": page,
+            }
+            if limit > 0:
+                start = abs(page) * limit
+                res = res[start:start + limit]
+        elif not id_:
+            self._check_listing(backend, filters, sort)
+            kwargs = {"filters": filters} if filters else {}
+            list_kwargs = dict(kwargs, sort=sort) if sort else kwargs
+            with self._timing("backend"):
+                res = backend.list_(limit=limit, page=page, **list_kwargs)
+                while is_future(res):
+                    res = yield res
+                count = backend.list_count(**kwargs)
+                while is_future(count):
+                    count = yield count
+            additional["limits"] = {
+                "total": count,
+                "limit": limit,
+                "page": page,
+            }
         else:
-            res = self._resource.read(id_)
-            while is_future(res):
-                res = yield res
-            self.render(res)
+            with self._timing("backend"):
+                res = backend.read(id_)
+                while is_future(res):
+                    res = yield res
+        return res, additional
 
     @tornado.gen.coroutine
     def post(self, id_=None):
@@ -283,21 +1084,56 @@ class APIHandler(tornado.web.RequestHandler):
         """
         if id_:
             raise APIError(status.HTTP_400_BAD_REQUEST, "Extra id in request")
-        data = self._get_request_data(_schemas.postDataSchema())
-        if data["id"] is not None:
+        if self._is_bulk():
+            yield self._post_bulk()
+            return
+        data = self._get_request_data(_validator("postData"))
+        if data.get("id") is not None:
             raise APIError(
                 status.HTTP_403_FORBIDDEN,
                 "Client-generated resource ID is not supported",
             )
-        resource = self._resource.create(self._get_resource(data))
-        while is_future(resource):
-            resource = yield resource
+        attributes = self._get_resource(data)
+        if isinstance(self._resource, WriteBehindResource):
+            self._post_write_behind(attributes)
+            return
+        with self._timing("backend"):
+            resource = self._resource.create(attributes)
+            while is_future(resource):
+                resource = yield resource
         if not resource:
             raise APIError()
         self.set_status(status.HTTP_201_CREATED)
         self.set_header("Location", self.request.uri + resource.id_())
         self.render(resource)
 
+    def _post_write_behind(self, attributes):
+        """
+        Queue resource for creation in background, responding with link to
+        its job status
+        """
+        job = self._resource.enqueue(attributes)
+        if job is None:
+            raise APIError(
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                "Write queue is full",
+                headers={"Retry-After": str(self._resource.retry_after)},
+            )
+        url = self.request.uri + "queue-jobs/" + job.id
+        self.set_status(status.HTTP_202_ACCEPTED)
+        self.set_header("Content-Location", url)
+        self._finish_document(
+            dict(data=self._render_job(job, url), **self._get_meta())
+        )
+
+    def _render_job(self, job, url):
+        return {
+            "type": "queue-jobs",
+            "id": job.id,
+            "attributes": {"status": job.status},
+            "links": {"self": url},
+        }
+
     @tornado.gen.coroutine
     def patch(self, id_):
         """
@@ -305,20 +1141,25 @@ class APIHandler(tornado.web.RequestHandler):
         `spec <http://jsonapi.org/format/1.0/#crud-updating>`__.
         Decorate with :py:func:`tornado.gen.coroutine` when subclassing.
         """
+        if not id_ and self._is_bulk():
+            yield self._patch_bulk()
+            return
         if not id_:
             raise APIError(status.HTTP_400_BAD_REQUEST, "Missing ID")
-        data = self._get_request_data(_schemas.patchDataSchema())
-        if data["id"] != id_:
+        data = self._get_request_data(_validator("patchData"))
+        if data.get("id") != id_:
             raise APIError(status.HTTP_400_BAD_REQUEST, "ID mismatch")
-        exists = self._resource.exists(id_)
-        while is_future(exists):
-            exists = yield exists
+        with self._timing("backend"):
+            exists = self._resource.exists(id_)
+            while is_future(exists):
+                exists = yield exists
         if not exists:
             raise APIError(status.HTTP_404_NOT_FOUND, "No such resource")
         res = self._get_resource(data, validate=False)
-        resource = self._resource.update(id_, res)
-        while is_future(resource):
-            resource = yield resource
+        with self._timing("backend"):
+            resource = self._resource.update(id_, res)
+            while is_future(resource):
+                resource = yield resource
         if not resource:
             raise APIError()
         self.render(resource)
@@ -330,25 +1171,732 @@ class APIHandler(tornado.web.RequestHandler):
         `spec <http://jsonapi.org/format/1.0/#crud-deleting>`__.
         Decorate with :py:func:`tornado.gen.coroutine` when subclassing.
         """
+        if not id_ and self._is_bulk():
+            yield self._delete_bulk()
+            return
         if not id_:
             raise APIError(status.HTTP_400_BAD_REQUEST, "Missing ID")
-        exists = self._resource.exists(id_)
-        while is_future(exists):
-            exists = yield exists
+        with self._timing("backend"):
+            exists = self._resource.exists(id_)
+            while is_future(exists):
+                exists = yield exists
         if not exists:
             raise APIError(status.HTTP_404_NOT_FOUND, "No such resource")
-        res = self._resource.delete(id_)
-        while is_future(res):
-            res = yield res
+        with self._timing("backend"):
+            res = self._resource.delete(id_)
+            while is_future(res):
+                res = yield res
         if not res:
             raise APIError()
         self.set_status(status.HTTP_204_NO_CONTENT)
         self.clear_header("Content-Type")
 
+    def _get_bulk_ids(self, data):
+        ids = [d["id"] for d in data]
+        if len(set(ids)) != len(ids):
+            raise APIError(status.HTTP_400_BAD_REQUEST, "Duplicate IDs")
+        return ids
+
+    @tornado.gen.coroutine
+    def _check_bulk_exist(self, ids):
+        with self._timing("backend"):
+            existing = self._resource.read_many(ids)
+            while is_future(existing):
+                existing = yield existing
+        if len(existing) != len(ids):
+            raise APIError(status.HTTP_404_NOT_FOUND, "No such resource")
+
+    @tornado.gen.coroutine
+    def _post_bulk(self):
+        """
+        Bulk POST, creating all the resources in single transaction
+        """
+        data = self._get_request_data(_validator("bulkPostData"))
+        if any(d.get("id") is not None for d in data):
+            raise APIError(
+                status.HTTP_403_FORBIDDEN,
+                "Client-generated resource ID is not supported",
+            )
+        attributes = [self._get_resource(d) for d in data]
+        with self._timing("backend"):
+            resources = self._resource.create_many(attributes)
+            while is_future(resources):
+                resources = yield resources
+        if len(resources) != len(attributes):
+            raise APIError()
+        self.set_status(status.HTTP_201_CREATED)
+        self.set_header(
+            "Content-Type", self._get_response_type() + "; ext=bulk"
+        )
+        self.render(resources)
+
+    @tornado.gen.coroutine
+    def _patch_bulk(self):
+        """
+        Bulk PATCH, updating all the resources in single transaction
+        """
+        data = self._get_request_data(_validator("bulkPatchData"))
+        ids = self._get_bulk_ids(data)
+        updates = [
+            (d["id"], self._get_resource(d, validate=False)) for d in data
+        ]
+        yield self._check_bulk_exist(ids)
+        with self._timing("backend"):
+            resources = self._resource.update_many(updates)
+            while is_future(resources):
+                resources = yield resources
+        if len(resources) != len(updates):
+            raise APIError()
+        self.set_header(
+            "Content-Type", self._get_response_type() + "; ext=bulk"
+        )
+        self.render(resources)
+
+    @tornado.gen.coroutine
+    def _delete_bulk(self):
+        """
+        Bulk DELETE, deleting all the resources in single transaction
+        """
+        data = self._get_request_data(_validator("bulkPatchData"))
+        for d in data:
+            if d.get("type") != self._resource.name():
+                raise APIError(
+                    status.HTTP_409_CONFLICT,
+                    'Expecting object of type "%s"',
+                    self._resource.name(),
+                )
+        ids = self._get_bulk_ids(data)
+        yield self._check_bulk_exist(ids)
+        with self._timing("backend"):
+            res = self._resource.delete_many(ids)
+            while is_future(res):
+                res = yield res
+        if res != len(ids):
+            raise APIError()
+        self.set_status(status.HTTP_204_NO_CONTENT)
+        self.clear_header("Content-Type")
+
     def on_finish(self):
+        self._release_slot()
+        self._stop_profile()
+        self._finish_trace()
+        self._report_timings()
         if hasattr(self._resource, "_on_request_end"):
             self._resource._on_request_end()
 
+    def _stop_profile(self):
+        if self._profile_id is not None:
+            self.settings["jsonapi_profiler"].stop(self._profile_id)
+
+    def _report_timings(self):
+        for hook in self.settings.get("jsonapi_timing_hooks", ()):
+            hook(self, self._timings)
+
+
+class _ResourcesHandler(APIHandler):
+    """
+    Base for handlers working with several resources at once
+    """
+
+    def initialize(self, resources):
+        super().initialize(None)
+        self._resources = collections.OrderedDict(
+            (resource.name(), resource) for resource in resources
+        )
+
+    def _get_backend(self, type_):
+        resource = self._resources.get(type_)
+        if resource is None:
+            raise APIError(
+                status.HTTP_404_NOT_FOUND, 'Unknown resource type "%s"', type_
+            )
+        return resource
+
+    def on_finish(self):
+        self._stop_profile()
+        self._finish_trace()
+        self._report_timings()
+        for resource in self._resources.values():
+            if hasattr(resource, "_on_request_end"):
+                resource._on_request_end()
+
+
+class BatchHandler(_ResourcesHandler):
+    """
+    Handler performing several read queries on given resources in single
+    request, e.g. to load all the data dashboard needs at once. Queries are
+    POSTed as ``queries`` array of objects with ``type`` and either ``id`` or
+    any of ``filter`` (object mapping attributes either to value, to list of
+    values or to object mapping operators to values), ``sort``, ``include``,
+    ``fields`` (comma-separated attributes to render), ``limit`` and ``page``
+    members. Queries are dispatched to backends concurrently and their results
+    are returned as ``results`` array of documents in the same order. Use this
+    as follows:
+
+    .. code-block:: python
+        :emphasize-lines: 4-8
+
+        application = tornado.web.Application([
+            (
+                # ... handlers ...
+            ),
+            (
+                r"/api/batch",
+                tornado_jsonapi.handlers.BatchHandler,
+                dict(resources=[posts, comments])
+            ),
+        ])
+    """
+
+    SUPPORTED_METHODS = ("POST",)
+
+    @tornado.gen.coroutine
+    def post(self, id_=None):
+        """
+        POST method, performing the queries.
+        Decorate with :py:func:`tornado.gen.coroutine` when subclassing.
+        """
+        queries = self._get_request_data(_validator("batch"), "queries")
+        results = yield [
+            self._query(query, i) for i, query in enumerate(queries)
+        ]
+        self._finish_document(dict(results=results, **self._get_meta()))
+
+    @tornado.gen.coroutine
+    def _query(self, query, index):
+        try:
+            result = yield self._perform(query)
+        except APIError as err:
+            err.source = {"pointer": "/queries/%d" % index}
+            raise
+        return result
+
+    @tornado.gen.coroutine
+    def _perform(self, query):
+        backend = self._get_backend(query["type"])
+        id_ = query.get("id")
+        if id_ is not None and (
+            query.get("filter") is not None or
+            query.get("sort") is not None
+        ):
+            raise APIError(
+                status.HTTP_400_BAD_REQUEST,
+                "Either ID or filter and sort can be given",
+            )
+        spec = []
+        filters = query.get("filter")
+        for attribute, value in (
+            filters if filters is not None else {}
+        ).items():
+            if isinstance(value, dict):
+                spec.extend((attribute, op, v) for op, v in value.items())
+            elif isinstance(value, list):
+                spec.append((attribute, "in", value))
+            else:
+                spec.append((attribute, "eq", value))
+        filters = self._parse_filters(spec, backend)
+        sort = query.get("sort")
+        sort = self._parse_sort(sort.split(",") if sort else [], backend)
+        include = query.get("include")
+        include = self._parse_include(
+            include.split(",") if include else [], backend
+        )
+        fields = query.get("fields")
+        fields = set(fields.split(",")) if fields is not None else None
+        res, result = yield self._fetch(
+            id_,
+            filters,
+            sort,
+            self._clamp_limit(query.get("limit") or 0),
+            query.get("page") or 0,
+            backend,
+        )
+        if res is None:
+            resources = []
+        elif isinstance(res, collections.Sequence):
+            resources = res
+        else:
+            resources = [res]
+        if include and resources:
+            included = yield self._load_included(resources, include, backend)
+            result["included"] = self._render_included(resources, included)
+        rendered = [
+            self._select_fields(
+                self.render_resource(r, backend=backend), fields
+            )
+            for r in resources
+        ]
+        result["data"] = (
+            rendered
+            if isinstance(res, collections.Sequence)
+            else (rendered[0] if rendered else None)
+        )
+        return result
+
+    def _select_fields(self, rendered, fields):
+        if fields is not None:
+            rendered["attributes"] = {
+                k: v for k, v in rendered["attributes"].items() if k in fields
+            }
+        return rendered
+
+
+class OperationsHandler(_ResourcesHandler):
+    """
+    Handler for `atomic operations <https://jsonapi.org/ext/atomic/>`_
+    extension, performing ordered list of operations on several resources in
+    single request. Operations on resources sharing the same database (see
+    :py:meth:`tornado_jsonapi.resource.Resource.transaction_key`) are
+    performed in single transaction, which is rolled back if any operation
+    fails. Resources added by preceding operations can be referred to by their
+    ``lid``, both in operation targets and in to-one relationships. Use this
+    as follows:
+
+    .. code-block:: python
+        :emphasize-lines: 4-8
+
+        application = tornado.web.Application([
+            (
+                # ... handlers ...
+            ),
+            (
+                r"/api/operations",
+                tornado_jsonapi.handlers.OperationsHandler,
+                dict(resources=[posts, comments])
+            ),
+        ])
+    """
+
+    SUPPORTED_METHODS = ("POST",)
+    _extensions = ("https://jsonapi.org/ext/atomic",)
+
+    def initialize(self, resources):
+        super().initialize(resources)
+        self._bound = {}
+        self._lids = {}
+
+    def _get_atomic_content_type(self):
+        return '{}; ext="{}"'.format(
+            self._get_response_type(), self._extensions[0]
+        )
+
+    @tornado.gen.coroutine
+    def post(self, id_=None):
+        """
+        POST method, see
+        `spec <https://jsonapi.org/ext/atomic/#processing-operations>`__.
+        Decorate with :py:func:`tornado.gen.coroutine` when subclassing.
+        """
+        if self._extensions[0] not in self._request_extensions:
+            raise APIError(status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, "")
+        operations = self._get_request_data(
+            _validator("operations"), "atomic:operations"
+        )
+        transactions = collections.OrderedDict()
+        results = []
+        try:
+            for i, operation in enumerate(operations):
+                try:
+                    result = yield self._perform(operation, transactions)
+                except APIError as err:
+                    err.source = {"pointer": "/atomic:operations/%d" % i}
+                    raise
+                results.append(result)
+        except Exception:
+            for transaction in transactions.values():
+                with self._timing("backend"):
+                    res = transaction.rollback()
+                    while is_future(res):
+                        res = yield res
+            raise
+        for transaction in transactions.values():
+            with self._timing("backend"):
+                res = transaction.commit()
+                while is_future(res):
+                    res = yield res
+        if not any(results):
+            self.set_status(status.HTTP_204_NO_CONTENT)
+            self.clear_header("Content-Type")
+            return
+        self.set_header("Content-Type", self._get_atomic_content_type())
+        self._finish_document(
+            dict({"atomic:results": results}, **self._get_meta())
+        )
+
+    @tornado.gen.coroutine
+    def _bind(self, type_, transactions):
+        """
+        Get resource of given type bound to transaction for its database,
+        beginning one if necessary
+        """
+        if type_ in self._bound:
+            return self._bound[type_]
+        resource = self._get_backend(type_)
+        key = resource.transaction_key()
+        if key is not None:
+            if key not in transactions:
+                with self._timing("backend"):
+                    transaction = resource.begin()
+                    while is_future(transaction):
+                        transaction = yield transaction
+                transactions[key] = transaction
+            resource = resource.bind(transactions[key])
+        self._bound[type_] = resource
+        return resource
+
+    @tornado.gen.coroutine
+    def _perform(self, operation, transactions):
+        ref, data = operation.get("ref"), operation.get("data")
+        if ref is not None and ref.get("relationship") is not None:
+            raise APIError(
+                status.HTTP_400_BAD_REQUEST,
+                "Relationship operations are not supported",
+            )
+        if operation["op"] != "remove" and data is None:
+            raise APIError(status.HTTP_400_BAD_REQUEST, "Missing data")
+        if operation["op"] == "remove" and ref is None:
+            raise APIError(status.HTTP_400_BAD_REQUEST, "Missing ref")
+        target = data if ref is None else ref
+        backend = yield self._bind(target["type"], transactions)
+        if operation["op"] == "add":
+            if data.get("id") is not None:
+                raise APIError(
+                    status.HTTP_403_FORBIDDEN,
+                    "Client-generated resource ID is not supported",
+                )
+            with self._timing("backend"):
+                resource = backend.create(self._get_attributes(data, backend))
+                while is_future(resource):
+                    resource = yield resource
+            if not resource:
+                raise APIError()
+            if data.get("lid") is not None:
+                self._lids[(backend.name(), data["lid"])] = resource.id_()
+            return {"data": self.render_resource(resource, backend=backend)}
+        id_ = self._resolve_id(target)
+        if data is not None and self._resolve_id(data) != id_:
+            raise APIError(status.HTTP_400_BAD_REQUEST, "ID mismatch")
+        with self._timing("backend"):
+            exists = backend.exists(id_)
+            while is_future(exists):
+                exists = yield exists
+        if not exists:
+            raise APIError(status.HTTP_404_NOT_FOUND, "No such resource")
+        if operation["op"] == "update":
+            with self._timing("backend"):
+                resource = backend.update(
+                    id_, self._get_attributes(data, backend, validate=False)
+                )
+                while is_future(resource):
+                    resource = yield resource
+            if not resource:
+                raise APIError()
+            return {"data": self.render_resource(resource, backend=backend)}
+        with self._timing("backend"):
+            res = backend.delete(id_)
+            while is_future(res):
+                res = yield res
+        if not res:
+            raise APIError()
+        return {}
+
+    def _resolve_id(self, identifier):
+        """
+        Get ID from resource identifier, looking up local ID assigned by one
+        of preceding operations if necessary
+        """
+        if identifier.get("id") is not None:
+            return str(identifier.get("id"))
+        lid = identifier.get("lid")
+        if lid is None:
+            raise APIError(status.HTTP_400_BAD_REQUEST, "Missing resource ID")
+        try:
+            return self._lids[(identifier.get("type"), lid)]
+        except KeyError:
+            raise APIError(
+                status.HTTP_400_BAD_REQUEST, 'Unknown local ID "%s"', lid
+            )
+
+    def _get_attributes(self, data, backend, validate=True):
+        """
+        Get attributes of resource object, setting keys of to-one
+        relationships given in its ``relationships`` member
+        """
+        attributes = self._get_resource(data, validate=False, resource=backend)
+        relationships = data.get("relationships")
+        for name, linkage in (
+            relationships if relationships is not None else {}
+        ).items():
+            relationship = backend.relationships().get(name)
+            if (
+                relationship is None or
+                relationship.many or
+                not isinstance(linkage, dict) or
+                "data" not in linkage
+            ):
+                raise APIError(
+                    status.HTTP_400_BAD_REQUEST,
+                    'Unsupported relationship "%s"',
+                    name,
+                )
+            identifier = linkage["data"]
+            if identifier is None:
+                attributes[relationship.key] = None
+                continue
+            if identifier.get("type") != relationship.resource.name():
+                raise APIError(
+                    status.HTTP_409_CONFLICT,
+                    'Expecting object of type "%s"',
+                    relationship.resource.name(),
+                )
+            value = self._resolve_id(identifier)
+            if backend._schema.propinfo(relationship.key):
+                value = self._parse_filter_value(
+                    backend, relationship.key, value
+                )
+            attributes[relationship.key] = value
+        if validate:
+            self._validate_attributes(attributes, backend)
+        return attributes
+
+
+@tornado.web.stream_request_body
+class ImportHandler(APIHandler):
+    """
+    Handler for bulk import of resources, e.g. nightly loads of millions of
+    rows. Request body is streamed as `NDJSON <http://ndjson.org/>`_ with one
+    resource object per line (``application/x-ndjson`` content type). Lines
+    are validated as soon as they arrive and imported in batches with
+    :py:meth:`tornado_jsonapi.resource.Resource.copy_from`, which uses
+    PostgreSQL ``COPY`` for :py:class:`tornado_jsonapi.resource.DBAPI2Resource`
+    connected with :py:mod:`psycopg2`, so whole payload never has to be held
+    in memory. All the batches are imported in single transaction if resource
+    supports it (see
+    :py:meth:`tornado_jsonapi.resource.Resource.transaction_key`) and can
+    isolate it from other requests (see
+    :py:meth:`tornado_jsonapi.resource.Resource.begin_isolated`, e.g. give
+    ``connect`` function to
+    :py:class:`tornado_jsonapi.resource.DBAPI2Resource`), otherwise each
+    batch is committed on its own. Request body is limited to
+    ``max_body_size`` bytes, Tornado's ``max_body_size`` of the server by
+    default, so pass larger limit for big imports. The first offending line
+    is responded to right away and connection is closed without reading rest
+    of the body; error ``source`` points to its zero-based number. Use this
+    as follows:
+
+    .. code-block:: python
+        :emphasize-lines: 2-6
+
+        application = tornado.web.Application([
+            (
+                r"/api/posts/import",
+                tornado_jsonapi.handlers.ImportHandler,
+                dict(resource=posts)
+            ),
+            (
+                r"/api/posts/([^/]*)",
+                tornado_jsonapi.handlers.APIHandler,
+                dict(resource=posts)
+            ),
+        ])
+    """
+
+    SUPPORTED_METHODS = ("POST",)
+
+    def initialize(self, resource, batch_size=10000, max_body_size=None):
+        super().initialize(resource)
+        self._batch_size = batch_size
+        self._max_body_size = max_body_size
+        self._backend = resource
+        self._transaction = None
+        self._buffer = b""
+        self._rows = []
+        self._line = 0
+        self._count = 0
+
+    @tornado.gen.coroutine
+    def prepare(self):
+        self._check_rate_limit()
+        self._acquire_slot()
+        if self._max_body_size is not None:
+            self.request.connection.set_max_body_size(self._max_body_size)
+        content_type = self.request.headers.get("Content-Type", "")
+        if accept.parse(content_type)[0].media_type != "application/x-ndjson":
+            raise APIError(status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, "")
+        self._check_accept()
+        if self._resource.transaction_key() is not None:
+            with self._timing("backend"):
+                transaction = self._resource.begin_isolated()
+                while is_future(transaction):
+                    transaction = yield transaction
+            if transaction is not None:
+                self._transaction = transaction
+                self._backend = self._resource.bind(transaction)
+
+    @tornado.gen.coroutine
+    def data_received(self, chunk):
+        if self._finished:
+            return
+        lines = (self._buffer + chunk).split(b"\n")
+        self._buffer = lines.pop()
+        try:
+            for line in lines:
+                self._add(line)
+                if len(self._rows) >= self._batch_size:
+                    yield self._copy()
+        except Exception:
+            # finishing before the body is read makes Tornado close the
+            # connection, so the rest of it is not streamed in vain
+            exc_info = sys.exc_info()
+            self.log_exception(*exc_info)
+            self.send_error(
+                getattr(exc_info[1], "status_code", 500), exc_info=exc_info
+            )
+
+    def _add(self, line):
+        self._line += 1
+        if not line.strip():
+            return
+        try:
+            try:
+                data = json.loads(line.decode(encoding="UTF-8"))
+            except ValueError as err:
+                raise APIError(status.HTTP_400_BAD_REQUEST, str(err)) from err
+            if not isinstance(data, dict) or not isinstance(
+                data.get("attributes"), dict
+            ):
+                raise APIError(
+                    status.HTTP_400_BAD_REQUEST, "Missing object attributes"
+                )
+            if data.get("type") != self._resource.name():
+                raise APIError(
+                    status.HTTP_409_CONFLICT,
+                    'Expecting object of type "%s"',
+                    self._resource.name(),
+                )
+            if data.get("id") is not None:
+                raise APIError(
+                    status.HTTP_403_FORBIDDEN,
+                    "Client-generated resource ID is not supported",
+                )
+            self._validate_attributes(data["attributes"])
+        except APIError as err:
+            err.source = {"pointer": "/%d" % (self._line - 1)}
+            raise
+        self._rows.append(data["attributes"])
+
+    @tornado.gen.coroutine
+    def _copy(self):
+        rows, self._rows = self._rows, []
+        with self._timing("backend"):
+            count = self._backend.copy_from(rows)
+            while is_future(count):
+                count = yield count
+        self._count += count
+
+    @tornado.gen.coroutine
+    def _end(self, commit):
+        transaction, self._transaction = self._transaction, None
+        if transaction is not None:
+            with self._timing("backend"):
+                res = (
+                    transaction.commit() if commit else transaction.rollback()
+                )
+                while is_future(res):
+                    res = yield res
+
+    @tornado.gen.coroutine
+    def post(self, id_=None):
+        """
+        POST method, responding with number of imported resources in
+        ``meta``.
+        Decorate with :py:func:`tornado.gen.coroutine` when subclassing.
+        """
+        if self._finished:
+            return  # error was responded to while receiving the body
+        try:
+            self._add(self._buffer)
+            if self._rows:
+                yield self._copy()
+        except Exception:
+            yield self._end(commit=False)
+            raise
+        yield self._end(commit=True)
+        data = self._get_meta()
+        data["meta"]["count"] = self._count
+        self._finish_document(data)
+
+    def on_finish(self):
+        transaction, self._transaction = self._transaction, None
+        if transaction is not None:
+            try:
+                res = transaction.rollback()
+            except Exception:
+                app_log.exception("Failed to roll back import")
+            else:
+                if is_future(res):
+                    tornado.ioloop.IOLoop.current().add_future(
+                        res, self._rolled_back
+                    )
+        super().on_finish()
+
+    def _rolled_back(self, future):
+        error = future.exception()
+        if error is not None:
+            app_log.error(
+                "Failed to roll back import",
+                exc_info=(type(error), error, error.__traceback__),
+            )
+
+
+class JobHandler(APIHandler):
+    """
+    Handler reporting status of resource creation queued by
+    :py:class:`tornado_jsonapi.writes.WriteBehindResource`, which redirects
+    with ``303 See Other`` to created resource once it is done. Register it
+    under ``queue-jobs/`` path of resource handler as follows:
+
+    .. code-block:: python
+        :emphasize-lines: 3-7
+
+        posts = tornado_jsonapi.writes.WriteBehindResource(resource)
+        application = tornado.web.Application([
+            (
+                r"/api/posts/queue-jobs/([^/]*)",
+                tornado_jsonapi.handlers.JobHandler,
+                dict(resource=posts)
+            ),
+            (
+                r"/api/posts/([^/]*)",
+                tornado_jsonapi.handlers.APIHandler,
+                dict(resource=posts)
+            ),
+        ])
+    """
+
+    SUPPORTED_METHODS = ("GET",)
+
+    def get(self, id_=None):
+        """
+        GET method, see `recommendation
+        <https://jsonapi.org/recommendations/#asynchronous-processing>`__.
+        """
+        job = self._resource.job(id_) if id_ else None
+        if job is None:
+            raise APIError(status.HTTP_404_NOT_FOUND, "No such job")
+        if job.status == "done":
+            self.set_status(status.HTTP_303_SEE_OTHER)
+            path = self.request.path.rsplit("queue-jobs/", 1)[0]
+            self.set_header("Location", path + job.resource_id)
+            self.clear_header("Content-Type")
+            return
+        self._finish_document(
+            dict(
+                data=self._render_job(job, self.request.path),
+                **self._get_meta()
+            )
+        )
+
 
 class NotFoundErrorAPIHandler(APIHandler):
     """
@@ -382,3 +1930,29 @@ def not_found_handling_settings():
         "default_handler_class": NotFoundErrorAPIHandler,
         "default_handler_args": dict(resource={}),
     }
+
+
+def warm_up():
+    """
+    Build validators of request documents, which are otherwise built by the
+    first request needing them, delaying it. Resources build their schemas
+    when created, sharing them with resources having identical schema. Do
+    this before starting the server, and before forking worker processes, so
+    that they inherit everything built:
+
+    .. code-block:: python
+        :emphasize-lines: 6
+
+        application = tornado.web.Application([
+            (
+                # ... handlers ...
+            ),
+        ], **tornado_jsonapi.handlers.not_found_handling_settings())
+        tornado_jsonapi.handlers.warm_up()
+        server = tornado.httpserver.HTTPServer(application)
+        server.bind(8888)
+        server.start(0)  # forks one process per CPU
+    """
+    from . import _schemas
+
+    _schemas.warm_up()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import collections
+import math
+import time
+
+
+class ConcurrencyLimit:
+    """
+    Static limit of concurrent requests to resource. Limits are given to
+    :py:class:`tornado_jsonapi.handlers.APIHandler` as
+    ``jsonapi_concurrency_limits`` application setting mapping resource names
+    to them, and requests beyond the limit are rejected right away with
+    ``503 Service Unavailable`` and ``Retry-After`` header, instead of piling
+    onto backend:
+
+    .. code-block:: python
+
+        application = tornado.web.Application([
+            # ... handlers ...
+        ], jsonapi_concurrency_limits={
+            "post": tornado_jsonapi.limits.AIMDLimit(),
+            "comment": tornado_jsonapi.limits.ConcurrencyLimit(10),
+        })
+
+    :param int limit: maximum number of concurrent requests.
+    :param int retry_after: value of ``Retry-After`` header sent along with
+        ``503 Service Unavailable`` response.
+    """
+
+    def __init__(self, limit, retry_after=1):
+        self.limit = limit
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.rejected = 0
+
+    def acquire(self):
+        """
+        Return whether request may proceed, taking a slot if so
+        """
+        if self.in_flight >= int(self.limit):
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, latency, failed=False):
+        """
+        Give slot back after request which spent given time in seconds in
+        backend and either succeeded or failed with server error
+        """
+        self.in_flight -= 1
+        self.update(latency, failed)
+
+    def update(self, latency, failed):
+        """
+        Adjust limit after request, static limit is left intact
+        """
+
+
+class AIMDLimit(ConcurrencyLimit):
+    """
+    Adaptive limit growing by one while backend keeps up and requests fill
+    at least half of it, and shrinking by ``backoff`` factor when backend
+    latency exceeds ``latency_threshold`` seconds or request fails.
+
+    :param int initial: initial limit.
+    :param int min_limit: lower bound of limit.
+    :param int max_limit: upper bound of limit.
+    :param float backoff: factor to multiply limit by on congestion.
+    :param float latency_threshold: backend latency in seconds considered
+        congestion.
+    :param int retry_after: value of ``Retry-After`` header.
+    """
+
+    def __init__(
+        self,
+        initial=20,
+        min_limit=1,
+        max_limit=1000,
+        backoff=0.9,
+        latency_threshold=1.0,
+        retry_after=1,
+    ):
+        super().__init__(initial, retry_after)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_threshold = latency_threshold
+
+    def update(self, latency, failed):
+        if failed or latency > self.latency_threshold:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+        elif (self.in_flight + 1) * 2 >= self.limit:
+            self.limit = min(self.max_limit, self.limit + 1)
+
+
+class GradientLimit(ConcurrencyLimit):
+    """
+    Adaptive limit following ratio (gradient) of long-term average backend
+    latency to the latest one: limit shrinks when latency grows above
+    ``tolerance`` times the average, and grows by square root of itself, as
+    allowed queue, otherwise. Failed requests halve the limit.
+
+    :param int initial: initial limit.
+    :param int min_limit: lower bound of limit.
+    :param int max_limit: upper bound of limit.
+    :param float tolerance: ratio of latency to its average tolerated before
+        limit is decreased.
+    :param float smoothing: weight of new limit in its moving average.
+    :param float decay: weight of latest latency in its long-term average.
+    :param int retry_after: value of ``Retry-After`` header.
+    """
+
+    def __init__(
+        self,
+        initial=20,
+        min_limit=1,
+        max_limit=1000,
+        tolerance=2.0,
+        smoothing=0.2,
+        decay=0.05,
+        retry_after=1,
+    ):
+        super().__init__(initial, retry_after)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.decay = decay
+        self.average_latency = None
+
+    def update(self, latency, failed):
+        if failed:
+            self.limit = max(self.min_limit, self.limit / 2)
+            return
+        if self.average_latency is None:
+            self.average_latency = latency
+        else:
+            self.average_latency += self.decay * (
+                latency - self.average_latency
+            )
+        if latency <= 0:
+            return
+        gradient = max(
+            0.5, min(1.0, self.tolerance * self.average_latency / latency)
+        )
+        limit = self.limit * gradient + math.sqrt(self.limit)
+        self.limit = max(
+            self.min_limit,
+            min(
+                self.max_limit,
+                (1 - self.smoothing) * self.limit + self.smoothing * limit,
+            ),
+        )
+
+
+def client_ip(request):
+    """
+    Rate limiting key function returning IP address of client
+    """
+    return request.remote_ip
+
+
+def api_key(header="X-API-Key", keys=None):
+    """
+    Return rate limiting key function returning value of given request
+    header, or IP address of client if there is none or, when ``keys``
+    container is given, if it is not one of them. Clients can send any value
+    in the header, getting fresh bucket with each new one, so either give
+    ``keys`` or make sure the header is authenticated before rate limiting,
+    e.g. by proxy.
+    """
+
+    def key(request):
+        value = request.headers.get(header)
+        if not value or keys is not None and value not in keys:
+            return request.remote_ip
+        return value
+
+    return key
+
+
+class _Buckets:
+    """
+    Token buckets of one budget by key, in order of last use. Buckets unused
+    long enough to refill completely are the same as new ones, so they are
+    dropped from the old end on each access, keeping the map at the size of
+    clients active within refill time with O(1) amortized cost.
+    """
+
+    def __init__(self, rate, burst):
+        if burst < 1:
+            raise ValueError("Burst must allow at least one request")
+        self.rate = rate
+        self.burst = burst
+        self._refill_time = burst / rate
+        self._buckets = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def take(self, key, now):
+        """
+        Take token from bucket of key, returning ``0`` on success or seconds
+        until a token is available
+        """
+        buckets = self._buckets
+        while buckets:
+            oldest = next(iter(buckets.values()))
+            if now - oldest[1] < self._refill_time:
+                break
+            buckets.popitem(last=False)
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = [float(self.burst), now]
+        else:
+            bucket[0] = min(
+                self.burst, bucket[0] + (now - bucket[1]) * self.rate
+            )
+            bucket[1] = now
+            buckets.move_to_end(key)
+        if bucket[0] < 1:
+            return (1 - bucket[0]) / self.rate
+        bucket[0] -= 1
+        return 0
+
+
+class RateLimit:
+    """
+    Per-client rate limit of requests with token buckets, given to
+    :py:class:`tornado_jsonapi.handlers.APIHandler` as ``jsonapi_rate_limit``
+    application setting. Reads (``GET``, ``HEAD`` and ``OPTIONS`` requests)
+    and writes have separate budgets, each allowing ``rate`` requests per
+    second on average and bursts of up to ``burst`` requests. Requests beyond
+    the budget are rejected with ``429 Too Many Requests`` and
+    ``Retry-After`` header:
+
+    .. code-block:: python
+
+        application = tornado.web.Application([
+            # ... handlers ...
+        ], jsonapi_rate_limit=tornado_jsonapi.limits.RateLimit(
+            read_rate=50, read_burst=100, write_rate=5, write_burst=10,
+            key=tornado_jsonapi.limits.api_key("X-API-Key")))
+
+    :param float read_rate: reads per second allowed, or ``None`` not to
+        limit them.
+    :param int read_burst: bucket size for reads, ``read_rate`` but at least
+        one by default.
+    :param float write_rate: writes per second allowed, or ``None`` not to
+        limit them.
+    :param int write_burst: bucket size for writes, ``write_rate`` but at
+        least one by default.
+    :param key: function taking
+        :py:class:`tornado.httputil.HTTPServerRequest` and returning key of
+        its client, :py:func:`client_ip` by default (see also
+        :py:func:`api_key`).
+    """
+
+    _reads = frozenset(("GET", "HEAD", "OPTIONS"))
+
+    def __init__(
+        self,
+        read_rate=None,
+        read_burst=None,
+        write_rate=None,
+        write_burst=None,
+        key=client_ip,
+    ):
+        self.key = key
+        self.reads = self.writes = None
+        if read_rate is not None:
+            self.reads = _Buckets(read_rate, read_burst or max(1, read_rate))
+        if write_rate is not None:
+            self.writes = _Buckets(
+                write_rate, write_burst or max(1, write_rate)
+            )
+
+    def check(self, request):
+        """
+        Take token for request from bucket of its client, returning ``0`` if
+        request may proceed or seconds until it may be retried
+        """
+        buckets = self.reads if request.method in self._reads else self.writes
+        if buckets is None:
+            return 0
+        return buckets.take(self.key(request), time.monotonic())
@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import bisect
+import collections
+import re
+import sys
+import threading
+import time
+import tornado.ioloop
+import tornado.web
+from tornado.log import app_log
+
+
+# default histogram buckets, in seconds
+_buckets = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    """
+    Histogram with fixed buckets, as in Prometheus.
+
+    :param tuple buckets: sorted upper bounds of buckets, last bucket being
+        unbounded.
+    """
+
+    def __init__(self, buckets=_buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """
+        Estimate given quantile (e.g. ``0.99``) by linear interpolation within
+        bucket it falls into, or return ``None`` if nothing was observed
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (
+                    (rank - seen) / count
+                )
+            seen += count
+        return self.buckets[-1]
+
+
+def _labels(**labels):
+    return ",".join(
+        '%s="%s"'
+        % (
+            name,
+            str(value)
+            .replace("\\", "\\\\")
+            .replace('"', '\\"')
+            .replace("\n", "\\n"),
+        )
+        for name, value in sorted(labels.items())
+    )
+
+
+# number of backend calls in progress by request, see current_request
+_backend_requests = collections.Counter()
+
+
+def enter_backend(request):
+    """
+    Mark that request waits for backend call
+    """
+    _backend_requests[request] += 1
+
+
+def leave_backend(request):
+    """
+    Mark that backend call of request is over
+    """
+    _backend_requests[request] -= 1
+    if not _backend_requests[request]:
+        del _backend_requests[request]
+
+
+def current_request():
+    """
+    Return request which issued backend call in progress, or ``None`` if
+    there are several such requests, so it cannot be told
+    """
+    if len(_backend_requests) == 1:
+        return next(iter(_backend_requests))
+    return None
+
+
+# lists of placeholders, e.g. of IN clause or of each of multi-row VALUES,
+# and then the multiple rows
+_placeholders_re = re.compile(r"\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,?)+\)")
+_rows_re = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+# literals inlined into statements, e.g. limit and offset
+_literals_re = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def _redact(parameters):
+    if isinstance(parameters, dict):
+        return {k: _redact(v) for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact(v) for v in parameters]
+    if parameters is None:
+        return None
+    return "<%s>" % type(parameters).__name__
+
+
+class QueryStats:
+    """
+    Statistics of SQL statements executed by
+    :py:class:`tornado_jsonapi.resource.DBAPI2Resource` and
+    :py:class:`tornado_jsonapi.resource.SQLAlchemyResource` (see
+    :py:data:`query_stats`): number of executions, total and maximum time per
+    statement. Numeric and string literals are replaced with placeholders and
+    lists of placeholders are collapsed, so that e.g. ``IN`` clauses of any
+    length or pages of any ``LIMIT`` are the same statement. Statements
+    taking at least ``slow_threshold`` seconds are logged along with their
+    parameters and request that issued them, when it can be told (see
+    :py:func:`current_request`).
+
+    :param float slow_threshold: time in seconds to log statements taking
+        longer than, or ``None`` not to log them.
+    :param bool redact: whether to log only types of parameters instead of
+        their values.
+    """
+
+    def __init__(self, slow_threshold=0.5, redact=True):
+        self.slow_threshold = slow_threshold
+        self.redact = redact
+        self.statements = {}
+
+    def record(self, statement, parameters, duration):
+        """
+        Record execution of statement which took given time in seconds
+        """
+        key = _rows_re.sub(
+            "(?)",
+            _placeholders_re.sub("(?)", _literals_re.sub("?", statement)),
+        )
+        stats = self.statements.get(key)
+        if stats is None:
+            stats = self.statements[key] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += duration
+        stats[2] = max(stats[2], duration)
+        if self.slow_threshold is not None and duration >= self.slow_threshold:
+            request = current_request()
+            app_log.warning(
+                "Slow statement (%.3fs): %s\nParameters: %r\nRequest: %s",
+                duration,
+                statement,
+                _redact(parameters) if self.redact else parameters,
+                "unknown"
+                if request is None
+                else "%s %s (%s)"
+                % (request.method, request.uri, request.remote_ip),
+            )
+
+    def render(self):
+        """
+        Return statistics in Prometheus text format
+        """
+        lines = []
+        for name, type_, help_, index in (
+            (
+                "tornado_jsonapi_statements_total",
+                "counter",
+                "Executed SQL statements",
+                0,
+            ),
+            (
+                "tornado_jsonapi_statement_duration_seconds_total",
+                "counter",
+                "Total time of SQL statements",
+                1,
+            ),
+            (
+                "tornado_jsonapi_statement_duration_max_seconds",
+                "gauge",
+                "Maximum time of SQL statements",
+                2,
+            ),
+        ):
+            lines.append("# HELP %s %s" % (name, help_))
+            lines.append("# TYPE %s %s" % (name, type_))
+            for statement, stats in sorted(self.statements.items()):
+                lines.append(
+                    "%s{%s} %r"
+                    % (name, _labels(statement=statement), stats[index])
+                )
+        return "\n".join(lines) + "\n"
+
+
+# statistics of SQL statements of all the resources
+query_stats = QueryStats()
+
+
+def _function(frame):
+    self = frame.f_locals.get("self")
+    if self is None:
+        return frame.f_code.co_name
+    return "%s.%s" % (type(self).__name__, frame.f_code.co_name)
+
+
+def _attribute(frame):
+    """
+    Return ``(handler, call)`` describing what frame of IOLoop thread is
+    running: request handler, if any, and the outermost function it called,
+    e.g. method of resource, or the innermost function when there is no
+    handler
+    """
+    handler = call = None
+    innermost = frame
+    while frame is not None:
+        self = frame.f_locals.get("self")
+        if isinstance(self, tornado.web.RequestHandler):
+            handler = "%s %s %s" % (
+                type(self).__name__,
+                self.request.method,
+                self.request.uri,
+            )
+            break
+        call = _function(frame)
+        frame = frame.f_back
+    if handler is None and innermost is not None:
+        call = _function(innermost)
+    return handler, call
+
+
+class LoopMonitor:
+    """
+    Monitor of IOLoop responsiveness. Scheduling delay of callback run every
+    ``interval`` seconds is collected in histogram, and watchdog thread
+    detects callbacks blocking IOLoop for more than ``threshold`` seconds,
+    e.g. synchronous :py:class:`tornado_jsonapi.resource.Resource` methods,
+    logging them along with the handler and function it called that were
+    running, and counting them by the latter. Pass monitor to
+    :py:class:`Metrics` to export these:
+
+    .. code-block:: python
+
+        monitor = tornado_jsonapi.metrics.LoopMonitor()
+        monitor.start()
+        metrics = tornado_jsonapi.metrics.Metrics(loop_monitor=monitor)
+
+    :param float interval: seconds between checks.
+    :param float threshold: seconds of blocking to report.
+    :param tuple buckets: upper bounds of lag histogram buckets in seconds.
+    """
+
+    def __init__(self, interval=0.05, threshold=0.1, buckets=_buckets):
+        self.interval = interval
+        self.threshold = threshold
+        self.lag = Histogram(buckets)
+        self.blocked = collections.Counter()
+        self.blocked_seconds = collections.Counter()
+        self._callback = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """
+        Start monitoring current IOLoop
+        """
+        self._io_loop = tornado.ioloop.IOLoop.current()
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = self._expected = time.monotonic() + self.interval
+        self._blocking = False
+        self._stopped.clear()
+        self._callback = tornado.ioloop.PeriodicCallback(
+            self._tick, self.interval * 1000
+        )
+        self._callback.start()
+        self._thread = threading.Thread(
+            target=self._watch, name="LoopMonitor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._callback.stop()
+        self._stopped.set()
+        self._thread.join()
+
+    def _tick(self):
+        now = time.monotonic()
+        self.lag.observe(max(now - self._expected, 0.0))
+        self._heartbeat = now
+        self._expected = now + self.interval
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval):
+            since = self._heartbeat
+            if (
+                self._blocking or
+                time.monotonic() - since < self.threshold + self.interval
+            ):
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            self._blocking = True
+            self._io_loop.add_callback(
+                self._report, _attribute(frame), since
+            )
+
+    def _report(self, where, since):
+        duration = time.monotonic() - since - self.interval
+        handler, call = where
+        app_log.warning(
+            "IOLoop blocked for %.3fs in %s called by %s",
+            duration,
+            call or "unknown",
+            handler or "no handler",
+        )
+        self.blocked[call or "unknown"] += 1
+        self.blocked_seconds[call or "unknown"] += duration
+        self._blocking = False
+
+    def render(self):
+        """
+        Return metrics in Prometheus text format
+        """
+        name = "tornado_jsonapi_loop_lag_seconds"
+        lines = [
+            "# HELP %s IOLoop scheduling delay" % name,
+            "# TYPE %s histogram" % name,
+        ]
+        cumulative = 0
+        for bound, count in zip(self.lag.buckets + ("+Inf",), self.lag.counts):
+            cumulative += count
+            lines.append('%s_bucket{le="%s"} %d' % (name, bound, cumulative))
+        lines.append("%s_sum %r" % (name, self.lag.sum))
+        lines.append("%s_count %d" % (name, self.lag.count))
+        for name, help_, values, format_ in (
+            (
+                "tornado_jsonapi_loop_blocked_total",
+                "Callbacks blocking IOLoop longer than threshold",
+                self.blocked,
+                "%d",
+            ),
+            (
+                "tornado_jsonapi_loop_blocked_seconds_total",
+                "Time IOLoop was blocked by callbacks",
+                self.blocked_seconds,
+                "%r",
+            ),
+        ):
+            lines.append("# HELP %s %s" % (name, help_))
+            lines.append("# TYPE %s counter" % name)
+            for call, value in sorted(values.items()):
+                lines.append(
+                    ("%s{%s} " + format_) % (name, _labels(call=call), value)
+                )
+        return "\n".join(lines) + "\n"
+
+
+class Metrics:
+    """
+    Request metrics per resource and HTTP method: request counts by status,
+    latency and backend time histograms, numbers of rendered resources and
+    written bytes. Recording is a few dict updates, done on IOLoop thread
+    without locks, so it can be left on in production. Subscribe
+    :py:meth:`record` to timings of requests and serve metrics in
+    `Prometheus <https://prometheus.io/>`_ text format with
+    :py:class:`MetricsHandler`:
+
+    .. code-block:: python
+
+        metrics = tornado_jsonapi.metrics.Metrics()
+        application = tornado.web.Application([
+            (
+                r"/metrics",
+                tornado_jsonapi.metrics.MetricsHandler,
+                dict(metrics=metrics)
+            ),
+            # ... handlers ...
+        ], jsonapi_timing_hooks=[metrics.record])
+
+    :param tuple buckets: upper bounds of histogram buckets in seconds.
+    :param tuple quantiles: quantiles of latency to report, estimated from
+        histograms.
+    :param QueryStats query_stats: statistics of SQL statements to report
+        along, if any.
+    :param LoopMonitor loop_monitor: IOLoop monitor to report along, if any.
+    """
+
+    def __init__(
+        self,
+        buckets=_buckets,
+        quantiles=(0.5, 0.99),
+        query_stats=query_stats,
+        loop_monitor=None,
+    ):
+        self.buckets = buckets
+        self.quantiles = quantiles
+        self.query_stats = query_stats
+        self.loop_monitor = loop_monitor
+        self.requests = collections.Counter()
+        self.latency = collections.defaultdict(self._histogram)
+        self.backend = collections.defaultdict(self._histogram)
+        self.rendered = collections.Counter()
+        self.written = collections.Counter()
+
+    def _histogram(self):
+        return Histogram(self.buckets)
+
+    def record(self, handler, timings):
+        """
+        Record finished request, see
+        :py:meth:`tornado_jsonapi.handlers.APIHandler.get_timings`
+        """
+        resource = getattr(handler, "_resource", None)
+        name = (
+            resource.name()
+            if hasattr(resource, "name")
+            else type(handler).__name__
+        )
+        key = (name, handler.request.method)
+        self.requests[key + (handler.get_status(),)] += 1
+        self.latency[key].observe(handler.request.request_time())
+        if "backend" in timings:
+            self.backend[key].observe(timings["backend"])
+        self.rendered[key] += getattr(handler, "_rendered", 0)
+        self.written[key] += getattr(handler, "_written", 0)
+
+    def render(self):
+        """
+        Return metrics in Prometheus text format
+        """
+        lines = []
+
+        def counter(name, help_, values, *label_names):
+            lines.append("# HELP %s %s" % (name, help_))
+            lines.append("# TYPE %s counter" % name)
+            for key, value in sorted(values.items()):
+                labels = _labels(**dict(zip(label_names, key)))
+                lines.append("%s{%s} %d" % (name, labels, value))
+
+        def histogram(name, help_, histograms):
+            lines.append("# HELP %s %s" % (name, help_))
+            lines.append("# TYPE %s histogram" % name)
+            for (resource, method), h in sorted(histograms.items()):
+                labels = _labels(resource=resource, method=method)
+                cumulative = 0
+                for bound, count in zip(h.buckets + ("+Inf",), h.counts):
+                    cumulative += count
+                    lines.append(
+                        '%s_bucket{%s,le="%s"} %d'
+                        % (name, labels, bound, cumulative)
+                    )
+                lines.append("%s_sum{%s} %r" % (name, labels, h.sum))
+                lines.append("%s_count{%s} %d" % (name, labels, h.count))
+
+        counter(
+            "tornado_jsonapi_requests_total",
+            "Requests by status",
+            self.requests,
+            "resource",
+            "method",
+            "status",
+        )
+        counter(
+            "tornado_jsonapi_errors_total",
+            "Error responses by status",
+            {k: v for k, v in self.requests.items() if k[2] >= 400},
+            "resource",
+            "method",
+            "status",
+        )
+        histogram(
+            "tornado_jsonapi_request_duration_seconds",
+            "Request latency",
+            self.latency,
+        )
+        name = "tornado_jsonapi_request_duration_quantile_seconds"
+        lines.append("# HELP %s Estimated quantiles of request latency" % name)
+        lines.append("# TYPE %s gauge" % name)
+        for (resource, method), h in sorted(self.latency.items()):
+            for q in self.quantiles:
+                labels = _labels(resource=resource, method=method, quantile=q)
+                lines.append("%s{%s} %r" % (name, labels, h.quantile(q)))
+        histogram(
+            "tornado_jsonapi_backend_duration_seconds",
+            "Time spent in resource calls per request",
+            self.backend,
+        )
+        counter(
+            "tornado_jsonapi_rendered_resources_total",
+            "Rendered resource objects",
+            self.rendered,
+            "resource",
+            "method",
+        )
+        counter(
+            "tornado_jsonapi_response_bytes_total",
+            "Written response body bytes",
+            self.written,
+            "resource",
+            "method",
+        )
+        text = "\n".join(lines) + "\n"
+        if self.query_stats is not None:
+            text += self.query_stats.render()
+        if self.loop_monitor is not None:
+            text += self.loop_monitor.render()
+        return text
+
+
+class MetricsHandler(tornado.web.RequestHandler):
+    """
+    Handler serving :py:class:`Metrics` in Prometheus text format
+    """
+
+    SUPPORTED_METHODS = ("GET",)
+
+    def initialize(self, metrics):
+        self._metrics = metrics
+
+    def get(self):
+        self.set_header("Content-Type", "text/plain; version=0.0.4")
+        self.finish(self._metrics.render())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import collections
+import cProfile
+import hmac
+import json
+import pstats
+import tracemalloc
+import uuid
+import status
+import tornado.web
+
+
+class Profiler:
+    """
+    On-demand profiling of single requests to
+    :py:class:`tornado_jsonapi.handlers.APIHandler`. Requests with
+    ``X-Profile`` header authorized by ``authorize`` are run under
+    :py:mod:`cProfile` and :py:mod:`tracemalloc`, and the top functions by
+    cumulative time and top allocation sites are stored by request ID, taken
+    from ``X-Request-Id`` header or generated, and returned in ``X-Profile-Id``
+    response header. Other requests only pay for a setting lookup. Profiles
+    are served by :py:class:`ProfileHandler`:
+
+    .. code-block:: python
+
+        profiler = tornado_jsonapi.profiling.Profiler(
+            os.environ["PROFILE_TOKEN"])
+        application = tornado.web.Application([
+            (
+                r"/profiles/([^/]+)",
+                tornado_jsonapi.profiling.ProfileHandler,
+                dict(profiler=profiler)
+            ),
+            # ... handlers ...
+        ], jsonapi_profiler=profiler)
+
+    and then e.g. ``curl -H "X-Profile: $PROFILE_TOKEN" ...``.
+
+    Profilers hook whole interpreter, so only one request is profiled at a
+    time, others are served as usual, and anything else IOLoop runs while
+    profiled request waits (e.g. for database) is included in its profile.
+
+    :param authorize: secret value of ``X-Profile`` header, or function
+        taking :py:class:`tornado.httputil.HTTPServerRequest` and returning
+        whether it may be profiled.
+    :param int maxlen: number of profiles to keep, older ones are dropped.
+    :param int top: number of functions and allocation sites to keep.
+    """
+
+    def __init__(self, authorize, maxlen=100, top=20):
+        self._authorize = authorize
+        self.maxlen = maxlen
+        self.top = top
+        self.profiles = collections.OrderedDict()
+        self._active = None
+
+    def authorized(self, request):
+        """
+        Return whether request is allowed to be profiled and see profiles
+        """
+        if callable(self._authorize):
+            return self._authorize(request)
+        header = request.headers.get("X-Profile")
+        return header is not None and hmac.compare_digest(
+            header.encode("utf-8"), self._authorize.encode("utf-8")
+        )
+
+    def start(self, request):
+        """
+        Start profiling request if it asks for it, is authorized and no other
+        request is profiled, returning its ID, or return ``None``
+        """
+        if (
+            "X-Profile" not in request.headers or
+            self._active is not None or
+            not self.authorized(request)
+        ):
+            return None
+        request_id = request.headers.get("X-Request-Id") or uuid.uuid4().hex
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        profile = cProfile.Profile()
+        self._active = (
+            request_id,
+            profile,
+            tracing,
+            tracemalloc.take_snapshot(),
+        )
+        profile.enable()
+        return request_id
+
+    def stop(self, request_id):
+        """
+        Stop profiling request with given ID and store its profile
+        """
+        if self._active is None or self._active[0] != request_id:
+            return
+        _, profile, tracing, before = self._active
+        profile.disable()
+        after = tracemalloc.take_snapshot()
+        if not tracing:
+            tracemalloc.stop()
+        self._active = None
+        stats = pstats.Stats(profile).stats
+        functions = sorted(stats.items(), key=lambda s: -s[1][3])
+        self.profiles[request_id] = {
+            "functions": [
+                {
+                    "function": "%s:%d(%s)" % key,
+                    "calls": calls,
+                    "time": time_,
+                    "cumulative": cumulative,
+                }
+                for key, (_, calls, time_, cumulative, _) in functions[
+                    :self.top
+                ]
+            ],
+            "allocations": [
+                {
+                    "site": str(stat.traceback),
+                    "size": stat.size_diff,
+                    "count": stat.count_diff,
+                }
+                for stat in after.compare_to(before, "lineno")[:self.top]
+                if stat.size_diff > 0
+            ],
+        }
+        while len(self.profiles) > self.maxlen:
+            self.profiles.popitem(last=False)
+
+
+class ProfileHandler(tornado.web.RequestHandler):
+    """
+    Handler serving profiles stored by :py:class:`Profiler` as JSON, to
+    requests it authorizes
+    """
+
+    SUPPORTED_METHODS = ("GET",)
+
+    def initialize(self, profiler):
+        self._profiler = profiler
+
+    def get(self, request_id):
+        if not self._profiler.authorized(self.request):
+            raise tornado.web.HTTPError(status.HTTP_403_FORBIDDEN)
+        profile = self._profiler.profiles.get(request_id)
+        if profile is None:
+            raise tornado.web.HTTPError(status.HTTP_404_NOT_FOUND)
+        self.set_header("Content-Type", "application/json")
+        self.finish(json.dumps(profile))
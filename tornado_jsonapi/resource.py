@@ -1,14 +1,60 @@
 #!/usr/bin/env python3
 # vim: set fileencoding=utf8 :
 
+import copy
+import hashlib
+import json
 import types
+import uuid
+import operator
+import collections
+import time
 from contextlib import contextmanager
 from tornado import gen
 from tornado.concurrent import Future, is_future
 import inflection
-import python_jsonschema_objects as pjs
+import status
 
-from tornado_jsonapi.exceptions import MissingResourceSchemaError
+from tornado_jsonapi.exceptions import APIError, MissingResourceSchemaError
+from tornado_jsonapi._validation import compile_schema
+from tornado_jsonapi import metrics, tracing
+
+
+# validating functions and python_jsonschema_objects classes by digest of
+#  schema, so that resources sharing schema (e.g. in several API versions) or
+#  created anew (e.g. in each test) build them only once
+_compiled_schemas = {}
+
+
+def _compile_schema(schema):
+    """
+    Get validating function and :py:mod:`python_jsonschema_objects` classes
+    for schema, building them unless they are built for identical schema
+    already
+    """
+    key = hashlib.sha1(
+        json.dumps(schema, default=str).encode(encoding="UTF-8")
+    ).digest()
+    compiled = _compiled_schemas.get(key)
+    if compiled is None:
+        import python_jsonschema_objects as pjs
+
+        validate = compile_schema(schema)
+        # NB: building classes modifies schema
+        builder = pjs.ObjectBuilder(copy.deepcopy(schema))
+        compiled = _compiled_schemas[key] = (validate, builder.build_classes())
+    return compiled
+
+
+class Relationship:
+    """
+    Relationship between resources, see :py:meth:`Resource.add_relationship`.
+    """
+
+    def __init__(self, resource, key, many=False):
+        self.resource = resource
+        self.key = key
+        self.many = many
 
 
 class Resource:
@@ -22,16 +68,16 @@ class Resource:
         def attributes(self):
             raise NotImplementedError
 
-        # TODO : relationships, links, meta
+        # TODO : links, meta
 
     def __init__(self, schema):
         self.schema = schema
-        builder = pjs.ObjectBuilder(self.schema)
-        classes = builder.build_classes()
+        self._validate, classes = _compile_schema(self.schema)
         name = inflection.camelize(self.name())
         if name not in classes:
             raise MissingResourceSchemaError(name)
         self._schema = classes[name]
+        self._relationships = collections.OrderedDict()
 
     def _on_request_end(self):
         pass
@@ -39,6 +85,64 @@ class Resource:
     def name(self):
         raise NotImplementedError
 
+    def add_relationship(self, name, resource, key, many=False):
+        """
+        Declare relationship to another resource, which then could be
+        included into compound documents with ``include`` query parameter.
+        Related resources are loaded with one query per relationship.
+
+        :param str name: relationship name.
+        :param Resource resource: related resource.
+        :param str key: for to-one relationship, attribute of this resource
+            holding ID of related one, e.g. ``author_id``; for to-many
+            relationship, attribute of related resource holding ID of this
+            one, e.g. ``post_id``.
+        :param bool many: whether relationship is to-many.
+        """
+        self._relationships[name] = Relationship(resource, key, many)
+
+    def relationships(self):
+        return self._relationships
+
+    def relationship_key(self, resource, key):
+        """
+        Return value of relationship key attribute of given resource object.
+        """
+        return resource.attributes().get(key)
+
+    def transaction_key(self):
+        """
+        Return hashable key identifying database of this resource, so that
+        operations on all resources having equal keys can be performed in
+        single transaction started with :py:meth:`begin`, or ``None`` if
+        resource does not support transactions (the default).
+        """
+        return None
+
+    def begin(self):
+        """
+        Begin transaction (possibly returning a future), returning object
+        with ``commit`` and ``rollback`` methods.
+        """
+        raise NotImplementedError
+
+    def bind(self, transaction):
+        """
+        Return copy of this resource performing all operations within given
+        transaction instead of committing each one.
+        """
+        raise NotImplementedError
+
+    def begin_isolated(self):
+        """
+        Begin transaction (possibly returning a future) which may be kept
+        open across many IOLoop iterations while other requests are served,
+        e.g. by :py:class:`tornado_jsonapi.handlers.ImportHandler`, so that
+        they can neither commit nor roll back its changes, or return ``None``
+        if resource cannot isolate it. Same as :py:meth:`begin` by default.
+        """
+        return self.begin()
+
     def exists(self, id_):
         return self.read(id_) is not None
 
@@ -48,28 +152,204 @@ class Resource:
     def read(self, id_):
         raise NotImplementedError
 
+    @gen.coroutine
+    def read_many(self, ids):
+        """
+        Read all resources with given IDs, silently skipping missing ones.
+        This default implementation calls :py:meth:`read` for each ID;
+        override it to fetch all of them at once.
+        """
+        res = []
+        for id_ in ids:
+            resource = self.read(id_)
+            while is_future(resource):
+                resource = yield resource
+            if resource is not None:
+                res.append(resource)
+        return res
+
     def update(self, id_, attributes):
         raise NotImplementedError
 
     def delete(self, id_):
         raise NotImplementedError
 
-    def list_(self, limit=0, page=0):
+    @gen.coroutine
+    def create_many(self, attributes_list):
+        """
+        Create resources from list of attributes dicts, returning them in the
+        same order. This default implementation calls :py:meth:`create` for
+        each one; override it to create all of them in single transaction,
+        which should be rolled back if it fails, since
+        :py:class:`tornado_jsonapi.writes.CoalescingResource` then retries
+        creating them one by one.
+        """
+        res = []
+        for attributes in attributes_list:
+            resource = self.create(attributes)
+            while is_future(resource):
+                resource = yield resource
+            res.append(resource)
+        return res
+
+    @gen.coroutine
+    def update_many(self, updates):
+        """
+        Update resources given list of ``(id_, attributes)`` tuples, returning
+        them in the same order. This default implementation calls
+        :py:meth:`update` for each one.
+        """
+        res = []
+        for id_, attributes in updates:
+            resource = self.update(id_, attributes)
+            while is_future(resource):
+                resource = yield resource
+            res.append(resource)
+        return res
+
+    @gen.coroutine
+    def delete_many(self, ids):
+        """
+        Delete resources with given IDs, returning number of deleted ones.
+        This default implementation calls :py:meth:`delete` for each one.
+        """
+        count = 0
+        for id_ in ids:
+            res = self.delete(id_)
+            while is_future(res):
+                res = yield res
+            if res:
+                count += 1
+        return count
+
+    @gen.coroutine
+    def copy_from(self, attributes_list):
+        """
+        Import resources from list (or any other iterable) of attributes
+        dicts as fast as possible, returning number of created ones. This
+        default implementation calls :py:meth:`create_many`.
+        """
+        res = self.create_many(list(attributes_list))
+        while is_future(res):
+            res = yield res
+        return len(res)
+
+    @gen.coroutine
+    def stream(self, callback, filters=None, sort=None, chunk_size=1000):
+        """
+        Pass all resources matching filters to ``callback`` in lists of at
+        most ``chunk_size`` ones, waiting for it if it returns a future, so
+        that whole collection never has to be held in memory. Arguments have
+        the same meaning as for :py:meth:`list_`. This default implementation
+        calls :py:meth:`list_` for consecutive pages.
+        """
+        kwargs = {"filters": filters} if filters else {}
+        if sort:
+            kwargs["sort"] = sort
+        page = 0
+        while True:
+            resources = self.list_(limit=chunk_size, page=page, **kwargs)
+            while is_future(resources):
+                resources = yield resources
+            if resources:
+                res = callback(resources)
+                while is_future(res):
+                    res = yield res
+            if len(resources) < chunk_size:
+                return
+            page += 1
+
+    def list_(self, limit=0, page=0, filters=None, sort=None):
+        """
+        List resources. ``filters`` is a list of ``(attribute, operator,
+        value)`` tuples to be combined with logical AND, where operator is one
+        of ``eq``, ``ne``, ``lt``, ``le``, ``gt``, ``ge`` or ``in`` (in which
+        case value is a list). ``sort`` is a list of ``(attribute,
+        descending)`` tuples.
+        """
         raise NotImplementedError
 
-    def list_count(self):
+    def list_count(self, filters=None):
         raise NotImplementedError
 
 
-try:
-    import sqlalchemy
-    import alchemyjsonschema
+def _import_sqlalchemy():
+    """
+    Import dependencies of :py:class:`SQLAlchemyResource`, deferred until it
+    is used as they take long to import
+    """
+    global sqlalchemy, alchemyjsonschema
+    import sqlalchemy.event
+    import sqlalchemy.orm
     import alchemyjsonschema.dictify
-except ImportError:
-    pass
+
+
+# schemas generated for models by (model, excludes)
+_model_schemas = {}
+
+
+def _record_statement(statement, parameters, duration):
+    """
+    Record statement which took given time in seconds in
+    :py:data:`tornado_jsonapi.metrics.query_stats` and trace it
+    """
+    metrics.query_stats.record(statement, parameters, duration)
+    tracing.record_span("sql", duration, statement=statement)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    start = conn.info["query_start"].pop()
+    _record_statement(statement, parameters, time.perf_counter() - start)
+
+
+def _handle_error(context):
+    # after_cursor_execute is not called for failed statements, and there
+    # is no connection when connecting fails
+    if context.connection is None:
+        return
+    starts = context.connection.info.get("query_start")
+    if not starts:
+        return
+    _record_statement(
+        context.statement,
+        context.parameters,
+        time.perf_counter() - starts.pop(),
+    )
+
+
+def _listen_statements(engine):
+    """
+    Record statements executed by engine with :py:func:`_record_statement`
+    """
+    if not sqlalchemy.event.contains(
+        engine, "before_cursor_execute", _before_cursor_execute
+    ):
+        sqlalchemy.event.listen(
+            engine, "before_cursor_execute", _before_cursor_execute
+        )
+        sqlalchemy.event.listen(
+            engine, "after_cursor_execute", _after_cursor_execute
+        )
+        sqlalchemy.event.listen(engine, "handle_error", _handle_error)
 
 
 class SQLAlchemyResource(Resource):
+    # PostgreSQL's limit of bind parameters of statement
+    _max_parameters = 65535
+
+    _operators = {
+        "eq": operator.eq,
+        "ne": operator.ne,
+        "lt": operator.lt,
+        "le": operator.le,
+        "gt": operator.gt,
+        "ge": operator.ge,
+    }
+
     class ResourceObject:
         def __init__(self, resource, model, blacklist=None):
             self.resource = resource
@@ -94,7 +374,35 @@ class SQLAlchemyResource(Resource):
                 attributes_.pop(key, None)
             return attributes_
 
+    class Transaction:
+        def __init__(self, session):
+            self.session = session
+
+        def commit(self):
+            self.session.commit()
+            self.session.close()
+
+        def rollback(self):
+            self.session.rollback()
+            self.session.close()
+
+    class _FlushingSession:
+        """
+        Session proxy flushing changes instead of committing them, so that
+        they are committed along with the whole transaction
+        """
+
+        def __init__(self, session):
+            self._session = session
+
+        def __getattr__(self, name):
+            return getattr(self._session, name)
+
+        def commit(self):
+            self._session.flush()
+
     def __init__(self, model_cls, sessionmaker):
+        _import_sqlalchemy()
         self._primary_columns = model_cls.__table__.primary_key.columns.keys()
         if len(self._primary_columns) > 1:
             raise NotImplementedError("Compound primary keys not supported")
@@ -104,12 +412,19 @@ class SQLAlchemyResource(Resource):
         )
         self.sessionmaker = sessionmaker
         self.session = sqlalchemy.orm.scoped_session(sessionmaker)
+        if getattr(sessionmaker, "kw", {}).get("bind") is not None:
+            _listen_statements(sessionmaker.kw["bind"])
         self.blacklist = []
-        factory = alchemyjsonschema.SchemaFactory(
-            alchemyjsonschema.StructuralWalker
-        )
-        schema = factory(self.model_cls, excludes=self._primary_columns)
+        key = (self.model_cls, tuple(self._primary_columns))
+        schema = _model_schemas.get(key)
+        if schema is None:
+            factory = alchemyjsonschema.SchemaFactory(
+                alchemyjsonschema.StructuralWalker
+            )
+            schema = factory(self.model_cls, excludes=self._primary_columns)
+            _model_schemas[key] = schema
         super().__init__(schema)
+        self.columns = list(schema["properties"].keys())
 
     def _on_request_end(self):
         self.session.remove()
@@ -117,6 +432,17 @@ class SQLAlchemyResource(Resource):
     def _id_filter(self, id_):
         return {self._primary_columns[0]: id_}
 
+    def transaction_key(self):
+        return self.sessionmaker
+
+    def begin(self):
+        return SQLAlchemyResource.Transaction(self.sessionmaker())
+
+    def bind(self, transaction):
+        bound = copy.copy(self)
+        bound.session = SQLAlchemyResource._FlushingSession(transaction.session)
+        return bound
+
     def name(self):
         return inflection.camelize(
             self.model_cls.__name__, uppercase_first_letter=False
@@ -151,6 +477,19 @@ class SQLAlchemyResource(Resource):
             )
         )
 
+    def read_many(self, ids):
+        if not ids:
+            return []
+        models = self.session.query(self.model_cls).filter(
+            self.model_primary_key.in_(ids)
+        )
+        return [
+            SQLAlchemyResource.ResourceObject(
+                self, model, blacklist=self.blacklist
+            )
+            for model in models
+        ]
+
     def update(self, id_, attributes):
         model = (
             self.session.query(self.model_cls)
@@ -176,18 +515,178 @@ class SQLAlchemyResource(Resource):
         self.session.commit()
         return r
 
-    def list_count(self):
-        return self.session.query(
-            sqlalchemy.func.count(self.model_primary_key)
+    def create_many(self, attributes_list):
+        """
+        Create resources with multi-row ``INSERT ... RETURNING`` statement
+        for each set of attributes given on PostgreSQL. Other databases
+        cannot return keys of multi-row inserts, so
+        :py:meth:`sqlalchemy.orm.session.Session.bulk_save_objects` inserts
+        rows one by one there. Session is rolled back if creation fails, so
+        that resources can be created one by one right after.
+        """
+        postgresql = (
+            self.session.get_bind(self.model_cls).dialect.name == "postgresql"
+        )
+        try:
+            if postgresql:
+                ids = self._insert_returning(attributes_list)
+            else:
+                models = [
+                    self.model_cls(**attributes)
+                    for attributes in attributes_list
+                ]
+                self.session.bulk_save_objects(models, return_defaults=True)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        if not postgresql:
+            return [
+                SQLAlchemyResource.ResourceObject(
+                    self, model, blacklist=self.blacklist
+                )
+                for model in models
+            ]
+        resources = {r.id_(): r for r in self.read_many(ids)}
+        return [resources[str(id_)] for id_ in ids]
+
+    def _insert_returning(self, attributes_list):
+        """
+        Insert rows with given attributes, returning their primary keys
+        """
+        columns = sqlalchemy.inspect(self.model_cls).columns
+        insert = (
+            self.model_cls.__table__.insert()
+            .returning(self.model_primary_key)
+        )
+        groups = collections.OrderedDict()
+        for index, attributes in enumerate(attributes_list):
+            groups.setdefault(tuple(sorted(attributes)), []).append(index)
+        ids = [None] * len(attributes_list)
+        for keys, indexes in groups.items():
+            chunk = max(1, self._max_parameters // max(1, len(keys)))
+            for start in range(0, len(indexes), chunk):
+                rows = indexes[start:start + chunk]
+                if not keys:
+                    # multi-row insert needs at least one column
+                    result = [
+                        self.session.execute(insert).first() for _ in rows
+                    ]
+                else:
+                    result = self.session.execute(
+                        insert.values(
+                            [
+                                {
+                                    columns[key]: attributes_list[i][key]
+                                    for key in keys
+                                }
+                                for i in rows
+                            ]
+                        )
+                    )
+                for index, (id_,) in zip(rows, result):
+                    ids[index] = id_
+        return ids
+
+    def update_many(self, updates):
+        self.session.bulk_update_mappings(
+            self.model_cls,
+            [
+                dict(attributes, **self._id_filter(id_))
+                for id_, attributes in updates
+            ],
+        )
+        self.session.commit()
+        resources = {r.id_(): r for r in self.read_many([u[0] for u in updates])}
+        return [resources[str(id_)] for id_, _ in updates]
+
+    def delete_many(self, ids):
+        if not ids:
+            return 0
+        r = (
+            self.session.query(self.model_cls)
+            .filter(self.model_primary_key.in_(ids))
+            .delete(synchronize_session=False)
+        )
+        self.session.commit()
+        return r
+
+    def relationship_key(self, resource, key):
+        # foreign keys are not part of schema generated by StructuralWalker
+        return getattr(resource.model, key)
+
+    def _column(self, attribute):
+        if attribute == "id":
+            return self.model_primary_key
+        if (
+            attribute in self.blacklist or
+            attribute not in self.model_cls.__table__.columns
+        ):
+            raise APIError(
+                status.HTTP_400_BAD_REQUEST,
+                'Unknown attribute "%s"',
+                attribute,
+            )
+        return getattr(self.model_cls, attribute)
+
+    def _filter(self, query, filters):
+        for attribute, operator_, value in filters or []:
+            column = self._column(attribute)
+            if operator_ == "in":
+                if not value:
+                    query = query.filter(sqlalchemy.sql.false())
+                else:
+                    query = query.filter(column.in_(value))
+            else:
+                query = query.filter(self._operators[operator_](column, value))
+        return query
+
+    def _order(self, query, sort):
+        if not sort:
+            return query
+        for attribute, descending in sort:
+            column = self._column(attribute)
+            query = query.order_by(column.desc() if descending else column)
+        if all(attribute != "id" for attribute, _ in sort):
+            query = query.order_by(self.model_primary_key)
+        return query
+
+    def list_count(self, filters=None):
+        return self._filter(
+            self.session.query(sqlalchemy.func.count(self.model_primary_key)),
+            filters,
         ).scalar()
 
-    def list_(self, limit=0, page=0):
+    @gen.coroutine
+    def stream(self, callback, filters=None, sort=None, chunk_size=1000):
+        models = self._order(
+            self._filter(self.session.query(self.model_cls), filters), sort
+        ).yield_per(chunk_size)
+        chunk = []
+        for model in models:
+            chunk.append(
+                SQLAlchemyResource.ResourceObject(
+                    self, model, blacklist=self.blacklist
+                )
+            )
+            if len(chunk) == chunk_size:
+                res = callback(chunk)
+                while is_future(res):
+                    res = yield res
+                chunk = []
+        if chunk:
+            res = callback(chunk)
+            while is_future(res):
+                res = yield res
+
+    def list_(self, limit=0, page=0, filters=None, sort=None):
+        models = self._order(
+            self._filter(self.session.query(self.model_cls), filters), sort
+        )
         if limit > 0:
             start = abs(page) * limit
             stop = start + limit
-            models = self.session.query(self.model_cls).slice(start, stop)
-        else:
-            models = self.session.query(self.model_cls)
+            models = models.slice(start, stop)
         res = []
         for model in models:
             res.append(
@@ -198,10 +697,13 @@ class SQLAlchemyResource(Resource):
         return res
 
 
-try:
+def _import_dbapiext():
+    """
+    Import dependencies of :py:class:`DBAPI2Resource`, deferred until it is
+    used
+    """
+    global dbapiext
     import dbapiext
-except ImportError:
-    pass
 
 
 @gen.coroutine
@@ -249,6 +751,136 @@ def momokoCursor(pool, transaction=False):
     return wrapper(pool, connection, transaction)
 
 
+@gen.coroutine
+def dbapi2Transaction(connection, close=False):
+    class wrapper:
+        def __init__(self, connection):
+            self.connection = connection
+
+        @gen.coroutine
+        def cursor(self, connection, transaction=False):
+            @contextmanager
+            def cursor_wrapper():
+                cursor = self.connection.cursor()
+                try:
+                    yield cursor
+                finally:
+                    cursor.close()
+
+            return cursor_wrapper()
+
+        def commit(self):
+            self.connection.commit()
+            if close:
+                self.connection.close()
+
+        def rollback(self):
+            self.connection.rollback()
+            if close:
+                self.connection.close()
+
+    return wrapper(connection)
+
+
+@gen.coroutine
+def momokoTransaction(pool):
+    class wrapper:
+        def __init__(self, pool, connection):
+            self.pool = pool
+            self.connection = connection
+
+        @gen.coroutine
+        def cursor(self, pool, transaction=False):
+            @contextmanager
+            def cursor_wrapper():
+                yield self.connection
+
+            return cursor_wrapper()
+
+        @gen.coroutine
+        def commit(self):
+            try:
+                yield self.connection.execute("COMMIT")
+            finally:
+                self.pool.putconn(self.connection)
+
+        @gen.coroutine
+        def rollback(self):
+            try:
+                yield self.connection.execute("ROLLBACK")
+            finally:
+                self.pool.putconn(self.connection)
+
+    connection = yield pool.getconn(ping=False)
+    yield connection.execute("BEGIN")
+    return wrapper(pool, connection)
+
+
+def _copy_value(value):
+    """
+    Format value for text format of PostgreSQL ``COPY``
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class _CopyReader:
+    """
+    File-like object feeding ``COPY ... FROM STDIN`` with lines taken from
+    iterator, so that they need not to be kept in memory all at once
+    """
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self._buffer = b""
+
+    def read(self, size=-1):
+        chunks = [self._buffer]
+        length = len(self._buffer)
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            chunks.append(line)
+            length += len(line)
+        data = b"".join(chunks)
+        if size < 0:
+            size = len(data)
+        self._buffer = data[size:]
+        return data[:size]
+
+
+class _Statement:
+    """
+    Cursor proxy remembering statement and parameters it executes, as built
+    by :py:mod:`dbapiext` for the database, or just returning them without
+    cursor
+    """
+
+    statement = parameters = None
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def execute(self, statement, parameters):
+        self.statement, self.parameters = statement, parameters
+        if self._cursor is None:
+            return statement, parameters
+        return self._cursor.execute(statement, parameters)
+
+
 class DBAPI2Resource(Resource):
     _types_mapping = {
         "boolean": "boolean",
@@ -257,6 +889,18 @@ class DBAPI2Resource(Resource):
         "string": "text",
     }
 
+    # SQLite's default SQLITE_MAX_VARIABLE_NUMBER
+    _max_parameters = 999
+
+    _operators = {
+        "eq": "=",
+        "ne": "<>",
+        "lt": "<",
+        "le": "<=",
+        "gt": ">",
+        "ge": ">=",
+    }
+
     class ResourceObject:
         def __init__(self, resource, row):
             self._resource = resource
@@ -274,17 +918,145 @@ class DBAPI2Resource(Resource):
                 n: v for (n, v) in zip(self._resource.columns, self.row[:-1])
             }
 
-    def __init__(self, schema, dbapi, connection):
+    def __init__(self, schema, dbapi, connection, indexes=None, connect=None):
+        """
+        :param dict schema: JSON schema of resource. Properties having
+            ``"x-index": true`` (or ``"x-index": "unique"``) keyword get an
+            index in :py:meth:`_create_table`.
+        :param dbapi: DBAPI2 module, e.g. :py:mod:`sqlite3` or ``momoko``.
+        :param connection: database connection (or ``momoko`` pool).
+        :param list indexes: additional indexes to create, each one being
+            either column name or tuple of column names for compound index.
+        :param connect: function returning new database connection, used for
+            transactions isolated from other requests, see
+            :py:meth:`begin_isolated`.
+        """
+        self.connect = connect
         self.cursor = dbapi2Cursor
+        self.transaction = dbapi2Transaction
         self.connection = connection
         self.dbapi = dbapi
         if dbapi.__name__ == "momoko":
             self.cursor = momokoCursor
+            self.transaction = momokoTransaction
             self.dbapi = dbapi.psycopg2
+        _import_dbapiext()
         dbapiext.set_paramstyle(self.dbapi)
         self._tablename = inflection.pluralize(schema["title"])
         super().__init__(schema)
         self.columns = list(self._schema()._properties.keys())
+        self._indexes = self._declared_indexes(indexes or [])
+
+    def _declared_indexes(self, indexes):
+        declared = []
+        for c in self.columns:
+            index = self.schema["properties"][c].get("x-index")
+            if index:
+                declared.append(((c,), index == "unique"))
+        for index in indexes:
+            columns = (index,) if isinstance(index, str) else tuple(index)
+            for c in columns:
+                if c != "id" and c not in self.columns:
+                    raise ValueError(
+                        "Unknown column {} in index of {}".format(
+                            c, self._tablename
+                        )
+                    )
+            declared.append((columns, False))
+        return declared
+
+    def indexes(self):
+        """
+        Return list of ``(name, columns, unique)`` tuples describing indexes
+        declared for this resource.
+        """
+        return [
+            ("_".join((self._tablename,) + columns + ("idx",)), columns, unique)
+            for columns, unique in self._indexes
+        ]
+
+    def indexes_for(self, filters=None, sort=None):
+        """
+        Return those of :py:meth:`indexes` which database could use to
+        execute :py:meth:`list_` with given filters and sort keys, i.e. the
+        ones with leading column being filtered or sorted by.
+        """
+        filtered = set(attribute for attribute, _, _ in filters or [])
+        sorted_by = sort[0][0] if sort else None
+        return [
+            index
+            for index in self.indexes()
+            if index[1][0] in filtered or index[1][0] == sorted_by
+        ]
+
+    def transaction_key(self):
+        return self.connection
+
+    def begin(self):
+        return self.transaction(self.connection)
+
+    def bind(self, transaction):
+        bound = copy.copy(self)
+        bound.cursor = transaction.cursor
+        return bound
+
+    def begin_isolated(self):
+        """
+        Begin transaction on connection of its own: new ``momoko`` pool
+        connection or one returned by ``connect`` function given to
+        constructor. Without it, ``None`` is returned, as transaction on
+        shared connection would be committed or rolled back by other
+        requests.
+        """
+        if self.transaction is momokoTransaction:
+            return self.begin()
+        if self.connect is None:
+            return None
+        return dbapi2Transaction(self.connect(), close=True)
+
+    @gen.coroutine
+    def _execute(self, cursor, query, *args):
+        """
+        Execute query with :py:func:`dbapiext.execute_f`, recording its time
+        with :py:func:`_record_statement`, and return cursor
+        """
+        statement = _Statement(cursor)
+        start = time.perf_counter()
+        try:
+            cur = dbapiext.execute_f(statement, query, *args)
+            while is_future(cur):
+                cur = yield cur
+        finally:
+            _record_statement(
+                statement.statement or query,
+                statement.parameters,
+                time.perf_counter() - start,
+            )
+        return cur
+
+    @gen.coroutine
+    def _executemany(self, cursor, query, args_list):
+        """
+        Execute query with each of arguments tuples, which must build the
+        same statement, in single ``executemany`` call if cursor has one,
+        recording its time with :py:func:`_record_statement`
+        """
+        if not hasattr(cursor, "executemany"):
+            for args in args_list:
+                yield self._execute(cursor, query, *args)
+            return
+        statements = [
+            dbapiext.execute_f(_Statement(None), query, *args)
+            for args in args_list
+        ]
+        statement, parameters = statements[0]
+        start = time.perf_counter()
+        try:
+            cursor.executemany(statement, [p for _, p in statements])
+        finally:
+            _record_statement(
+                statement, parameters, time.perf_counter() - start
+            )
 
     def _is_sqlite(self):
         return self.dbapi.__name__ == "sqlite3"
@@ -312,14 +1084,21 @@ class DBAPI2Resource(Resource):
             "{} {}".format(c, t) for c, t in zip(self.columns, types)
         ]
         with (yield self.cursor(self.connection, transaction=True)) as cursor:
-            cur = dbapiext.execute_f(
+            yield self._execute(
                 cursor,
                 "create table if not exists %s (%s)",
                 self._tablename,
                 column_defs,
             )
-            if is_future(cur):
-                yield cur
+            for name, columns, unique in self.indexes():
+                yield self._execute(
+                    cursor,
+                    "create %s index if not exists %s on %s (%s)",
+                    "unique" if unique else "",
+                    name,
+                    self._tablename,
+                    list(columns),
+                )
 
     def name(self):
         return self.schema["title"]
@@ -327,120 +1106,348 @@ class DBAPI2Resource(Resource):
     @gen.coroutine
     def exists(self, id_):
         with (yield self.cursor(self.connection)) as cursor:
-            cur = dbapiext.execute_f(
+            cur = yield self._execute(
                 cursor, "select 1 from %s where id = %X", self._tablename, id_
             )
-            if is_future(cur):
-                cur = yield cur
             return cur.fetchone() is not None
 
     @gen.coroutine
     def create(self, attributes):
         with (yield self.cursor(self.connection, transaction=True)) as cursor:
-            cur = dbapiext.execute_f(
+            cur = yield self._execute(
                 cursor,
                 "insert into %s (%s) values (%X)",
                 self._tablename,
                 list(attributes.keys()),
                 list(attributes.values()),
             )
-            if is_future(cur):
-                cur = yield cur
         with (yield self.cursor(self.connection)) as cursor:
             # XXX assuming id is monotonically increasing
-            cur = dbapiext.execute_f(
+            cur = yield self._execute(
                 cursor,
                 "select %s from %s order by id desc limit 1",
                 self.columns + ["id"],
                 self._tablename,
             )
-            if is_future(cur):
-                cur = yield cur
             return DBAPI2Resource.ResourceObject(self, cur.fetchone())
 
     @gen.coroutine
     def read(self, id_):
         with (yield self.cursor(self.connection)) as cursor:
-            cur = dbapiext.execute_f(
+            cur = yield self._execute(
                 cursor,
                 "select %s from %s where id = %X",
                 self.columns + ["id"],
                 self._tablename,
                 id_,
             )
-            if is_future(cur):
-                cur = yield cur
             row = cur.fetchone()
             if not row:
                 return None
             return DBAPI2Resource.ResourceObject(self, row)
 
+    @gen.coroutine
+    def read_many(self, ids):
+        if not ids:
+            return []
+        with (yield self.cursor(self.connection)) as cursor:
+            cur = yield self._execute(
+                cursor,
+                "select %s from %s where id in (%X)",
+                self.columns + ["id"],
+                self._tablename,
+                list(ids),
+            )
+            rows = cur.fetchall()
+            return [DBAPI2Resource.ResourceObject(self, row) for row in rows]
+
     @gen.coroutine
     def update(self, id_, attributes):
         with (yield self.cursor(self.connection, transaction=True)) as cursor:
-            cur = dbapiext.execute_f(
+            cur = yield self._execute(
                 cursor,
                 "update %s set %X where id = %X",
                 self._tablename,
                 attributes,
                 id_,
             )
-            if is_future(cur):
-                cur = yield cur
         with (yield self.cursor(self.connection)) as cursor:
-            cur = dbapiext.execute_f(
+            cur = yield self._execute(
                 cursor,
                 "select %s from %s where id = %X",
                 self.columns + ["id"],
                 self._tablename,
                 id_,
             )
-            if is_future(cur):
-                cur = yield cur
             return DBAPI2Resource.ResourceObject(self, cur.fetchone())
 
     @gen.coroutine
     def delete(self, id_):
         with (yield self.cursor(self.connection, transaction=True)) as cursor:
-            cur = dbapiext.execute_f(
+            cur = yield self._execute(
                 cursor, "delete from %s where id = %X", self._tablename, id_
             )
-            if is_future(cur):
-                cur = yield cur
             return cur.rowcount
 
     @gen.coroutine
-    def list_(self, limit=0, page=0):
+    def create_many(self, attributes_list):
+        """
+        Create resources with multi-row ``insert ... returning`` statements
+        on PostgreSQL. Other databases cannot return rows of multi-row
+        inserts, so resources are inserted one by one there, taking their IDs
+        from ``lastrowid`` of cursor.
+        """
+        if not attributes_list:
+            return []
+        columns = [
+            c for c in self.columns if any(c in a for a in attributes_list)
+        ]
+        rows = [[a.get(c) for c in columns] for a in attributes_list]
+        with (yield self.cursor(self.connection, transaction=True)) as cursor:
+            if not self._is_postgresql():
+                ids = []
+                for row in rows:
+                    cur = yield self._execute(
+                        cursor,
+                        "insert into %s (%s) values (%X)",
+                        self._tablename,
+                        columns,
+                        row,
+                    )
+                    ids.append(cur.lastrowid)
+                created = yield self._select_ids(cursor, ids)
+                return created
+            created = []
+            chunk = max(1, self._max_parameters // max(1, len(columns)))
+            for start in range(0, len(rows), chunk):
+                values = rows[start:start + chunk]
+                cur = yield self._execute(
+                    cursor,
+                    "insert into %s (%s) values " +
+                    ", ".join(["(%X)"] * len(values)) +
+                    " returning %s",
+                    self._tablename,
+                    columns,
+                    *(values + [self.columns + ["id"]])
+                )
+                created.extend(cur.fetchall())
+        return [DBAPI2Resource.ResourceObject(self, row) for row in created]
+
+    @gen.coroutine
+    def _select_ids(self, cursor, ids):
+        """
+        Read resources with given IDs using cursor, in the same order
+        """
+        rows = {}
+        for start in range(0, len(ids), self._max_parameters):
+            cur = yield self._execute(
+                cursor,
+                "select %s from %s where id in (%X)",
+                self.columns + ["id"],
+                self._tablename,
+                ids[start:start + self._max_parameters],
+            )
+            rows.update((row[-1], row) for row in cur.fetchall())
+        return [DBAPI2Resource.ResourceObject(self, rows[id_]) for id_ in ids]
+
+    @gen.coroutine
+    def update_many(self, updates):
+        """
+        Update resources with single ``executemany`` call for each set of
+        attributes given, or, with ``momoko``, which has none, statement by
+        statement
+        """
+        groups = collections.OrderedDict()
+        for id_, attributes in updates:
+            keys = tuple(sorted(attributes))
+            groups.setdefault(keys, []).append(
+                (
+                    self._tablename,
+                    collections.OrderedDict((k, attributes[k]) for k in keys),
+                    id_,
+                )
+            )
+        with (yield self.cursor(self.connection, transaction=True)) as cursor:
+            for args_list in groups.values():
+                yield self._executemany(
+                    cursor, "update %s set %X where id = %X", args_list
+                )
+        resources = yield self.read_many([id_ for id_, _ in updates])
+        resources = {r.id_(): r for r in resources}
+        return [resources[str(id_)] for id_, _ in updates]
+
+    @gen.coroutine
+    def delete_many(self, ids):
+        if not ids:
+            return 0
+        with (yield self.cursor(self.connection, transaction=True)) as cursor:
+            cur = yield self._execute(
+                cursor,
+                "delete from %s where id in (%X)",
+                self._tablename,
+                list(ids),
+            )
+            return cur.rowcount
+
+    @gen.coroutine
+    def copy_from(self, attributes_list):
+        """
+        Import resources using ``COPY ... FROM STDIN`` when working with
+        :py:mod:`psycopg2` directly, which is much faster than ``insert``.
+        Asynchronous ``momoko`` connections do not support ``COPY``, so
+        multi-row inserts of :py:meth:`create_many` are used for them, as well
+        as for other databases.
+        """
+        if not (
+            self._is_postgresql() and self.transaction is dbapi2Transaction
+        ):
+            res = yield super().copy_from(attributes_list)
+            return res
+        statement = "copy {} ({}) from stdin".format(
+            self._tablename, ", ".join(self.columns)
+        )
+        with (yield self.cursor(self.connection, transaction=True)) as cursor:
+            start = time.perf_counter()
+            try:
+                cursor.copy_expert(
+                    statement, _CopyReader(self._copy_lines(attributes_list))
+                )
+            finally:
+                _record_statement(statement, None, time.perf_counter() - start)
+            return cursor.rowcount
+
+    def _copy_lines(self, attributes_list):
+        for attributes in attributes_list:
+            yield (
+                "\t".join(_copy_value(attributes.get(c)) for c in self.columns) +
+                "\n"
+            ).encode("utf-8")
+
+    def _where(self, filters):
+        """
+        Build parameterized ``where`` clause for given filters, returning
+        tuple of query string and list of arguments to format it with.
+        """
+        if not filters:
+            return "", []
+        clauses, args = [], []
+        for attribute, operator_, value in filters:
+            if attribute != "id" and attribute not in self.columns:
+                raise APIError(
+                    status.HTTP_400_BAD_REQUEST,
+                    'Unknown attribute "%s"',
+                    attribute,
+                )
+            if operator_ == "in":
+                if not value:
+                    clauses.append("1 = 0")
+                    continue
+                clauses.append(attribute + " in (%X)")
+                args.append(list(value))
+            else:
+                clauses.append(
+                    "{} {} %X".format(attribute, self._operators[operator_])
+                )
+                args.append(value)
+        return " where " + " and ".join(clauses), args
+
+    def _order_by(self, sort):
+        """
+        Build ``order by`` clause for given sort keys, using ID as a tie
+        breaker so that pagination is stable.
+        """
+        if not sort:
+            return ""
+        keys = []
+        for attribute, descending in sort:
+            if attribute != "id" and attribute not in self.columns:
+                raise APIError(
+                    status.HTTP_400_BAD_REQUEST,
+                    'Unknown attribute "%s"',
+                    attribute,
+                )
+            keys.append(attribute + (" desc" if descending else ""))
+        if all(attribute != "id" for attribute, _ in sort):
+            keys.append("id")
+        return " order by " + ", ".join(keys)
+
+    @gen.coroutine
+    def list_(self, limit=0, page=0, filters=None, sort=None):
+        where, args = self._where(filters)
+        query = "select %s from %s" + where + self._order_by(sort)
         with (yield self.cursor(self.connection)) as cursor:
             if limit > 0:
                 start = abs(page) * limit
-                cur = dbapiext.execute_f(
+                cur = yield self._execute(
                     cursor,
-                    "select %s from %s limit %d offset %d",
+                    query + " limit %d offset %d",
                     self.columns + ["id"],
                     self._tablename,
-                    limit,
-                    start,
+                    *(args + [limit, start])
                 )
             else:
-                cur = dbapiext.execute_f(
+                cur = yield self._execute(
                     cursor,
-                    "select %s from %s",
+                    query,
                     self.columns + ["id"],
                     self._tablename,
+                    *args
                 )
-            if is_future(cur):
-                cur = yield cur
             rows = cur.fetchall()
             return [DBAPI2Resource.ResourceObject(self, row) for row in rows]
 
     @gen.coroutine
-    def list_count(self):
+    def stream(self, callback, filters=None, sort=None, chunk_size=1000):
+        """
+        Stream resources from single query, fetching rows in chunks. With
+        :py:mod:`psycopg2` server-side cursor is used, so that result set is
+        not transferred to client at once. Asynchronous ``momoko``
+        connections do not support server-side cursors, so they fall back to
+        paging with :py:meth:`list_`, as well as resources bound to
+        transaction.
+        """
+        if self.cursor is not dbapi2Cursor:
+            yield super().stream(callback, filters, sort, chunk_size)
+            return
+        where, args = self._where(filters)
+        if self._is_postgresql():
+            # holdable, so that commits of concurrent requests do not close it
+            cursor = self.connection.cursor(
+                "stream_" + uuid.uuid4().hex, withhold=True
+            )
+        else:
+            cursor = self.connection.cursor()
+        try:
+            yield self._execute(
+                cursor,
+                "select %s from %s" + where + self._order_by(sort),
+                self.columns + ["id"],
+                self._tablename,
+                *args
+            )
+            if self._is_postgresql():
+                self.connection.commit()
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                res = callback(
+                    [DBAPI2Resource.ResourceObject(self, row) for row in rows]
+                )
+                while is_future(res):
+                    res = yield res
+        finally:
+            cursor.close()
+
+    @gen.coroutine
+    def list_count(self, filters=None):
+        where, args = self._where(filters)
         with (yield self.cursor(self.connection)) as cursor:
-            cur = dbapiext.execute_f(
-                cursor, "select count(1) from %s", self._tablename
+            cur = yield self._execute(
+                cursor,
+                "select count(1) from %s" + where,
+                self._tablename,
+                *args
             )
-            if is_future(cur):
-                cur = yield cur
             rows = cur.fetchone()
             return rows[0]
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import collections
+import json
+import random
+import re
+import sys
+import time
+
+
+SpanContext = collections.namedtuple("SpanContext", "trace_id span_id")
+SpanContext.__doc__ = """
+Identifiers of span, as propagated in W3C ``traceparent`` header
+"""
+
+_traceparent_re = re.compile(
+    r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$"
+)
+
+
+def _generate_id(bits):
+    return "%0*x" % (bits // 4, random.getrandbits(bits))
+
+
+class Span:
+    """
+    Timed operation within trace, e.g. handling of request or SQL statement
+    """
+
+    def __init__(self, tracer, name, parent=None, attributes=None):
+        self.tracer = tracer
+        self.name = name
+        self.context = SpanContext(
+            parent.trace_id if parent is not None else _generate_id(128),
+            _generate_id(64),
+        )
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = attributes or {}
+        self.start = time.time()
+        self.end = None
+
+    @property
+    def duration(self):
+        return None if self.end is None else self.end - self.start
+
+    def finish(self, end=None):
+        """
+        Finish span and pass it to exporter of its tracer
+        """
+        self.end = time.time() if end is None else end
+        self.tracer.exporter.export(self)
+
+    def to_dict(self):
+        return collections.OrderedDict(
+            (
+                ("name", self.name),
+                ("trace_id", self.context.trace_id),
+                ("span_id", self.context.span_id),
+                ("parent_id", self.parent_id),
+                ("start", self.start),
+                ("duration", self.duration),
+                ("attributes", self.attributes),
+            )
+        )
+
+
+class Tracer:
+    """
+    Tracing of requests to :py:class:`tornado_jsonapi.handlers.APIHandler`
+    given as ``jsonapi_tracer`` application setting. Each request gets a span
+    continuing the trace of incoming ``traceparent`` header, if any, with
+    child spans for phases of its processing (see
+    :py:meth:`tornado_jsonapi.handlers.APIHandler.get_timings`), for
+    validation and for SQL statements of
+    :py:class:`tornado_jsonapi.resource.DBAPI2Resource` and
+    :py:class:`tornado_jsonapi.resource.SQLAlchemyResource`. Finished spans
+    are passed to exporter, e.g. :py:class:`MemoryExporter` or
+    :py:class:`StreamExporter`:
+
+    .. code-block:: python
+
+        application = tornado.web.Application([
+            # ... handlers ...
+        ], jsonapi_tracer=tornado_jsonapi.tracing.Tracer(
+            tornado_jsonapi.tracing.StreamExporter(open("spans.log", "a"))))
+
+    SQL statements are attributed to the backend call in progress, so with
+    asynchronous backends (e.g. ``momoko``) they are only traced when the
+    backend call of a single request is in progress.
+
+    :param exporter: object with ``export(span)`` method.
+    """
+
+    def __init__(self, exporter):
+        self.exporter = exporter
+
+    def extract(self, headers):
+        """
+        Return :py:class:`SpanContext` of ``traceparent`` header, or ``None``
+        if it is missing or malformed
+        """
+        match = _traceparent_re.match(headers.get("traceparent", ""))
+        if match is None:
+            return None
+        return SpanContext(*match.groups())
+
+    def start_span(self, name, parent=None, **attributes):
+        """
+        Start span with given parent :py:class:`SpanContext` and attributes
+        """
+        return Span(self, name, parent, attributes)
+
+
+# backend spans in progress, see current_span
+_backend_spans = []
+
+
+def enter_backend(span):
+    _backend_spans.append(span)
+
+
+def leave_backend(span):
+    _backend_spans.remove(span)
+
+
+def current_span():
+    """
+    Return span of backend call in progress, or ``None`` if there are several
+    such spans, so it cannot be told
+    """
+    if len(_backend_spans) == 1:
+        return _backend_spans[0]
+    return None
+
+
+def record_span(name, duration, **attributes):
+    """
+    Record finished child span of :py:func:`current_span`, which took given
+    time in seconds, if there is current span
+    """
+    parent = current_span()
+    if parent is None:
+        return
+    span = parent.tracer.start_span(name, parent.context, **attributes)
+    span.start = time.time() - duration
+    span.finish(span.start + duration)
+
+
+class MemoryExporter:
+    """
+    Exporter keeping finished spans in ``spans`` list, e.g. for tests
+    """
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def clear(self):
+        del self.spans[:]
+
+
+class StreamExporter:
+    """
+    Exporter writing finished spans as lines of JSON to file object
+    (standard output by default)
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def export(self, span):
+        stream = self.stream or sys.stdout
+        stream.write(json.dumps(span.to_dict(), default=str) + "\n")
+        stream.flush()
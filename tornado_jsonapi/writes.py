@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# vim: set fileencoding=utf8 :
+
+import collections
+import uuid
+from tornado import gen
+from tornado.concurrent import Future, is_future
+from tornado.ioloop import IOLoop
+from tornado.log import app_log
+from tornado.queues import Queue, QueueFull
+
+
+@gen.coroutine
+def _create_many(resource, attributes_list):
+    """
+    Create resources in single transaction, falling back to creating them one
+    by one if it fails, so that single bad row does not fail the rest.
+    Returns list of resources or exceptions for failed ones.
+    """
+    try:
+        resources = resource.create_many(attributes_list)
+        while is_future(resources):
+            resources = yield resources
+        return resources
+    except Exception as err:
+        if len(attributes_list) == 1:
+            return [err]
+    results = []
+    for attributes in attributes_list:
+        res = yield _create_many(resource, [attributes])
+        results.extend(res)
+    return results
+
+
+class CoalescingResource:
+    """
+    Resource wrapper performing group commit: :py:meth:`create` calls made
+    within short time window are coalesced into single
+    :py:meth:`tornado_jsonapi.resource.Resource.create_many` call, so that
+    they share one transaction (and one commit), while each caller still gets
+    its own resource object. Larger window increases both throughput and
+    latency of creation under load, see ``benchmarks/write_coalescing.py``.
+    All other methods are passed to wrapped resource as is. Use this as
+    follows:
+
+    .. code-block:: python
+
+        (
+            r"/api/posts/([^/]*)",
+            tornado_jsonapi.handlers.APIHandler,
+            dict(resource=CoalescingResource(posts, delay=0.002))
+        ),
+
+    :param Resource resource: resource to wrap.
+    :param float delay: time in seconds to wait for more resources to create
+        after the first one.
+    :param int max_size: maximum number of resources to create in one
+        transaction; reaching it triggers creation immediately.
+    """
+
+    def __init__(self, resource, delay=0.002, max_size=100):
+        self._resource = resource
+        self.delay = delay
+        self.max_size = max_size
+        self._pending = []
+        self._timeout = None
+        self._flushing = False
+
+    def __getattr__(self, name):
+        return getattr(self._resource, name)
+
+    def create(self, attributes):
+        future = Future()
+        self._pending.append((attributes, future))
+        if len(self._pending) >= self.max_size:
+            IOLoop.current().add_callback(self.flush)
+        elif self._timeout is None:
+            self._timeout = IOLoop.current().call_later(self.delay, self.flush)
+        return future
+
+    @gen.coroutine
+    def flush(self):
+        """
+        Create all pending resources right away
+        """
+        if self._timeout is not None:
+            IOLoop.current().remove_timeout(self._timeout)
+            self._timeout = None
+        if self._flushing:
+            return  # pending resources will be picked up by running flush
+        self._flushing = True
+        try:
+            while self._pending:
+                batch = self._pending[:self.max_size]
+                self._pending = self._pending[self.max_size:]
+                yield self._create(batch)
+        finally:
+            self._flushing = False
+
+    @gen.coroutine
+    def _create(self, batch):
+        results = yield _create_many(self._resource, [a for a, _ in batch])
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+class Job:
+    """
+    Background creation of resource queued by :py:class:`WriteBehindResource`.
+    ``status`` is one of ``pending``, ``done`` (in which case ``resource_id``
+    is set) or ``failed``.
+    """
+
+    def __init__(self, id_):
+        self.id = id_
+        self.status = "pending"
+        self.resource_id = None
+
+
+class WriteBehindResource:
+    """
+    Resource wrapper for fire-and-forget ingestion: instead of creating
+    resources right away, :py:class:`tornado_jsonapi.handlers.APIHandler`
+    validates them, puts them into bounded in-process queue and responds with
+    ``202 Accepted`` and link to :py:class:`Job` status (see
+    :py:class:`tornado_jsonapi.handlers.JobHandler`), or with
+    ``503 Service Unavailable`` if the queue is full. Background flusher
+    drains the queue in batches with
+    :py:meth:`tornado_jsonapi.resource.Resource.create_many`. Queued resources
+    are lost if process exits before they are created. All other methods are
+    passed to wrapped resource as is.
+
+    :param Resource resource: resource to wrap.
+    :param int max_size: maximum number of queued resources.
+    :param int batch_size: maximum number of resources to create in one
+        transaction.
+    :param int max_jobs: number of most recent jobs to keep status of.
+    :param int retry_after: value of ``Retry-After`` header sent along with
+        ``503 Service Unavailable`` response.
+    """
+
+    def __init__(
+        self,
+        resource,
+        max_size=1000,
+        batch_size=100,
+        max_jobs=10000,
+        retry_after=1,
+    ):
+        self._resource = resource
+        self._queue = Queue(maxsize=max_size)
+        self.batch_size = batch_size
+        self.max_jobs = max_jobs
+        self.retry_after = retry_after
+        self._jobs = collections.OrderedDict()
+        self._running = False
+
+    def __getattr__(self, name):
+        return getattr(self._resource, name)
+
+    def enqueue(self, attributes):
+        """
+        Queue resource with given attributes for creation, returning its
+        :py:class:`Job` or ``None`` if the queue is full.
+        """
+        job = Job(uuid.uuid4().hex)
+        try:
+            self._queue.put_nowait((attributes, job))
+        except QueueFull:
+            return None
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+        if not self._running:
+            self._running = True
+            IOLoop.current().spawn_callback(self._flush)
+        return job
+
+    def job(self, id_):
+        """
+        Return :py:class:`Job` with given ID or ``None`` if it is unknown.
+        """
+        return self._jobs.get(id_)
+
+    @gen.coroutine
+    def join(self):
+        """
+        Wait until all queued resources are created.
+        """
+        yield self._queue.join()
+
+    @gen.coroutine
+    def _flush(self):
+        while True:
+            batch = [(yield self._queue.get())]
+            while len(batch) < self.batch_size and self._queue.qsize():
+                batch.append(self._queue.get_nowait())
+            try:
+                try:
+                    results = yield _create_many(
+                        self._resource, [a for a, _ in batch]
+                    )
+                except Exception as err:
+                    # keep flushing later batches, failing this one row by row
+                    results = [err] * len(batch)
+                for (_, job), result in zip(batch, results):
+                    if isinstance(result, Exception):
+                        app_log.error(
+                            "Failed to create %s",
+                            self._resource.name(),
+                            exc_info=(type(result), result, result.__traceback__),
+                        )
+                        job.status = "failed"
+                    else:
+                        job.status = "done"
+                        job.resource_id = result.id_()
+            finally:
+                for _ in batch:
+                    self._queue.task_done()